@@ -0,0 +1,105 @@
+import asyncio
+import logging
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from app.core.auth import verify_admin, verify_auth
+from app.core.config import settings
+from app.core.loop_monitor import loop_monitor
+from app.core.profiling import (
+    PROFILE_FORMATS,
+    collapsed,
+    sampling_profiler,
+    speedscope,
+)
+from app.core.statements import STATEMENT_ORDERINGS, statement_stats
+
+logger = logging.getLogger("temporallayr.api.admin")
+
+# Process-wide diagnostics, so a tenant key alone is not enough
+router = APIRouter(
+    prefix="/admin", tags=["Admin"], dependencies=[Depends(verify_admin)]
+)
+
+
+@router.get("/statements")
+async def top_statements(
+    limit: int = Query(20, ge=1, le=500),
+    order_by: str = Query("total_time", description="|".join(STATEMENT_ORDERINGS)),
+    tenant_id: str = Depends(verify_auth),
+):
+    """This process's heaviest SQL statements by fingerprint, pg_stat_statements style."""
+    if order_by not in STATEMENT_ORDERINGS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"order_by must be one of {', '.join(STATEMENT_ORDERINGS)}",
+        )
+    return {
+        **statement_stats.stats(),
+        "statements": statement_stats.top(limit, order_by),
+    }
+
+
+@router.delete("/statements")
+async def reset_statements(tenant_id: str = Depends(verify_auth)):
+    """Start statement stats afresh."""
+    statement_stats.reset()
+    logger.info(f"[ADMIN] statement stats reset by tenant={tenant_id}")
+    return {"status": "reset"}
+
+
+@router.post("/profile")
+async def sample_profile(
+    seconds: float = Query(10.0, gt=0),
+    interval_ms: float = Query(10.0, ge=1, le=1000),
+    format: str = Query("collapsed", description="|".join(PROFILE_FORMATS)),
+    tenant_id: str = Depends(verify_auth),
+):
+    """Sample the event loop's stack for `seconds`; collapsed stacks or speedscope JSON."""
+    if format not in PROFILE_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"format must be one of {', '.join(PROFILE_FORMATS)}",
+        )
+    if seconds > settings.PROFILING_MAX_SECONDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"seconds must be at most {settings.PROFILING_MAX_SECONDS}",
+        )
+    interval = interval_ms / 1000
+    try:
+        samples, elapsed = await sampling_profiler.run(seconds, interval)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    logger.info(
+        f"[ADMIN] profiled {len(samples)} samples over {elapsed:.1f}s for tenant={tenant_id}"
+    )
+    if format == "speedscope":
+        return speedscope(samples, elapsed, interval)
+    return PlainTextResponse(collapsed(samples))
+
+
+@router.get("/loop")
+async def loop_health(
+    census: bool = Query(True, description="Count pending tasks now"),
+    tenant_id: str = Depends(verify_auth),
+):
+    """Event loop lag, recent stalls with the coroutine holding the loop, and pending tasks by origin."""
+    if census:
+        loop_monitor.take_census(asyncio.get_running_loop())
+    return {
+        **loop_monitor.stats(),
+        "recent_stalls": loop_monitor.recent_stalls(),
+        "tasks": loop_monitor.census,
+        "tasks_total": sum(loop_monitor.census.values()),
+        "census_at": loop_monitor.census_at,
+    }
+
+
+@router.delete("/loop")
+async def reset_loop_health(tenant_id: str = Depends(verify_auth)):
+    """Start lag percentiles, stall and shed counts afresh."""
+    loop_monitor.reset()
+    logger.info(f"[ADMIN] loop monitor reset by tenant={tenant_id}")
+    return {"status": "reset"}
@@ -3,6 +3,7 @@ from typing import List
 from fastapi import APIRouter, Depends, HTTPException, Request
 
 from app.api.auth import verify_api_key
+from app.core.responses import FastJSONResponse
 from app.dashboard.models import (
     SavedQueryCreate,
     SavedQueryResponse,
@@ -148,7 +149,8 @@ async def run_dashboard_queries(
         execution_data = await execute_dashboard(
             dashboard_id=dashboard_id, tenant_id=tenant_id
         )
-        return execution_data
+        # Panel rows can be large; encode them once instead of via jsonable_encoder
+        return FastJSONResponse(execution_data)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
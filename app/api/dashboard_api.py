@@ -1,14 +1,23 @@
 import logging
 import time
+from datetime import datetime, timedelta, timezone
 from typing import Dict, Any, List, Optional
-from datetime import datetime
 
-from fastapi import APIRouter, Depends, Query, HTTPException, Request, Response
-from sqlalchemy import select, func, text, desc, cast, Float, Integer
+from fastapi import APIRouter, Depends, Query, HTTPException, Response
+from sqlalchemy import select, func, text, true, cast, Float, Integer, Text
 
 from app.api.auth import verify_api_key
 from app.core.database import async_session_maker
+from app.core.replicas import read_session
+from app.core.raw_json import RawJSON, encode_object, envelope_response
+from app.core.responses import FastJSONResponse
+from app.core.pagination import InvalidCursorError, apply_keyset, paginate
+from app.db.session import db_status
 from app.models.event import Event
+from app.services.cardinality import CARDINALITY_DIMENSIONS, cardinality_store
+from app.services.heavy_hitters import bucket_column, heavy_hitters
+from app.services.hot_store import hot_store
+from app.services.schema_catalog import schema_catalog
 from app.models.dashboard_api import (
     StandardDashboardResponse,
     ResponseMeta,
@@ -18,7 +27,7 @@ from app.models.dashboard_api import (
 
 logger = logging.getLogger("temporallayr.api.dashboard_ext")
 
-router = APIRouter(prefix="/v1/dashboard", tags=["Dashboard Ext"])
+router = APIRouter(prefix="/dashboard", tags=["Dashboard Ext"])
 
 
 def wrap_response(
@@ -33,6 +42,20 @@ def wrap_response(
     )
 
 
+def wrap_rows(start_time: float, data: List[Any]) -> FastJSONResponse:
+    """wrap_response for large server-built results: encoded once, no model pass."""
+    query_ms = round((time.perf_counter() - start_time) * 1000, 2)
+    return FastJSONResponse(
+        {
+            "ok": True,
+            "data": data,
+            "meta": {"query_ms": query_ms},
+            "error": None,
+            "next_cursor": None,
+        }
+    )
+
+
 @router.get("/ready", response_model=StandardDashboardResponse)
 async def health_check():
     """Health Check querying internal Postgres states smoothly!"""
@@ -52,24 +75,27 @@ async def health_check():
 @router.post("/search", response_model=StandardDashboardResponse)
 async def search_events(
     payload: DashboardSearchRequest,
-    request: Request,
     response: Response,
     api_key: str = Depends(verify_api_key),
 ):
     """Cursor-bound UI pagination search effectively isolating OFFSET performance drag."""
     start_time = time.perf_counter()
-    if getattr(request.app.state, "db_status", "unknown") != "connected":
-        response.headers["X-DB-Status"] = getattr(
-            request.app.state, "db_status", "unknown"
-        )
+    if not db_status.is_ready:
+        response.headers["X-DB-Status"] = "disconnected"
         return wrap_response(start_time, data=[])
 
     if payload.tenant_id != api_key:
         return wrap_response(start_time, error="Tenant mismatch gracefully forbidden!")
 
     try:
-        async with async_session_maker() as session:
-            stmt = select(Event).where(Event.tenant_id == payload.tenant_id)
+        async with read_session(payload.tenant_id) as session:
+            # Payload stays Postgres-rendered JSON text; it is never decoded here
+            stmt = select(
+                Event.id,
+                Event.timestamp,
+                Event.event_type,
+                cast(Event.payload, Text).label("payload"),
+            ).where(Event.tenant_id == payload.tenant_id)
 
             if payload.time_from:
                 stmt = stmt.where(Event.timestamp >= payload.time_from)
@@ -85,54 +111,56 @@ async def search_events(
                     if val is not None:
                         stmt = stmt.where(Event.payload.op("->>")(key) == str(val))
 
-            # Cursor pagination mapping tuple comparisons cleanly!
-            # Cursor Format: "1678888_uuid"
-            if payload.cursor:
-                try:
-                    parts = payload.cursor.split("_")
-                    if len(parts) == 2:
-                        cursor_ts = datetime.fromisoformat(parts[0])
-                        cursor_id = parts[1]
-                        stmt = stmt.where(
-                            (Event.timestamp < cursor_ts)
-                            | ((Event.timestamp == cursor_ts) & (Event.id < cursor_id))
-                        )
-                except Exception as e:
-                    logger.warning(f"Invalid cursor format: {e}")
+            # Keyset pagination over (timestamp, id) via the shared signed cursors
+            scope = f"dashboard-search:{payload.tenant_id}"
+            try:
+                stmt = apply_keyset(
+                    stmt, [Event.timestamp, Event.id], payload.cursor, scope
+                )
+            except InvalidCursorError as e:
+                return wrap_response(start_time, error=f"Invalid cursor: {e}")
 
             # Add 1 to limit checking next page logically
-            limit_to_fetch = payload.limit + 1
-            stmt = stmt.order_by(desc(Event.timestamp), desc(Event.id)).limit(
-                limit_to_fetch
-            )
+            stmt = stmt.limit(payload.limit + 1)
 
             result = await session.execute(stmt)
-            rows = result.scalars().all()
+            rows, next_cursor = paginate(
+                result.all(),
+                payload.limit,
+                scope,
+                key=lambda r: (r.timestamp, r.id),
+            )
 
-            next_cursor = None
-            if len(rows) > payload.limit:
-                last = rows[payload.limit - 1]
-                next_cursor = f"{last.timestamp.isoformat()}_{str(last.id)}"
-                rows = rows[: payload.limit]  # Slice correctly
+        items = []
+        for r in rows:
+            event_data = {
+                "id": str(r.id),
+                "timestamp": r.timestamp.isoformat() if r.timestamp else None,
+                "event_type": r.event_type,
+                "payload": RawJSON(r.payload),
+            }
 
-            results = []
-            for r in rows:
+            # Select bounding dynamically dropping excess metrics
+            if payload.select:
                 event_data = {
-                    "id": str(r.id),
-                    "timestamp": r.timestamp.isoformat() if r.timestamp else None,
-                    "event_type": r.event_type,
-                    "payload": r.payload,
+                    k: v for k, v in event_data.items() if k in payload.select
                 }
 
-                # Select bounding dynamically dropping excess metrics
-                if payload.select:
-                    event_data = {
-                        k: v for k, v in event_data.items() if k in payload.select
-                    }
-
-                results.append(event_data)
-
-        return wrap_response(start_time, data=results, next_cursor=next_cursor)
+            items.append(encode_object(event_data))
+
+        # Same envelope as wrap_response, streamed without re-validating payloads
+        return envelope_response(
+            "data",
+            items,
+            head={"ok": True},
+            tail=lambda: {
+                "meta": {
+                    "query_ms": round((time.perf_counter() - start_time) * 1000, 2)
+                },
+                "error": None,
+                "next_cursor": next_cursor,
+            },
+        )
     except Exception as e:
         logger.error(f"[DASHBOARD_EXT] Error in search_events: {str(e)}")
         return wrap_response(start_time, data=[])
@@ -141,23 +169,20 @@ async def search_events(
 @router.post("/query", response_model=StandardDashboardResponse)
 async def query_aggregation(
     payload: DashboardQueryRequest,
-    request: Request,
     response: Response,
     api_key: str = Depends(verify_api_key),
 ):
     """Pipeline aggregation engine seamlessly mapping UI configurations natively into PG."""
     start_time = time.perf_counter()
-    if getattr(request.app.state, "db_status", "unknown") != "connected":
-        response.headers["X-DB-Status"] = getattr(
-            request.app.state, "db_status", "unknown"
-        )
+    if not db_status.is_ready:
+        response.headers["X-DB-Status"] = "disconnected"
         return wrap_response(start_time, data=[])
 
     if payload.tenant_id != api_key:
         return wrap_response(start_time, error="Tenant mismatch gracefully forbidden!")
 
     try:
-        async with async_session_maker() as session:
+        async with read_session(payload.tenant_id) as session:
             # Pipeline translator mapped dynamically
             selections = []
             groupings = []
@@ -206,12 +231,46 @@ async def query_aggregation(
                 item["count"] = getattr(r, "count", 0)
                 results.append(item)
 
-        return wrap_response(start_time, data=results)
+        return wrap_rows(start_time, results)
     except Exception as e:
         logger.error(f"[DASHBOARD_EXT] Error in query_aggregation: {str(e)}")
         return wrap_response(start_time, data=[])
 
 
+def _window_start(window_minutes: Optional[int]) -> Optional[datetime]:
+    if not window_minutes:
+        return None
+    return datetime.now(timezone.utc) - timedelta(minutes=window_minutes)
+
+
+def _node_seed(tenant_id: str):
+    """Stored node names per top-k bucket, backfilling summaries that start at deploy."""
+
+    def seed(before: datetime, bucket_seconds: int):
+        nodes_element = func.jsonb_array_elements(Event.payload["nodes"]).alias("node")
+        name = func.jsonb_extract_path_text(nodes_element.column, "name")
+        bucket = bucket_column(Event.timestamp, bucket_seconds)
+        return (
+            select(name, bucket, func.count())
+            .select_from(Event)
+            .join(nodes_element, true())
+            .where(
+                Event.tenant_id == tenant_id,
+                Event.event_type == "execution_graph",
+                func.jsonb_typeof(Event.payload["nodes"]) == "array",
+                Event.timestamp < before,
+            )
+            .group_by(name, bucket)
+        )
+
+    return seed
+
+
+def _top_items(top: List[tuple]) -> List[Dict[str, Any]]:
+    # count overshoots by at most error, so count - error is a guaranteed floor
+    return [{"name": name, "count": n, "error": err} for name, n, err in top]
+
+
 def _safe_wrap_sync(start_time: float, f):
     try:
         data = f()
@@ -222,16 +281,13 @@ def _safe_wrap_sync(start_time: float, f):
 
 @router.get("/overview", response_model=StandardDashboardResponse)
 async def wrapper_overview(
-    request: Request,
     response: Response,
     tenant_id: str = Query(..., description="dashboard tenant"),
     api_key: str = Depends(verify_api_key),
 ):
     start_time = time.perf_counter()
-    if getattr(request.app.state, "db_status", "unknown") != "connected":
-        response.headers["X-DB-Status"] = getattr(
-            request.app.state, "db_status", "unknown"
-        )
+    if not db_status.is_ready:
+        response.headers["X-DB-Status"] = "disconnected"
         return wrap_response(
             start_time,
             data={
@@ -246,25 +302,33 @@ async def wrapper_overview(
         return wrap_response(start_time, error="Tenant mismatch!")
 
     try:
-        async with async_session_maker() as session:
-            stmt = select(
-                func.sum(
-                    cast(
-                        Event.timestamp >= func.now() - text("INTERVAL '1 hour'"),
-                        Integer,
-                    )
-                ).label("events_last_1h"),
-                func.sum(
-                    cast(
-                        Event.timestamp >= func.now() - text("INTERVAL '24 hours'"),
-                        Integer,
-                    )
-                ).label("events_last_24h"),
+        # The all-time function sketch replaces a DISTINCT over every event
+        functions = await cardinality_store.distinct(tenant_id, "function")
+        columns = [
+            func.sum(
+                cast(
+                    Event.timestamp >= func.now() - text("INTERVAL '1 hour'"),
+                    Integer,
+                )
+            ).label("events_last_1h"),
+            func.sum(
+                cast(
+                    Event.timestamp >= func.now() - text("INTERVAL '24 hours'"),
+                    Integer,
+                )
+            ).label("events_last_24h"),
+            func.max(Event.timestamp).label("last_event_timestamp"),
+        ]
+        if functions is None:
+            columns.append(
                 func.count(
                     func.distinct(Event.payload.op("->>")("function_name"))
-                ).label("unique_functions"),
-                func.max(Event.timestamp).label("last_event_timestamp"),
-            ).where(Event.tenant_id == tenant_id, Event.event_type == "execution_graph")
+                ).label("unique_functions")
+            )
+        async with read_session(tenant_id) as session:
+            stmt = select(*columns).where(
+                Event.tenant_id == tenant_id, Event.event_type == "execution_graph"
+            )
 
             result = await session.execute(stmt)
             row = result.first()
@@ -273,7 +337,9 @@ async def wrapper_overview(
                 "events_last_24h": int(row.events_last_24h)
                 if row.events_last_24h
                 else 0,
-                "unique_functions": row.unique_functions or 0,
+                "unique_functions": functions.estimate
+                if functions
+                else row.unique_functions or 0,
                 "last_event_timestamp": row.last_event_timestamp.isoformat()
                 if row.last_event_timestamp
                 else None,
@@ -294,53 +360,26 @@ async def wrapper_overview(
 
 @router.get("/schema", response_model=StandardDashboardResponse)
 async def wrapper_schema(
-    request: Request,
     response: Response,
     tenant_id: str = Query(..., description="dashboard tenant"),
+    prefix: Optional[str] = Query(
+        None, description="Only paths starting with this prefix (autocomplete)"
+    ),
+    limit: Optional[int] = Query(None, ge=1, description="Maximum fields returned"),
     api_key: str = Depends(verify_api_key),
 ):
     start_time = time.perf_counter()
-    if getattr(request.app.state, "db_status", "unknown") != "connected":
-        response.headers["X-DB-Status"] = getattr(
-            request.app.state, "db_status", "unknown"
-        )
+    if not db_status.is_ready:
+        response.headers["X-DB-Status"] = "disconnected"
         return wrap_response(start_time, data={"fields": []})
 
     if tenant_id != api_key:
         return wrap_response(start_time, error="Tenant mismatch!")
 
     try:
-        async with async_session_maker() as session:
-            stmt = (
-                select(Event.payload)
-                .where(
-                    Event.tenant_id == tenant_id, Event.event_type == "execution_graph"
-                )
-                .order_by(Event.timestamp.desc())
-                .limit(100)
-            )
-
-            result = await session.execute(stmt)
-            payloads = result.scalars().all()
-
-            unique_paths = set()
-
-            def flatten_json(obj, parent_key=""):
-                if isinstance(obj, dict):
-                    for k, v in obj.items():
-                        key = f"{parent_key}.{k}" if parent_key else k
-                        flatten_json(v, key)
-                elif isinstance(obj, list) and obj:
-                    for item in obj:
-                        key = f"{parent_key}.*" if parent_key else "*"
-                        flatten_json(item, key)
-                else:
-                    unique_paths.add(parent_key)
-
-            for payload in payloads:
-                flatten_json(payload)
-
-            data = {"fields": sorted(list(unique_paths))}
+        # Served from the ingest-maintained catalog instead of re-flattening payloads
+        catalog = await schema_catalog.fields(tenant_id, prefix=prefix, limit=limit)
+        data = {"fields": [entry["path"] for entry in catalog], "catalog": catalog}
         return wrap_response(start_time, data=data)
     except Exception as e:
         logger.error(f"[DASHBOARD_EXT] Error in wrapper_schema: {str(e)}")
@@ -349,23 +388,44 @@ async def wrapper_schema(
 
 @router.get("/stats/top-functions", response_model=StandardDashboardResponse)
 async def wrapper_top_functions(
-    request: Request,
     response: Response,
     tenant_id: str = Query(...),
+    window_minutes: Optional[int] = Query(
+        None, ge=1, description="Only count the last N minutes"
+    ),
+    limit: int = Query(10, ge=1, le=100),
+    capacity: Optional[int] = Query(
+        None, ge=1, description="Top-k summary size; smaller is cheaper but coarser"
+    ),
     api_key: str = Depends(verify_api_key),
 ):
     start_time = time.perf_counter()
-    if getattr(request.app.state, "db_status", "unknown") != "connected":
-        response.headers["X-DB-Status"] = getattr(
-            request.app.state, "db_status", "unknown"
+    since = _window_start(window_minutes)
+    if since and tenant_id == api_key and hot_store.covers(tenant_id, since):
+        top = hot_store.top_functions(
+            tenant_id, since, datetime.now(timezone.utc), limit
+        )
+        # Exact counts over the hot window, so the error bound is zero
+        return wrap_response(
+            start_time, data=_top_items([(name, n, 0) for name, n in top])
         )
+
+    if not db_status.is_ready:
+        response.headers["X-DB-Status"] = "disconnected"
         return wrap_response(start_time, data=[])
 
     if tenant_id != api_key:
         return wrap_response(start_time, error="Tenant mismatch!")
 
     try:
-        async with async_session_maker() as session:
+        # Ingest-maintained Space-Saving summaries; the scan only runs before any exist
+        top = await heavy_hitters.top(
+            tenant_id, "node", limit, since, capacity, seed=_node_seed(tenant_id)
+        )
+        if top is not None:
+            return wrap_response(start_time, data=_top_items(top))
+
+        async with read_session(tenant_id) as session:
             nodes_element = func.jsonb_array_elements(Event.payload["nodes"]).alias(
                 "node"
             )
@@ -382,14 +442,18 @@ async def wrapper_top_functions(
                 )
                 .group_by(node_name)
                 .order_by(func.count().desc())
-                .limit(10)
+                .limit(limit)
             )
+            if since:
+                stmt = stmt.where(Event.timestamp >= since)
             result = await session.execute(stmt)
-            data = [
-                {"name": row.name, "count": row.count}
-                for row in result.all()
-                if row.name is not None
-            ]
+            data = _top_items(
+                [
+                    (row.name, row.count, 0)
+                    for row in result.all()
+                    if row.name is not None
+                ]
+            )
 
         return wrap_response(start_time, data=data)
     except Exception as e:
@@ -397,18 +461,95 @@ async def wrapper_top_functions(
         return wrap_response(start_time, data=[])
 
 
+@router.get("/stats/top-failures", response_model=StandardDashboardResponse)
+async def wrapper_top_failures(
+    tenant_id: str = Query(...),
+    by: str = Query("failing_node", description="failing_node or fingerprint"),
+    window_minutes: Optional[int] = Query(
+        None, ge=1, description="Only count the last N minutes"
+    ),
+    limit: int = Query(10, ge=1, le=100),
+    capacity: Optional[int] = Query(
+        None, ge=1, description="Top-k summary size; smaller is cheaper but coarser"
+    ),
+    api_key: str = Depends(verify_api_key),
+):
+    start_time = time.perf_counter()
+    if tenant_id != api_key:
+        return wrap_response(start_time, error="Tenant mismatch!")
+    if by not in ("failing_node", "fingerprint"):
+        return wrap_response(start_time, error=f"Unknown dimension '{by}'")
+
+    try:
+        top = await heavy_hitters.top(
+            tenant_id, by, limit, _window_start(window_minutes), capacity
+        )
+        return wrap_response(start_time, data=_top_items(top or []))
+    except Exception as e:
+        logger.error(f"[DASHBOARD_EXT] Error in wrapper_top_failures: {str(e)}")
+        return wrap_response(start_time, data=[])
+
+
+@router.get("/stats/distinct", response_model=StandardDashboardResponse)
+async def wrapper_distinct(
+    tenant_id: str = Query(...),
+    dimension: str = Query(
+        "function", description=f"One of {', '.join(CARDINALITY_DIMENSIONS)}"
+    ),
+    start_time: Optional[datetime] = Query(
+        None, description="Range start; rounded down to the hour"
+    ),
+    end_time: Optional[datetime] = Query(None, description="Range end"),
+    api_key: str = Depends(verify_api_key),
+):
+    started = time.perf_counter()
+    if tenant_id != api_key:
+        return wrap_response(started, error="Tenant mismatch!")
+    if dimension not in CARDINALITY_DIMENSIONS:
+        return wrap_response(started, error=f"Unknown dimension '{dimension}'")
+
+    try:
+        count = await cardinality_store.distinct(
+            tenant_id, dimension, start_time, end_time
+        )
+        return wrap_response(
+            started,
+            data={
+                "dimension": dimension,
+                "estimate": count.estimate if count else 0,
+                "relative_error": round(cardinality_store.relative_error, 4),
+            },
+        )
+    except Exception as e:
+        logger.error(f"[DASHBOARD_EXT] Error in wrapper_distinct: {str(e)}")
+        return wrap_response(
+            started, data={"dimension": dimension, "estimate": 0, "relative_error": 0.0}
+        )
+
+
 @router.get("/stats/errors", response_model=StandardDashboardResponse)
 async def wrapper_errors(
-    request: Request,
     response: Response,
     tenant_id: str = Query(...),
+    window_minutes: Optional[int] = Query(
+        None, ge=1, description="Only count the last N minutes"
+    ),
     api_key: str = Depends(verify_api_key),
 ):
     start_time = time.perf_counter()
-    if getattr(request.app.state, "db_status", "unknown") != "connected":
-        response.headers["X-DB-Status"] = getattr(
-            request.app.state, "db_status", "unknown"
+    since = _window_start(window_minutes)
+    if since and tenant_id == api_key and hot_store.covers(tenant_id, since):
+        total, errors = hot_store.error_stats(
+            tenant_id, since, datetime.now(timezone.utc)
         )
+        rate = round(errors / total, 3) if total > 0 else 0.0
+        return wrap_response(
+            start_time,
+            data={"total_events": total, "error_events": errors, "error_rate": rate},
+        )
+
+    if not db_status.is_ready:
+        response.headers["X-DB-Status"] = "disconnected"
         return wrap_response(
             start_time, data={"total_events": 0, "error_events": 0, "error_rate": 0.0}
         )
@@ -417,13 +558,15 @@ async def wrapper_errors(
         return wrap_response(start_time, error="Tenant mismatch!")
 
     try:
-        async with async_session_maker() as session:
+        async with read_session(tenant_id) as session:
             stmt = select(
                 func.count().label("total_events"),
                 func.count(
                     func.nullif(Event.payload.op("->>")("status") != "FAILED", True)
                 ).label("error_events"),
             ).where(Event.tenant_id == tenant_id, Event.event_type == "execution_graph")
+            if since:
+                stmt = stmt.where(Event.timestamp >= since)
 
             result = await session.execute(stmt)
             row = result.first()
@@ -444,16 +587,13 @@ async def wrapper_errors(
 
 @router.get("/stats/durations", response_model=StandardDashboardResponse)
 async def wrapper_durations(
-    request: Request,
     response: Response,
     tenant_id: str = Query(...),
     api_key: str = Depends(verify_api_key),
 ):
     start_time = time.perf_counter()
-    if getattr(request.app.state, "db_status", "unknown") != "connected":
-        response.headers["X-DB-Status"] = getattr(
-            request.app.state, "db_status", "unknown"
-        )
+    if not db_status.is_ready:
+        response.headers["X-DB-Status"] = "disconnected"
         return wrap_response(
             start_time,
             data={
@@ -467,7 +607,7 @@ async def wrapper_durations(
         return wrap_response(start_time, error="Tenant mismatch!")
 
     try:
-        async with async_session_maker() as session:
+        async with read_session(tenant_id) as session:
             nodes_element = func.jsonb_array_elements(Event.payload["nodes"]).alias(
                 "node"
             )
@@ -0,0 +1,33 @@
+import logging
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core.auth import verify_auth
+from app.db.session import db_status
+from app.models.query import DiffPayload, DiffResponse
+from app.query.diff import ExecutionNotFound, diff_engine
+
+logger = logging.getLogger(__name__)
+router = APIRouter(tags=["diff"])
+
+
+@router.post("/diff", response_model=DiffResponse)
+async def diff_executions(
+    payload: DiffPayload, tenant_id: str = Depends(verify_auth)
+) -> DiffResponse:
+    """Compares two execution graphs subtree by subtree via their Merkle digests."""
+    if not db_status.is_ready:
+        raise HTTPException(status_code=503, detail="Database unavailable")
+
+    # tenant_id always comes from auth headers, not the request body
+    try:
+        result = await diff_engine.diff(
+            tenant_id, payload.execution_a, payload.execution_b
+        )
+    except ExecutionNotFound as e:
+        raise HTTPException(status_code=404, detail=f"Execution '{e}' not found")
+    except SQLAlchemyError as e:
+        logger.error(f"Diff failed tenant={tenant_id}: {e}")
+        raise HTTPException(status_code=500, detail="Diff failed")
+    return DiffResponse(**result)
@@ -0,0 +1,66 @@
+import logging
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from app.core.auth import verify_auth
+from app.query.export import (
+    EXPORT_FORMATS,
+    ExportError,
+    build_export_query,
+    stream_export,
+)
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/export", tags=["export"])
+
+
+@router.get("/{resource}")
+async def export_resource(
+    resource: str,
+    format: str = Query("ndjson", description="ndjson, csv or arrow (Arrow IPC)"),
+    columns: Optional[str] = Query(
+        None,
+        description="Comma-separated projection; events also accept payload.<key>",
+    ),
+    start_time: Optional[datetime] = Query(None, description="Inclusive lower bound"),
+    end_time: Optional[datetime] = Query(None, description="Inclusive upper bound"),
+    tenant_id: str = Depends(verify_auth),
+) -> StreamingResponse:
+    """Streams a full tenant time range straight off a server-side cursor."""
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unknown format '{format}'")
+    if format == "arrow":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise HTTPException(
+                status_code=501, detail="Arrow export requires pyarrow on the server"
+            )
+
+    try:
+        stmt, layout = build_export_query(
+            tenant_id,
+            resource,
+            columns=[c.strip() for c in columns.split(",") if c.strip()]
+            if columns
+            else None,
+            start_time=start_time,
+            end_time=end_time,
+        )
+    except ExportError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    logger.info(
+        f"Export started tenant={tenant_id} resource={resource} format={format}"
+    )
+    extension = "arrows" if format == "arrow" else format
+    return StreamingResponse(
+        stream_export(stmt, layout, format),
+        media_type=EXPORT_FORMATS[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{resource}.{extension}"'
+        },
+    )
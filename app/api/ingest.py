@@ -1,21 +1,32 @@
 import asyncio
 import logging
+import time
+from collections import Counter
 from typing import List
 from fastapi import APIRouter, HTTPException, status, Depends, Response
 from app.core.auth import verify_auth
+from app.core.metrics import (
+    ingest_commit_latency_seconds,
+    ingest_flush_batch_size,
+    queue_depth,
+)
+from app.core.profiling import timed_span
+from app.core.scheduler import query_context
 from app.schemas.execution import ExecutionEventCreate
 from app.models.execution import ExecutionEvent
 from app.db.session import async_session_maker, db_status
+from app.query.counts import total_counter
+from app.services.heavy_hitters import heavy_hitters
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-# In-memory queue for graceful degradation
+# In-memory queue for graceful degradation; items are (enqueued_at, event)
 ingestion_queue = asyncio.Queue()
-
-# Limit concurrent inserts to 10 to respect the connection pool bounds (pool=5, max_overflow=10)
-CONN_SEMAPHORE = asyncio.Semaphore(10)
+queue_depth.track(["ingest_api"], ingestion_queue.qsize)
+_commit_latency = ingest_commit_latency_seconds.labels("api")
+_batch_size = ingest_flush_batch_size.labels("api")
 
 
 async def _insert_single_event_with_session(event_in: ExecutionEventCreate, session):
@@ -25,6 +36,14 @@ async def _insert_single_event_with_session(event_in: ExecutionEventCreate, sess
     session.add(db_event)
 
 
+def _observe_flushed(batch) -> None:
+    committed = time.monotonic()
+    _batch_size.observe(len(batch))
+    for enqueued_at, ev in batch:
+        _commit_latency.observe(committed - enqueued_at)
+        heavy_hitters.observe(ev.tenant_id, "function", ev.function_name, ev.timestamp)
+
+
 async def ingestion_worker_task():
     while True:
         try:
@@ -33,24 +52,43 @@ async def ingestion_worker_task():
                 batch.append(await ingestion_queue.get())
 
             if batch and db_status.is_ready:
-                async with CONN_SEMAPHORE:
+                # Pool bounds are enforced by the session scheduler; flush as ingest
+                with (
+                    query_context(priority="ingest"),
+                    timed_span("ingest_flush", root=True),
+                ):
                     try:
                         async with async_session_maker() as session:
-                            for event_in in batch:
+                            for _, event_in in batch:
                                 await _insert_single_event_with_session(
                                     event_in, session
                                 )
+                            await total_counter.increment(
+                                session,
+                                Counter(
+                                    (ev.tenant_id, "execution_events")
+                                    for _, ev in batch
+                                ),
+                            )
                             await session.commit()
                             logger.info(
                                 f"Background worker flushed {len(batch)} events to DB"
                             )
                     except Exception as e:
                         logger.error(f"Background worker failed to flush events: {e}")
-                        for ev in batch:
-                            await ingestion_queue.put(ev)
+                        for item in batch:
+                            await ingestion_queue.put(item)
+                    else:
+                        # Committed: a failure here must not re-queue the batch
+                        try:
+                            _observe_flushed(batch)
+                        except Exception as e:
+                            logger.error(
+                                f"Background worker post-flush metrics failed: {e}"
+                            )
             elif batch and not db_status.is_ready:
-                for ev in batch:
-                    await ingestion_queue.put(ev)
+                for item in batch:
+                    await ingestion_queue.put(item)
 
             await asyncio.sleep(1)
         except asyncio.CancelledError:
@@ -71,13 +109,14 @@ async def ingest_events(
 
     from datetime import datetime, timezone
 
+    enqueued_at = time.monotonic()
     for evt in events:
         # Stamp tenant_id and timestamp server-side if client omitted them
         if not evt.tenant_id:
             evt.tenant_id = tenant_id
         if not evt.timestamp:
             evt.timestamp = datetime.now(timezone.utc)
-        await ingestion_queue.put(evt)
+        await ingestion_queue.put((enqueued_at, evt))
 
     logger.info(f"Queued {len(events)} events for tenant {tenant_id}")
 
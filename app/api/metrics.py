@@ -1,11 +1,23 @@
-from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi import APIRouter, Depends, Query, HTTPException, Response
 from typing import Dict, Any, Optional
 from datetime import datetime
 
 from app.api.auth import verify_api_key
+from app.core.config import settings
+from app.core.metrics import CONTENT_TYPE, registry
 from app.query.timeseries import aggregate_timeseries
 
 router = APIRouter(prefix="/v1/metrics", tags=["metrics"])
+# Unauthenticated like /health, for the Prometheus scraper
+exposition_router = APIRouter(tags=["metrics"])
+
+
+@exposition_router.get("/metrics", include_in_schema=False)
+async def openmetrics_exposition() -> Response:
+    """Process metrics in OpenMetrics text format."""
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled.")
+    return Response(content=registry.render(), media_type=CONTENT_TYPE)
 
 
 @router.get("/timeseries")
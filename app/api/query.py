@@ -1,15 +1,21 @@
 import logging
-from fastapi import APIRouter, Depends, Response
-from sqlalchemy import select, func, desc
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy import select
 from app.core.auth import verify_auth
+from app.core.pagination import InvalidCursorError, apply_keyset, paginate
+from app.core.responses import ModelJSONResponse
 from app.db.session import async_session_maker, db_status
 from app.models.execution import ExecutionEvent
+from app.query.counts import total_counter
 from app.schemas.query import QueryRequest, QueryResponse
 from app.schemas.execution import ExecutionEventResponse
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Response item columns, read straight off the ORM rows
+_ITEM_FIELDS = tuple(ExecutionEventResponse.model_fields)
+
 
 @router.post("/query", response_model=QueryResponse)
 async def query_events(
@@ -48,22 +54,63 @@ async def query_events(
                     ExecutionEvent.function_name.ilike(f"%{request.query}%")
                 )
 
-            # Total count query for identical filter set
-            count_query = select(func.count()).select_from(query.subquery())
-            total_result = await session.execute(count_query)
-            total_count = total_result.scalar() or 0
+            # Total for the identical filter set: the tenant counter when
+            # unfiltered, otherwise the planner estimate (count(*) if small)
+            filtered = any(
+                (
+                    request.start_time,
+                    request.end_time,
+                    request.function_name,
+                    request.status,
+                    request.query,
+                )
+            )
+            if filtered:
+                total = await total_counter.filtered_total(
+                    session, query, exact=request.exact_total
+                )
+            else:
+                total = await total_counter.unfiltered_total(
+                    tenant_id,
+                    "execution_events",
+                    ExecutionEvent,
+                    exact=request.exact_total,
+                )
 
-            # Pagination & Ordering query
-            query = query.order_by(desc(ExecutionEvent.timestamp))
-            query = query.offset(request.offset).limit(request.limit)
+            # Keyset pagination & ordering; OFFSET only for cursor-less clients
+            scope = f"v1-query:{tenant_id}"
+            query = apply_keyset(
+                query,
+                [ExecutionEvent.timestamp, ExecutionEvent.id],
+                request.cursor,
+                scope,
+            ).limit(request.limit + 1)
+            if request.offset and not request.cursor:
+                query = query.offset(request.offset)
 
             result = await session.execute(query)
-            events = result.scalars().all()
+            events, next_cursor = paginate(
+                result.scalars().all(),
+                request.limit,
+                scope,
+                key=lambda e: (e.timestamp, e.id),
+            )
 
-            return QueryResponse(
-                items=[ExecutionEventResponse.model_validate(e) for e in events],
-                total=total_count,
+            # Rows are already the response shape: skip per-item model
+            # validation and encode once (QueryResponse documents it)
+            return ModelJSONResponse(
+                {
+                    "items": [
+                        {field: getattr(e, field) for field in _ITEM_FIELDS}
+                        for e in events
+                    ],
+                    "total": total.value,
+                    "total_exact": total.exact,
+                    "next_cursor": next_cursor,
+                }
             )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error querying events: {e}")
         response.headers["X-DB-Status"] = "error"
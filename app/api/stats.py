@@ -4,6 +4,7 @@ from sqlalchemy import select, func, desc
 from app.core.auth import verify_auth
 from app.db.session import async_session_maker, db_status
 from app.models.execution import ExecutionEvent
+from app.services.heavy_hitters import bucket_column, heavy_hitters
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -52,6 +53,22 @@ async def get_error_stats(response: Response, tenant_id: str = Depends(verify_au
         return {"total_events": 0, "error_events": 0, "error_rate": 0.0}
 
 
+def _function_seed(tenant_id: str):
+    """Stored function names per top-k bucket, backfilling summaries that start at deploy."""
+
+    def seed(before, bucket_seconds: int):
+        bucket = bucket_column(ExecutionEvent.timestamp, bucket_seconds)
+        return (
+            select(ExecutionEvent.function_name, bucket, func.count())
+            .where(ExecutionEvent.tenant_id == tenant_id)
+            .where(ExecutionEvent.function_name.isnot(None))
+            .where(ExecutionEvent.timestamp < before)
+            .group_by(ExecutionEvent.function_name, bucket)
+        )
+
+    return seed
+
+
 @router.get("/stats/top-functions")
 async def get_top_functions(response: Response, tenant_id: str = Depends(verify_auth)):
     if not db_status.is_ready:
@@ -59,6 +76,16 @@ async def get_top_functions(response: Response, tenant_id: str = Depends(verify_
         return []
 
     try:
+        # Served from the ingest-maintained top-k summary once one exists
+        top = await heavy_hitters.top(
+            tenant_id, "function", 10, seed=_function_seed(tenant_id)
+        )
+        if top is not None:
+            return [
+                {"function_name": name, "count": count, "error": error}
+                for name, count, error in top
+            ]
+
         async with async_session_maker() as session:
             stmt = (
                 select(
@@ -75,8 +102,9 @@ async def get_top_functions(response: Response, tenant_id: str = Depends(verify_
 
             functions = []
             for row in result:
+                # Exact counts, so the error bound is zero
                 functions.append(
-                    {"function_name": row.function_name, "count": row.count}
+                    {"function_name": row.function_name, "count": row.count, "error": 0}
                 )
 
             return functions
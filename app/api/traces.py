@@ -2,9 +2,11 @@ from fastapi import APIRouter, Depends, Query, HTTPException, Path
 from typing import Dict, Any, Optional
 
 from app.api.auth import verify_api_key
-from app.query.traces import get_trace, list_traces
+from app.core.pagination import InvalidCursorError
+from app.query.trace_tree import TRACE_TREE_ORDERS
+from app.query.traces import get_trace, get_trace_tree, list_traces
 
-router = APIRouter(prefix="/v1/traces", tags=["traces"])
+router = APIRouter(prefix="/traces", tags=["traces"])
 
 
 @router.get("")
@@ -15,16 +17,25 @@ async def list_recent_traces(
         ge=1,
         le=100,
     ),
-    offset: int = Query(0, description="Pagination displacement slice offset", ge=0),
+    offset: int = Query(
+        0,
+        description="Deprecated displacement offset, ignored when cursor is set",
+        ge=0,
+    ),
     status: Optional[str] = Query(None, description="Optional status filtering"),
+    cursor: Optional[str] = Query(
+        None, description="Opaque next_cursor returned by the previous page"
+    ),
     api_key: str = Depends(verify_api_key),
 ) -> Dict[str, Any]:
     """Lists bounded executions sequentially natively masking trace bounds across limits correctly."""
     try:
         items = await list_traces(
-            tenant_id=api_key, limit=limit, offset=offset, status=status
+            tenant_id=api_key, limit=limit, offset=offset, status=status, cursor=cursor
         )
-        return {"items": items}
+        return {"items": items, "next_cursor": items.next_cursor}
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -33,7 +44,7 @@ async def list_recent_traces(
 async def get_specific_trace(
     trace_id: str = Path(
         ...,
-        description="Target execution trace graph ID natively tracking execution context",
+        description="Event id from GET /traces, or the execution_id sent at ingest",
     ),
     api_key: str = Depends(verify_api_key),
 ) -> Dict[str, Any]:
@@ -47,3 +58,42 @@ async def get_specific_trace(
         )
 
     return {"trace": result}
+
+
+@router.get("/{trace_id}/tree")
+async def get_specific_trace_tree(
+    trace_id: str = Path(
+        ..., description="Event id from GET /traces, or the execution_id sent at ingest"
+    ),
+    node: Optional[str] = Query(
+        None, description="Node id whose subtree to page; whole trace when omitted"
+    ),
+    depth: Optional[int] = Query(
+        None, ge=0, description="Levels below the subtree root to include"
+    ),
+    order: str = Query("tree", description="tree (preorder) or timeline"),
+    limit: int = Query(500, ge=1, le=5000, description="Nodes per page"),
+    cursor: Optional[str] = Query(
+        None, description="Opaque next_cursor returned by the previous page"
+    ),
+    api_key: str = Depends(verify_api_key),
+) -> Dict[str, Any]:
+    """Serves the ingest-materialized tree: depths, timings and critical path ready to render."""
+    if order not in TRACE_TREE_ORDERS:
+        raise HTTPException(status_code=400, detail=f"Unknown order '{order}'")
+    try:
+        result = await get_trace_tree(
+            tenant_id=api_key,
+            trace_id=trace_id,
+            node_id=node,
+            max_depth=depth,
+            order=order,
+            limit=limit,
+            cursor=cursor,
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if not result:
+        raise HTTPException(status_code=404, detail="Trace or node not found")
+    return result
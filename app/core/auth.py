@@ -1,7 +1,9 @@
+import hmac
 import logging
 from typing import Optional
 from fastapi import Header, HTTPException, status
 from app.core.config import settings
+from app.core.profiling import timed_span
 
 logger = logging.getLogger(__name__)
 
@@ -14,25 +16,46 @@ async def verify_auth(
     Dependency to verify API Key and Tenant ID headers.
     Returns the validated tenant ID on success.
     """
-    if not settings.API_KEY or not settings.TENANT:
-        logger.warning(
-            "Authentication settings (API_KEY, TENANT) are not properly configured. "
-            "Accepting request, but this is unsafe for production."
-        )
-        return x_tenant_id or "unknown"
+    with timed_span("auth"):
+        if not settings.API_KEY or not settings.TENANT:
+            logger.warning(
+                "Authentication settings (API_KEY, TENANT) are not properly configured. "
+                "Accepting request, but this is unsafe for production."
+            )
+            return x_tenant_id or "unknown"
+
+        if (
+            x_api_key == "demo-key"
+            and x_tenant_id == "demo-tenant"
+            and settings.API_KEY == "demo-key"
+            and settings.TENANT == "demo-tenant"
+        ):
+            return x_tenant_id
+
+        if x_api_key != settings.API_KEY or x_tenant_id != settings.TENANT:
+            logger.warning(f"Unauthorized access attempt for tenant: {x_tenant_id}")
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid API key or tenant",
+            )
 
-    if (
-        x_api_key == "demo-key"
-        and x_tenant_id == "demo-tenant"
-        and settings.API_KEY == "demo-key"
-        and settings.TENANT == "demo-tenant"
-    ):
         return x_tenant_id
 
-    if x_api_key != settings.API_KEY or x_tenant_id != settings.TENANT:
-        logger.warning(f"Unauthorized access attempt for tenant: {x_tenant_id}")
+
+async def verify_admin(
+    x_admin_key: Optional[str] = Header(None, alias="X-Admin-Key"),
+) -> None:
+    """
+    Dependency guarding the admin routes with their own key.
+    Unlike verify_auth it never falls open: without ADMIN_API_KEY the routes do not exist.
+    """
+    if not settings.ADMIN_API_KEY:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if x_admin_key is None or not hmac.compare_digest(
+        x_admin_key.encode(), settings.ADMIN_API_KEY.encode()
+    ):
+        logger.warning("Unauthorized admin access attempt")
         raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid API key or tenant"
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid admin key",
         )
-
-    return x_tenant_id
@@ -1,3 +1,5 @@
+from typing import Dict
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -7,6 +9,92 @@ class Settings(BaseSettings):
     API_KEY: str = "demo-key"
     TENANT: str = "demo-tenant"
     ENV: str = "development"
+    # X-Admin-Key for /v1/admin; the admin routes answer 404 while it is empty
+    ADMIN_API_KEY: str = ""
+    # Signs pagination cursors; falls back to a key derived from API_KEY when unset
+    CURSOR_SECRET: str = ""
+    # Parquet cold tier for aged events; tiering stays off while the directory is unset
+    COLD_STORAGE_DIR: str = ""
+    COLD_TIER_AFTER_DAYS: int = 30
+    COLD_TIER_INTERVAL_SECONDS: int = 3600
+    # In-process hot window of recently ingested events; 0 disables it.
+    # Only for single-worker deployments: each worker sees only its own ingest
+    HOT_WINDOW_MINUTES: int = 0
+    HOT_WINDOW_MAX_BYTES: int = 64 * 1024 * 1024
+    # LRU of decoded execution graphs served by StorageService.get_execution
+    GRAPH_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+    # Ingest-maintained payload field catalog, persisted on this interval
+    SCHEMA_CATALOG_FLUSH_SECONDS: int = 30
+    # Space-Saving top-k summaries; counts overshoot by at most total/CAPACITY
+    HEAVY_HITTERS_CAPACITY: int = 256
+    HEAVY_HITTERS_BUCKET_SECONDS: int = 3600
+    HEAVY_HITTERS_FLUSH_SECONDS: int = 30
+    HEAVY_HITTERS_RETENTION_DAYS: int = 30
+    # HyperLogLog distinct counts; 2**PRECISION registers, ~1.04/sqrt(2**p) error
+    CARDINALITY_PRECISION: int = 12
+    CARDINALITY_FLUSH_SECONDS: int = 30
+    CARDINALITY_RETENTION_DAYS: int = 90
+    # The single primary pool; each workload keeps its reserved connections and
+    # the rest of POOL_SIZE + MAX_OVERFLOW is shared burst capacity
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 10.0
+    DB_CONNECT_TIMEOUT_SECONDS: float = 30.0
+    # Serving statements (ingest, query, stream) give up after this; 0 disables.
+    # Exports use their own sub-pool and timeout; DDL and tiering run without one
+    DB_COMMAND_TIMEOUT_SECONDS: float = 5.0
+    DB_EXPORT_POOL_SIZE: int = 2
+    DB_EXPORT_COMMAND_TIMEOUT_SECONDS: float = 0.0
+    DB_POOL_RESERVED: Dict[str, int] = {
+        "ingest": 4,
+        "query": 4,
+        "background": 2,
+        "stream": 1,
+    }
+    # Fair queueing of DB sessions; queued sessions give up after the timeout
+    QUERY_SCHEDULER_ENABLED: bool = True
+    QUERY_QUEUE_TIMEOUT_SECONDS: float = 10.0
+    # Relative share of queued DB sessions per tenant, default 1.0
+    QUERY_TENANT_WEIGHTS: Dict[str, float] = {}
+    # Comma-separated read replica URLs; reads tolerating MAX_LAG go to the freshest idle one
+    DATABASE_REPLICA_URLS: str = ""
+    REPLICA_MAX_LAG_SECONDS: float = 5.0
+    REPLICA_CHECK_INTERVAL_SECONDS: int = 5
+    # OpenMetrics at /metrics; label sets past MAX_SERIES per metric fold into "_other"
+    METRICS_ENABLED: bool = True
+    METRICS_MAX_SERIES: int = 500
+    # In-process statement stats; slower statements are logged, throttled per fingerprint
+    STATEMENT_STATS_MAX: int = 1000
+    DB_SLOW_STATEMENT_MS: float = 250.0
+    DB_SLOW_STATEMENT_LOG_INTERVAL_SECONDS: float = 10.0
+    # Requests signed with this secret in X-Profile run under a profiler; empty disables it
+    PROFILING_SECRET: str = ""
+    PROFILING_REQUEST_LINES: int = 60
+    PROFILING_MAX_SECONDS: int = 60
+    # Logs go through a bounded queue to a writer thread; past BURST lines per call site
+    # per window only 1 in SAMPLE_EVERY is kept (0 keeps none, BURST=0 disables limiting)
+    LOG_LEVEL: str = "INFO"
+    LOG_JSON: bool = True
+    LOG_QUEUE_SIZE: int = 10000
+    LOG_RATE_LIMIT_BURST: int = 10
+    LOG_RATE_LIMIT_WINDOW_SECONDS: float = 1.0
+    LOG_SAMPLE_EVERY: int = 100
+    LOG_RATE_LIMIT_MAX_KEYS: int = 10000
+    # Opt-in self-observability: a SAMPLE_RATE share of requests and ingest flushes is
+    # ingested as execution graphs into TENANT through a low-priority background lane
+    SELF_TRACE_ENABLED: bool = False
+    SELF_TRACE_TENANT: str = "temporallayr-self"
+    SELF_TRACE_SAMPLE_RATE: float = 0.01
+    SELF_TRACE_MAX_NODES: int = 500
+    SELF_TRACE_QUEUE_SIZE: int = 1000
+    SELF_TRACE_BATCH_SIZE: int = 200
+    SELF_TRACE_FLUSH_SECONDS: float = 5.0
+    # Event loop lag probe; stalls past SLOW_CALLBACK_MS are logged with the blocking coroutine
+    LOOP_MONITOR_INTERVAL_SECONDS: float = 0.25
+    LOOP_SLOW_CALLBACK_MS: float = 100.0
+    LOOP_CENSUS_INTERVAL_SECONDS: float = 5.0
+    # Requests get 503 while measured loop lag exceeds this; 0 disables shedding
+    LOOP_SHED_LAG_MS: float = 0.0
 
     model_config = SettingsConfigDict(env_file=".env")
 
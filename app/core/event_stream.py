@@ -1,6 +1,9 @@
 import asyncio
+import logging
 from typing import Any, AsyncGenerator
 
+logger = logging.getLogger("temporallayr.event_stream")
+
 # Fan-out pub/sub: each subscriber gets its own queue.
 # Events published here are broadcast to ALL active subscribers independently.
 _subscribers: list[asyncio.Queue] = []
@@ -19,7 +22,7 @@ class EventStream:
         """Broadcast an event to all active subscribers."""
         for q in list(_subscribers):  # snapshot to avoid mutation during iteration
             await q.put(event)
-        print("[STREAM] event published")
+        logger.debug("[STREAM] event published")
 
     async def subscribe(self) -> AsyncGenerator[Any, None]:
         """Async generator: register a subscriber queue, yield events, clean up on exit."""
@@ -33,7 +36,7 @@ class EventStream:
             # Client disconnected cleanly
             pass
         except Exception as e:
-            print(f"[STREAM] subscriber error: {e}")
+            logger.warning(f"[STREAM] subscriber error: {e}")
         finally:
             try:
                 _subscribers.remove(q)
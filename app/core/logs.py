@@ -0,0 +1,155 @@
+import atexit
+import copy
+import logging
+import logging.handlers
+import queue
+import sys
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.core.metrics import log_records_dropped
+from app.core.responses import dumps
+
+# Attributes every LogRecord has; anything else came in through `extra=`
+_RECORD_ATTRS = frozenset(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+_traceback_formatter = logging.Formatter()
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, message, then any `extra=` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+        return dumps(entry).decode()
+
+
+class _Window:
+    __slots__ = ("start", "seen", "suppressed")
+
+    def __init__(self, start: float):
+        self.start = start
+        self.seen = 0
+        self.suppressed = 0
+
+
+class SamplingFilter(logging.Filter):
+    """Rate limit per key: LOG_RATE_LIMIT_BURST lines per window, then 1 in LOG_SAMPLE_EVERY.
+
+    The key is `extra={"log_key": ...}` when given, else the call site, so
+    an f-string logged in a loop counts as one message however its text
+    varies. The next line let through for a key carries `suppressed`, the
+    number dropped since the previous one. Runs in the calling thread
+    before enqueueing, so dropped lines cost no formatting or I/O.
+    """
+
+    def __init__(self, burst: int, window: float, sample_every: int):
+        super().__init__()
+        self.burst = burst
+        self.window = window
+        self.sample_every = sample_every
+        self._windows: Dict[Tuple, _Window] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = getattr(record, "log_key", None) or (record.pathname, record.lineno)
+        now = record.created
+        state = self._windows.get(key)
+        if state is None:
+            if len(self._windows) >= settings.LOG_RATE_LIMIT_MAX_KEYS:
+                self._windows.clear()
+            state = self._windows[key] = _Window(now)
+        elif now - state.start >= self.window:
+            state.start = now
+            state.seen = 0
+
+        state.seen += 1
+        over = state.seen - self.burst
+        if over > 0 and (not self.sample_every or over % self.sample_every):
+            state.suppressed += 1
+            log_records_dropped.labels("rate_limited").inc()
+            return False
+        if state.suppressed:
+            record.suppressed = state.suppressed
+            state.suppressed = 0
+        return True
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Drops (and counts) records rather than blocking when the writer falls behind."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve args and tracebacks here, since they may not outlive the
+        # caller, but leave JSON formatting to the listener thread
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _traceback_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            log_records_dropped.labels("queue_full").inc()
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def setup_logging() -> None:
+    """Route the root logger through a bounded queue to a background writer thread."""
+    global _listener
+    if _listener is not None:
+        return
+
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(
+        JSONFormatter()
+        if settings.LOG_JSON
+        else logging.Formatter("%(levelname)s:%(name)s:%(message)s")
+    )
+    handler = _QueueHandler(queue.Queue(settings.LOG_QUEUE_SIZE))
+    if settings.LOG_RATE_LIMIT_BURST > 0:
+        handler.addFilter(
+            SamplingFilter(
+                settings.LOG_RATE_LIMIT_BURST,
+                settings.LOG_RATE_LIMIT_WINDOW_SECONDS,
+                settings.LOG_SAMPLE_EVERY,
+            )
+        )
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(settings.LOG_LEVEL.upper())
+
+    _listener = logging.handlers.QueueListener(handler.queue, output)
+    _listener.start()
+    atexit.register(stop_logging)
+
+
+def stop_logging() -> None:
+    """Flush queued records and stop the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
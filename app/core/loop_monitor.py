@@ -0,0 +1,227 @@
+import asyncio
+import inspect
+import logging
+import sys
+import threading
+import time
+from collections import Counter, deque
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.metrics import (
+    load_shed_requests,
+    loop_lag_seconds,
+    loop_slow_callbacks,
+    tasks_pending,
+)
+from app.core.sketches import QuantileSketch
+
+logger = logging.getLogger("temporallayr.loop_monitor")
+
+# Paths still served while shedding, so probes and operators can see why
+SHED_EXEMPT_PREFIXES = ("/health", "/metrics", "/v1/admin")
+# Stalls kept for the admin endpoint
+_RECENT_STALLS = 50
+_STACK_FRAMES = 8
+
+
+def task_origin(task: asyncio.Future) -> str:
+    """Qualified name of the coroutine a task was created for, e.g. `StreamManager._heartbeat_loop`."""
+    get_coro = getattr(task, "get_coro", None)
+    coro = get_coro() if get_coro else None
+    if coro is None:
+        return type(task).__name__
+    return getattr(coro, "__qualname__", type(coro).__name__)
+
+
+def _stall_site(frame) -> Dict[str, Any]:
+    """Outermost coroutine (the task that holds the loop) and the innermost frames."""
+    coroutine = None
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        if len(stack) < _STACK_FRAMES:
+            stack.append(f"{code.co_qualname} ({code.co_filename}:{frame.f_lineno})")
+        if code.co_flags & inspect.CO_COROUTINE:
+            coroutine = code.co_qualname
+        frame = frame.f_back
+    return {"coroutine": coroutine or "callback", "stack": stack}
+
+
+class LoopMonitor:
+    """Event-loop health: scheduling lag, stalls and a census of pending tasks.
+
+    Lag is how late a sleep of LOOP_MONITOR_INTERVAL_SECONDS wakes up. Stalls
+    come from a watchdog thread that pings the loop; when a ping goes
+    unanswered for LOOP_SLOW_CALLBACK_MS it reads the loop thread's stack,
+    naming the coroutine that is holding the loop even under uvloop, where
+    asyncio's debug-mode slow callback log does not apply.
+    """
+
+    def __init__(self):
+        self.lag = 0.0
+        self.max_lag = 0.0
+        self.sketch = QuantileSketch()
+        self.stalls: deque = deque(maxlen=_RECENT_STALLS)
+        self.stall_count = 0
+        self.shed = 0
+        self.census: Dict[str, int] = {}
+        self.census_at: Optional[float] = None
+        self.since = time.time()
+        self._stop = threading.Event()
+
+    @property
+    def overloaded(self) -> bool:
+        limit = settings.LOOP_SHED_LAG_MS
+        return limit > 0 and self.lag * 1000 > limit
+
+    def observe_lag(self, lag: float) -> None:
+        self.lag = lag
+        if lag > self.max_lag:
+            self.max_lag = lag
+        self.sketch.add(lag)
+        loop_lag_seconds.observe(lag)
+
+    def take_census(self, loop: asyncio.AbstractEventLoop) -> Dict[str, int]:
+        """Pending tasks per origin; origins seen before and now empty report 0."""
+        counts = Counter(task_origin(t) for t in asyncio.all_tasks(loop))
+        for origin in self.census:
+            tasks_pending.labels(origin).set(0)
+        for origin, n in counts.items():
+            tasks_pending.labels(origin).set(n)
+        self.census = dict(counts.most_common())
+        self.census_at = time.time()
+        return self.census
+
+    def _record_stall(self, site: Dict[str, Any], blocked: float) -> None:
+        self.stall_count += 1
+        loop_slow_callbacks.labels(site["coroutine"]).inc()
+        self.stalls.append(
+            {"at": time.time(), "blocked_ms": round(blocked * 1000, 1), **site}
+        )
+        logger.warning(
+            f"[LOOP] blocked {blocked * 1000:.0f}ms in {site['coroutine']} "
+            f"at {site['stack'][0] if site['stack'] else '?'}"
+        )
+
+    def _watchdog(self, loop: asyncio.AbstractEventLoop, thread_id: int) -> None:
+        threshold = settings.LOOP_SLOW_CALLBACK_MS / 1000
+        while not self._stop.wait(
+            max(threshold, settings.LOOP_MONITOR_INTERVAL_SECONDS)
+        ):
+            pong = threading.Event()
+            sent = time.perf_counter()
+            try:
+                loop.call_soon_threadsafe(pong.set)
+            except RuntimeError:
+                return  # loop closed
+            if pong.wait(threshold):
+                continue
+            frame = sys._current_frames().get(thread_id)
+            site = _stall_site(frame)
+            while not pong.wait(threshold) and not self._stop.is_set():
+                pass
+            blocked = time.perf_counter() - sent
+            try:
+                loop.call_soon_threadsafe(self._record_stall, site, blocked)
+            except RuntimeError:
+                return
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        interval = settings.LOOP_MONITOR_INTERVAL_SECONDS
+        census_every = max(1, round(settings.LOOP_CENSUS_INTERVAL_SECONDS / interval))
+        if settings.LOOP_SLOW_CALLBACK_MS > 0:
+            self._stop.clear()
+            threading.Thread(
+                target=self._watchdog,
+                args=(loop, threading.get_ident()),
+                name="loop-watchdog",
+                daemon=True,
+            ).start()
+        try:
+            tick = 0
+            while True:
+                start = loop.time()
+                await asyncio.sleep(interval)
+                self.observe_lag(max(0.0, loop.time() - start - interval))
+                tick += 1
+                if tick % census_every == 0:
+                    self.take_census(loop)
+        finally:
+            self._stop.set()
+
+    def reset(self) -> None:
+        self.max_lag = 0.0
+        self.sketch = QuantileSketch()
+        self.stalls.clear()
+        self.stall_count = 0
+        self.shed = 0
+        self.since = time.time()
+
+    def stats(self) -> Dict[str, Any]:
+        def ms(seconds):
+            return None if seconds is None else round(seconds * 1000, 3)
+
+        return {
+            "lag_ms": ms(self.lag),
+            "max_lag_ms": ms(self.max_lag),
+            "p50_lag_ms": ms(self.sketch.quantile(0.5)),
+            "p99_lag_ms": ms(self.sketch.quantile(0.99)),
+            "samples": self.sketch.count,
+            "overloaded": self.overloaded,
+            "shed_requests": self.shed,
+            "stalls": self.stall_count,
+            "since": self.since,
+        }
+
+    def recent_stalls(self) -> List[Dict[str, Any]]:
+        return list(reversed(self.stalls))
+
+
+async def loop_monitor_task():
+    """Background lag probe, stall watchdog and task census for the serving loop."""
+    logger.info(
+        f"[LOOP] monitoring every {settings.LOOP_MONITOR_INTERVAL_SECONDS}s, "
+        f"stalls over {settings.LOOP_SLOW_CALLBACK_MS}ms"
+    )
+    await loop_monitor.run()
+
+
+class LoadShedMiddleware:
+    """Pure ASGI: answers 503 while loop lag exceeds LOOP_SHED_LAG_MS.
+
+    Health, metrics and admin paths are always served. Shedding at the edge
+    keeps an overloaded loop from taking on work it would finish too late.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or not loop_monitor.overloaded
+            or scope["path"].startswith(SHED_EXEMPT_PREFIXES)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        loop_monitor.shed += 1
+        load_shed_requests.inc()
+        body = b'{"detail":"Server overloaded, retry shortly"}'
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", b"1"),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+
+loop_monitor = LoopMonitor()
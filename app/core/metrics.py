@@ -0,0 +1,351 @@
+import logging
+import math
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger("temporallayr.metrics")
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+PREFIX = "temporallayr_"
+# Label value that absorbs new series once a metric holds METRICS_MAX_SERIES
+OVERFLOW = "_other"
+
+LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+# Enqueue-to-commit spans the flush interval, so it needs a longer tail
+DELIVERY_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0)
+SIZE_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if isinstance(value, int):
+        return str(value)
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+
+class _GaugeChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        self.value -= amount
+
+
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        # Non-cumulative per bucket; the last slot is +Inf
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    def time(self) -> "_Timer":
+        return _Timer(self)
+
+
+class _Timer:
+    __slots__ = ("child", "start")
+
+    def __init__(self, child: _HistogramChild):
+        self.child = child
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.child.observe(time.perf_counter() - self.start)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = PREFIX + name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        registry.register(self)
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values) -> object:
+        """Series for these label values; hot paths should keep the returned child."""
+        child = self._children.get(values)
+        if child is None:
+            key = tuple(str(v) for v in values)
+            child = self._children.get(key)
+        if child is None:
+            if len(self._children) >= settings.METRICS_MAX_SERIES:
+                key = (OVERFLOW,) * len(self.labelnames)
+                child = self._children.get(key)
+            if child is None:
+                child = self._children[key] = self._new_child()
+        return child
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# TYPE {self.name} {self.kind}",
+            f"# HELP {self.name} {_escape(self.documentation)}",
+        ]
+        return lines + self.samples()
+
+
+class Counter(_Metric):
+    """Monotonic count; exposed as `<name>_total`."""
+
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1) -> None:
+        self.labels().inc(amount)
+
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}_total{_labels(self.labelnames, key)} {_number(child.value)}"
+            for key, child in list(self._children.items())
+        ]
+
+
+class Gauge(_Metric):
+    """Point-in-time value, either set directly or read from a callback at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._callbacks: Dict[Tuple[str, ...], Callable[[], float]] = {}
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+    def track(self, values: Sequence[str], read: Callable[[], float]) -> None:
+        """Report `read()` for these label values on every scrape."""
+        self._callbacks[tuple(values)] = read
+
+    def samples(self) -> List[str]:
+        values = {key: child.value for key, child in list(self._children.items())}
+        for key, read in list(self._callbacks.items()):
+            try:
+                values[key] = read()
+            except Exception as e:
+                logger.warning(f"[METRICS] {self.name}{key} callback failed: {e}")
+        return [
+            f"{self.name}{_labels(self.labelnames, key)} {_number(value)}"
+            for key, value in values.items()
+        ]
+
+
+class Histogram(_Metric):
+    """Fixed-bucket distribution; one list increment and one add per observation."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def time(self) -> _Timer:
+        return self.labels().time()
+
+    def samples(self) -> List[str]:
+        lines = []
+        for key, child in list(self._children.items()):
+            counts = list(child.counts)
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = f'le="{_number(float(bound))}"'
+                lines.append(
+                    f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}"
+                )
+            labels = _labels(self.labelnames, key)
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{labels} {_number(child.sum)}")
+        return lines
+
+
+class MetricsRegistry:
+    """Every metric in the process, rendered together for /metrics.
+
+    Updates take no locks: they happen on the event loop thread, so a
+    series is only ever mutated by one coroutine at a time, and a scrape
+    reads whatever the counters hold at that moment.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> None:
+        if metric.name in self._metrics:
+            raise ValueError(f"metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+db_statement_seconds = Histogram(
+    "db_statement_seconds",
+    "SQL statement execution time by statement fingerprint",
+    ["fingerprint"],
+)
+ingest_commit_latency_seconds = Histogram(
+    "ingest_commit_latency_seconds",
+    "Time from an event being enqueued to its batch committing",
+    ["path"],
+    buckets=DELIVERY_BUCKETS,
+)
+ingest_flush_batch_size = Histogram(
+    "ingest_flush_batch_size",
+    "Events per committed ingest flush",
+    ["path"],
+    buckets=SIZE_BUCKETS,
+)
+queue_depth = Gauge("queue_depth", "Items waiting in an in-process queue", ["queue"])
+rule_evaluation_seconds = Histogram(
+    "rule_evaluation_seconds", "Time to evaluate one event against its tenant's rules"
+)
+stream_fanout_lag_seconds = Histogram(
+    "stream_fanout_lag_seconds",
+    "Time from a stream message being queued for a subscriber to it being sent",
+    ["stream"],
+)
+stream_dropped_messages = Counter(
+    "stream_dropped_messages",
+    "Stream messages dropped because a subscriber's queue was full",
+    ["stream"],
+)
+span_seconds = Histogram(
+    "span_seconds", "Time spent in named hot-path spans (timed_span)", ["span"]
+)
+loop_lag_seconds = Histogram(
+    "loop_lag_seconds", "How late the event loop ran a timer scheduled by the lag probe"
+)
+loop_slow_callbacks = Counter(
+    "loop_slow_callbacks",
+    "Times the event loop was held past LOOP_SLOW_CALLBACK_MS, by coroutine",
+    ["coroutine"],
+)
+tasks_pending = Gauge(
+    "tasks_pending",
+    "Pending asyncio tasks by coroutine, as of the last census",
+    ["origin"],
+)
+load_shed_requests = Counter(
+    "load_shed_requests", "HTTP requests refused with 503 because of event loop lag"
+)
+log_records_dropped = Counter(
+    "log_records_dropped",
+    "Log records not written, by reason (rate_limited, queue_full)",
+    ["reason"],
+)
+self_trace_events = Counter(
+    "self_trace_events",
+    "Self-trace events by outcome (sampled, written, dropped)",
+    ["outcome"],
+)
+http_request_duration_seconds = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+)
+request_span_seconds = Histogram(
+    "request_span_seconds",
+    "Time a request spent per Server-Timing span (db, queue, auth, serialize, ...)",
+    ["route", "span"],
+)
+
+
+def route_template(scope) -> str:
+    """Matched path with parameter values put back as `{name}`, e.g. /v1/dashboard/{dashboard_id}/run."""
+    if "endpoint" not in scope:
+        return "unmatched"
+    path = scope["path"]
+    params = scope.get("path_params")
+    if not params:
+        return path
+    names = {str(value): name for name, value in params.items()}
+    return "/".join(
+        f"{{{names[part]}}}" if part in names else part for part in path.split("/")
+    )
@@ -0,0 +1,124 @@
+import base64
+import hashlib
+import hmac
+import json
+import uuid
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import tuple_
+
+from app.core.config import settings
+
+# Truncated HMAC-SHA256 tag appended to every cursor body
+_SIGNATURE_BYTES = 16
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a cursor is malformed, tampered with, or issued for another listing."""
+
+
+class Page(list):
+    """List of rows carrying the opaque cursor of the following page.
+
+    Subclassing list keeps every pre-cursor caller working unchanged.
+    """
+
+    def __init__(self, rows=(), next_cursor: Optional[str] = None):
+        super().__init__(rows)
+        self.next_cursor = next_cursor
+
+
+def _secret() -> bytes:
+    secret = settings.CURSOR_SECRET or f"{settings.app_name}:{settings.API_KEY}"
+    return secret.encode("utf-8")
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"t": value.isoformat()}
+    if isinstance(value, uuid.UUID):
+        return {"u": str(value)}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "t" in value:
+            return datetime.fromisoformat(value["t"])
+        if "u" in value:
+            return uuid.UUID(value["u"])
+    return value
+
+
+def _sign(body: bytes) -> bytes:
+    return hmac.new(_secret(), body, hashlib.sha256).digest()[:_SIGNATURE_BYTES]
+
+
+def encode_cursor(scope: str, values: Sequence[Any]) -> str:
+    """Serialize the sort key of the last row into an opaque, signed cursor bound to `scope`."""
+    body = json.dumps(
+        {"s": scope, "k": [_encode_value(v) for v in values]},
+        separators=(",", ":"),
+    ).encode("utf-8")
+    return base64.urlsafe_b64encode(body + _sign(body)).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(scope: str, cursor: str) -> List[Any]:
+    """Verify a cursor and return the sort key values it was issued for."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+    except (ValueError, TypeError):
+        raise InvalidCursorError("Malformed cursor")
+
+    body, signature = raw[:-_SIGNATURE_BYTES], raw[-_SIGNATURE_BYTES:]
+    if len(raw) <= _SIGNATURE_BYTES or not hmac.compare_digest(signature, _sign(body)):
+        raise InvalidCursorError("Cursor signature mismatch")
+
+    try:
+        decoded = json.loads(body)
+        values = [_decode_value(v) for v in decoded["k"]]
+    except (ValueError, KeyError, TypeError):
+        raise InvalidCursorError("Malformed cursor")
+
+    if decoded.get("s") != scope:
+        raise InvalidCursorError("Cursor was issued for a different listing")
+    return values
+
+
+def apply_keyset(
+    stmt,
+    columns: Sequence[Any],
+    cursor: Optional[str],
+    scope: str,
+    descending: bool = True,
+):
+    """Order `stmt` by `columns` and, given a cursor, seek strictly past the row it names.
+
+    The seek is a single row-value comparison, so Postgres walks a matching
+    composite index from the cursor position instead of discarding OFFSET rows.
+    """
+    if cursor:
+        values = decode_cursor(scope, cursor)
+        if len(values) != len(columns):
+            raise InvalidCursorError("Cursor does not match the listing sort key")
+        key = tuple_(*columns)
+        stmt = stmt.where(
+            key < tuple_(*values) if descending else key > tuple_(*values)
+        )
+
+    return stmt.order_by(*[c.desc() if descending else c.asc() for c in columns])
+
+
+def paginate(
+    rows: Sequence[Any],
+    limit: int,
+    scope: str,
+    key: Callable[[Any], Sequence[Any]],
+) -> Tuple[List[Any], Optional[str]]:
+    """Trim a `limit + 1` fetch to `limit` rows and build the cursor for the next page."""
+    rows = list(rows)
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(scope, key(rows[-1]))
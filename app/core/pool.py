@@ -0,0 +1,120 @@
+import logging
+import time
+from typing import Any, Dict
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.config import settings
+from app.core.scheduler import QueryScheduler, ScheduledSessionMaker
+
+logger = logging.getLogger("temporallayr.pool")
+
+
+class PoolManager:
+    """Owns the process's single primary engine and its workload sub-pools.
+
+    Every session is admitted by one QueryScheduler sized to the pool, whose
+    per-workload reservations (ingest, query, background, stream) act as the
+    sub-pools' guaranteed minimums; the remaining connections are shared
+    burst capacity. Checkouts are timed here; queue waits per class and
+    workload are in the scheduler's stats under /health query_queues.
+
+    Streaming exports outlast DB_COMMAND_TIMEOUT_SECONDS, so they get their
+    own small `export_engine` pool and scheduler with the export timeout.
+    DDL and bulk maintenance run on `maintenance_engine`: no command timeout,
+    no pool, no scheduler slot.
+    """
+
+    def __init__(self, url: str):
+        self.capacity = settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW
+        self.engine = create_async_engine(
+            url,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+            pool_recycle=300,
+            pool_pre_ping=True,
+            echo=False,
+            connect_args={
+                "timeout": settings.DB_CONNECT_TIMEOUT_SECONDS,
+                "command_timeout": settings.DB_COMMAND_TIMEOUT_SECONDS or None,
+            },
+        )
+        self.export_engine = create_async_engine(
+            url,
+            pool_size=settings.DB_EXPORT_POOL_SIZE,
+            max_overflow=0,
+            pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+            pool_recycle=300,
+            pool_pre_ping=True,
+            echo=False,
+            connect_args={
+                "timeout": settings.DB_CONNECT_TIMEOUT_SECONDS,
+                "command_timeout": settings.DB_EXPORT_COMMAND_TIMEOUT_SECONDS or None,
+            },
+        )
+        self.export_session_maker = ScheduledSessionMaker(
+            async_sessionmaker(
+                self.export_engine, class_=AsyncSession, expire_on_commit=False
+            ),
+            QueryScheduler("export", slots=settings.DB_EXPORT_POOL_SIZE),
+        )
+        self.maintenance_engine = create_async_engine(
+            url,
+            poolclass=NullPool,
+            echo=False,
+            connect_args={"timeout": settings.DB_CONNECT_TIMEOUT_SECONDS},
+        )
+        self.maintenance_session_maker = async_sessionmaker(
+            self.maintenance_engine, class_=AsyncSession, expire_on_commit=False
+        )
+        self.scheduler = QueryScheduler(
+            "primary", slots=self.capacity, reserved=settings.DB_POOL_RESERVED
+        )
+        self.session_maker = ScheduledSessionMaker(
+            async_sessionmaker(
+                self.engine, class_=AsyncSession, expire_on_commit=False
+            ),
+            self.scheduler,
+        )
+
+        self.checkouts = 0
+        self.checkins = 0
+        self.checkout_total = 0.0
+        self.checkout_max = 0.0
+        self.peak_checked_out = 0
+        event.listen(self.engine.sync_engine, "checkout", self._on_checkout)
+        event.listen(self.engine.sync_engine, "checkin", self._on_checkin)
+
+    def _on_checkout(self, dbapi_conn, record, proxy) -> None:
+        record.info["checked_out_at"] = time.perf_counter()
+        self.checkouts += 1
+        self.peak_checked_out = max(
+            self.peak_checked_out, self.engine.sync_engine.pool.checkedout()
+        )
+
+    def _on_checkin(self, dbapi_conn, record) -> None:
+        started = record.info.pop("checked_out_at", None)
+        if started is not None:
+            held = time.perf_counter() - started
+            self.checkins += 1
+            self.checkout_total += held
+            self.checkout_max = max(self.checkout_max, held)
+
+    def stats(self) -> Dict[str, Any]:
+        pool = self.engine.sync_engine.pool
+        checked_out = pool.checkedout()
+        return {
+            "capacity": self.capacity,
+            "checked_out": checked_out,
+            "idle": pool.checkedin(),
+            "saturation": round(checked_out / self.capacity, 3),
+            "peak_saturation": round(self.peak_checked_out / self.capacity, 3),
+            "checkouts": self.checkouts,
+            "avg_checkout_ms": round(self.checkout_total / self.checkins * 1000, 2)
+            if self.checkins
+            else 0.0,
+            "max_checkout_ms": round(self.checkout_max * 1000, 2),
+        }
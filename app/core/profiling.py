@@ -0,0 +1,334 @@
+import asyncio
+import cProfile
+import functools
+import hashlib
+import hmac
+import io
+import logging
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.metrics import span_seconds
+from app.core.self_trace import self_tracer
+
+logger = logging.getLogger("temporallayr.profiling")
+
+PROFILE_FORMATS = ("collapsed", "speedscope")
+PROFILE_HEADER = "x-profile"
+# Deepest stack kept per sample; deeper frames are cut at the root end
+_MAX_DEPTH = 128
+# GIL switch interval while sampling (default 5ms)
+_SWITCH_INTERVAL = 0.0002
+
+Frame = Tuple[str, str, int]  # function, file, first line
+
+
+class RequestTimings:
+    """Seconds and call count per span name for one request, sent back as Server-Timing."""
+
+    __slots__ = ("spans",)
+
+    def __init__(self):
+        self.spans: Dict[str, List[float]] = {}
+
+    def add(self, name: str, seconds: float) -> None:
+        span = self.spans.get(name)
+        if span is None:
+            self.spans[name] = [seconds, 1]
+        else:
+            span[0] += seconds
+            span[1] += 1
+
+    def server_timing(self, total: float) -> bytes:
+        """`name;dur=<ms>` per span, with the call count when more than one, then total."""
+        header = b"total;dur=%.2f" % (total * 1000)
+        if not self.spans:
+            return header
+        parts = [
+            f'{name};dur={seconds * 1000:.2f};desc="{calls}x"'
+            if calls > 1
+            else f"{name};dur={seconds * 1000:.2f}"
+            for name, (seconds, calls) in self.spans.items()
+        ]
+        return ", ".join(parts).encode() + b", " + header
+
+
+# Set by RequestLoggingMiddleware; tasks a request starts inherit it
+request_timings: ContextVar[Optional[RequestTimings]] = ContextVar(
+    "request_timings", default=None
+)
+
+
+def add_timing(name: str, seconds: float) -> None:
+    """Charge `seconds` to span `name` of the current request, if there is one."""
+    timings = request_timings.get()
+    if timings is not None:
+        timings.add(name, seconds)
+
+
+@contextmanager
+def timed_span(name: str, root: bool = False) -> Iterator[None]:
+    """Time a block into span_seconds{span=name}, Server-Timing and the self-trace.
+
+    With `root`, a block run outside any self-trace may start one.
+    """
+    child = span_seconds.labels(name)
+    trace = self_tracer.begin(name, root)
+    start = time.perf_counter()
+    error = False
+    try:
+        yield
+    except BaseException:
+        error = True
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        child.observe(elapsed)
+        add_timing(name, elapsed)
+        if trace is not None:
+            self_tracer.end(trace, elapsed, error)
+
+
+def timed(name: str, root: bool = False):
+    """Decorator form of timed_span for coroutine functions."""
+
+    def decorate(func):
+        child = span_seconds.labels(name)
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            trace = self_tracer.begin(name, root)
+            start = time.perf_counter()
+            error = False
+            try:
+                return await func(*args, **kwargs)
+            except BaseException:
+                error = True
+                raise
+            finally:
+                elapsed = time.perf_counter() - start
+                child.observe(elapsed)
+                add_timing(name, elapsed)
+                if trace is not None:
+                    self_tracer.end(trace, elapsed, error)
+
+        return wrapper
+
+    return decorate
+
+
+class SamplingProfiler:
+    """Wall-clock stack sampler: a timer thread reads the event loop thread's stack.
+
+    The loop itself runs untouched, so overhead is one `sys._current_frames()`
+    walk per interval. Idle time shows up as the selector's poll frame.
+    One run at a time per process.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.running = False
+
+    def _sample(
+        self, thread_id: int, interval: float, duration: float
+    ) -> Tuple[List[Tuple[Frame, ...]], float]:
+        samples: List[Tuple[Frame, ...]] = []
+        start = time.perf_counter()
+        deadline = start + duration
+        # A waiting thread only gets the GIL at the next forced switch, which
+        # would otherwise land mostly on the loop's select(); switch sooner
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(min(switch_interval, _SWITCH_INTERVAL))
+        try:
+            while time.perf_counter() < deadline:
+                self._take(thread_id, samples)
+                time.sleep(interval)
+        finally:
+            sys.setswitchinterval(switch_interval)
+        return samples, time.perf_counter() - start
+
+    @staticmethod
+    def _take(thread_id: int, samples: List[Tuple[Frame, ...]]) -> None:
+        frame = sys._current_frames().get(thread_id)
+        stack = []
+        while frame is not None and len(stack) < _MAX_DEPTH:
+            code = frame.f_code
+            stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+            frame = frame.f_back
+        if stack:
+            samples.append(tuple(reversed(stack)))
+
+    async def run(
+        self, duration: float, interval: float
+    ) -> Tuple[List[Tuple[Frame, ...]], float]:
+        """Sample the calling loop's thread for `duration` seconds; (stacks, elapsed)."""
+        if not self._lock.acquire(blocking=False):
+            raise RuntimeError("A profile is already running")
+        self.running = True
+        try:
+            thread_id = threading.get_ident()
+            return await asyncio.to_thread(self._sample, thread_id, interval, duration)
+        finally:
+            self.running = False
+            self._lock.release()
+
+
+def collapsed(samples: List[Tuple[Frame, ...]]) -> str:
+    """Brendan Gregg's folded format: `root;...;leaf count` per distinct stack."""
+    counts = Counter(
+        ";".join(f"{name} ({file}:{line})" for name, file, line in stack)
+        for stack in samples
+    )
+    return "\n".join(f"{stack} {n}" for stack, n in counts.most_common()) + "\n"
+
+
+def speedscope(
+    samples: List[Tuple[Frame, ...]], elapsed: float, interval: float
+) -> Dict[str, Any]:
+    """Sampled profile in speedscope's file format (https://www.speedscope.app)."""
+    index: Dict[Frame, int] = {}
+    frames: List[Dict[str, Any]] = []
+    indexed = []
+    for stack in samples:
+        row = []
+        for frame in stack:
+            i = index.get(frame)
+            if i is None:
+                i = index[frame] = len(frames)
+                frames.append({"name": frame[0], "file": frame[1], "line": frame[2]})
+            row.append(i)
+        indexed.append(row)
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "shared": {"frames": frames},
+        "profiles": [
+            {
+                "type": "sampled",
+                "name": "event loop",
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": round(elapsed, 6),
+                "samples": indexed,
+                "weights": [interval] * len(indexed),
+            }
+        ],
+        "exporter": settings.app_name,
+    }
+
+
+def profile_signature(method: str, path: str, expires: int) -> str:
+    message = f"{expires}:{method.upper()}:{path}".encode()
+    return hmac.new(
+        settings.PROFILING_SECRET.encode(), message, hashlib.sha256
+    ).hexdigest()
+
+
+def _signed(scope) -> bool:
+    """`X-Profile: <unix expiry>.<hmac>` signed over expiry, method and path."""
+    if not settings.PROFILING_SECRET:
+        return False
+    value = next((v for k, v in scope["headers"] if k == PROFILE_HEADER.encode()), None)
+    if value is None:
+        return False
+    try:
+        expires, signature = value.decode().split(".", 1)
+        expires = int(expires)
+    except ValueError:
+        return False
+    if expires < time.time():
+        return False
+    expected = profile_signature(scope["method"], scope["path"], expires)
+    return hmac.compare_digest(signature, expected)
+
+
+def _yappi():
+    try:
+        import yappi  # optional: coroutine-aware wall-clock profiles
+
+        return yappi
+    except ImportError:
+        return None
+
+
+class RequestProfilerMiddleware:
+    """Pure ASGI: runs a request carrying a valid X-Profile header under a profiler.
+
+    The response body is replaced by the profile as text, sorted by
+    cumulative time; the original status is in X-Profiled-Status. yappi is
+    used when installed, else cProfile. Both are process-wide, so work
+    other tasks do while the request runs is included.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        # One profiler can be active per thread; concurrent asks run unprofiled
+        self.busy = False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.busy or not _signed(scope):
+            await self.app(scope, receive, send)
+            return
+
+        self.busy = True
+        try:
+            await self._profiled(scope, receive, send)
+        finally:
+            self.busy = False
+
+    async def _profiled(self, scope, receive, send):
+        status = [500]
+
+        async def swallow(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+
+        yappi = _yappi()
+        out = io.StringIO()
+        started = time.perf_counter()
+        if yappi is not None:
+            yappi.set_clock_type("wall")
+            yappi.clear_stats()
+            yappi.start()
+            try:
+                await self.app(scope, receive, swallow)
+            finally:
+                yappi.stop()
+            yappi.get_func_stats().sort("ttot").print_all(out=out)
+            yappi.clear_stats()
+        else:
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                await self.app(scope, receive, swallow)
+            finally:
+                profiler.disable()
+            stats = pstats.Stats(profiler, stream=out)
+            stats.sort_stats("cumulative").print_stats(settings.PROFILING_REQUEST_LINES)
+        elapsed = time.perf_counter() - started
+        logger.info(
+            f"[PROFILE] {scope['method']} {scope['path']} profiled in {elapsed * 1000:.1f}ms"
+        )
+
+        body = out.getvalue().encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"text/plain; charset=utf-8"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"x-profiled-status", str(status[0]).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+
+sampling_profiler = SamplingProfiler()
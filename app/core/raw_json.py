@@ -0,0 +1,62 @@
+import json
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from fastapi.responses import StreamingResponse
+
+from app.core.responses import dumps
+
+# Encoded items per chunk handed to the ASGI server
+CHUNK_ITEMS = 256
+
+
+class RawJSON(str):
+    """JSON text exactly as Postgres rendered it (`payload::text`); spliced in verbatim."""
+
+
+def encode_object(fields: Dict[str, Any]) -> str:
+    """One JSON object; RawJSON values are copied in without a decode/encode round trip.
+
+    The other fields go through the response encoder in one call, and the raw
+    ones are spliced in after them.
+    """
+    plain, raw = {}, []
+    for k, v in fields.items():
+        if isinstance(v, RawJSON):
+            raw.append(f"{json.dumps(k)}:{v}")
+        else:
+            plain[k] = v
+    body = dumps(plain).decode("utf-8")
+    if not raw:
+        return body
+    return f"{body[:-1]}{',' if plain else ''}{','.join(raw)}}}"
+
+
+async def _envelope_chunks(
+    head: Dict[str, Any],
+    key: str,
+    items: List[str],
+    tail: Callable[[], Dict[str, Any]],
+) -> AsyncIterator[bytes]:
+    opening = encode_object(head)[:-1]
+    yield f"{opening}{',' if head else ''}{json.dumps(key)}:[".encode()
+    for start in range(0, len(items), CHUNK_ITEMS):
+        chunk = ",".join(items[start : start + CHUNK_ITEMS])
+        yield (f",{chunk}" if start else chunk).encode()
+    closing = encode_object(tail())[1:]
+    yield f"]{',' if closing != '}' else ''}{closing}".encode()
+
+
+def envelope_response(
+    key: str,
+    items: List[str],
+    head: Optional[Dict[str, Any]] = None,
+    tail: Optional[Callable[[], Dict[str, Any]]] = None,
+) -> StreamingResponse:
+    """Stream `{**head, key: [items...], **tail()}` from already-encoded item strings.
+
+    `tail` runs after the items are sent, so timings in it cover the encoding.
+    """
+    return StreamingResponse(
+        _envelope_chunks(head or {}, key, items, tail or dict),
+        media_type="application/json",
+    )
@@ -0,0 +1,219 @@
+import asyncio
+import logging
+import time
+from collections import Counter, deque
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.config import settings
+from app.core.database import _normalize_async_database_url, async_session_maker, engine
+from app.core.scheduler import QueryScheduler, ScheduledSessionMaker
+
+logger = logging.getLogger("temporallayr.replicas")
+
+# Primary WAL positions remembered for lag measurement; covers 10 minutes at 5s checks
+LSN_HISTORY = 120
+_REPLAY_SQL = text(
+    "SELECT pg_is_in_recovery(), pg_last_wal_replay_lsn() - '0/0'::pg_lsn"
+)
+_PRIMARY_SQL = text("SELECT pg_current_wal_lsn() - '0/0'::pg_lsn")
+
+
+def replay_lag(
+    history: Sequence[Tuple[float, int]], replayed: int, now: float
+) -> float:
+    """Seconds since the newest primary sample a replica at `replayed` fully holds.
+
+    `history` is (monotonic time, primary LSN) in sampling order. A replica behind
+    every sample is at least as old as the oldest one.
+    """
+    caught_up = None
+    for ts, lsn in history:
+        if lsn > replayed:
+            break
+        caught_up = ts
+    if caught_up is None:
+        caught_up = history[0][0]
+    return max(0.0, now - caught_up)
+
+
+class Replica:
+    """One read-only engine and what the last health check saw of it."""
+
+    def __init__(self, name: str, url: str):
+        self.name = name
+        self.engine = create_async_engine(
+            _normalize_async_database_url(url),
+            pool_size=5,
+            max_overflow=5,
+            pool_timeout=10,
+            pool_recycle=300,
+            pool_pre_ping=True,
+            connect_args={"command_timeout": 5.0},
+        )
+        self.session_maker = ScheduledSessionMaker(
+            async_sessionmaker(
+                self.engine, class_=AsyncSession, expire_on_commit=False
+            ),
+            QueryScheduler(name, slots=10),
+        )
+        self.healthy = False
+        self.lag_seconds: Optional[float] = None
+        self.checked_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.reads = 0
+
+    def staleness(self, now: float) -> Optional[float]:
+        """Upper bound on how old the newest data this replica surely has is."""
+        if not self.healthy or self.lag_seconds is None:
+            return None
+        return self.lag_seconds + (now - self.checked_at)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "healthy": self.healthy,
+            "lag_seconds": None
+            if self.lag_seconds is None
+            else round(self.lag_seconds, 3),
+            "checked_ago_seconds": None
+            if self.checked_at is None
+            else round(time.monotonic() - self.checked_at, 1),
+            "reads": self.reads,
+            "in_use": self.session_maker.scheduler.in_use,
+            "last_error": self.last_error,
+        }
+
+
+class ReplicaRouter:
+    """Routes read-only sessions to the least busy replica that is fresh enough.
+
+    Lag is measured against the primary's WAL: each check records the
+    primary's current LSN, and a replica's lag is the age of the oldest
+    recorded position it has not replayed yet, so an idle primary reads as
+    zero lag. A read falls back to the primary when no replica is within
+    its staleness bound, or when the tenant wrote more recently than the
+    replica could have replayed (read-your-writes within this process).
+    """
+
+    def __init__(self, urls: List[str]):
+        self.replicas = [
+            Replica(f"replica-{i}", url) for i, url in enumerate(urls, start=1)
+        ]
+        self._lsn_history: Deque[Tuple[float, int]] = deque(maxlen=LSN_HISTORY)
+        self._last_write: Dict[str, float] = {}
+        self.primary_reads: Counter = Counter()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.replicas)
+
+    def note_write(self, tenant_id: Optional[str]) -> None:
+        """Record a committed write so the tenant's next reads can see it."""
+        if tenant_id and self.replicas:
+            self._last_write[tenant_id] = time.monotonic()
+
+    def route(
+        self, tenant_id: Optional[str] = None, max_staleness: Optional[float] = None
+    ) -> Optional[Replica]:
+        """Replica to read from, or None for the primary."""
+        if not self.replicas:
+            return None
+        bound = (
+            settings.REPLICA_MAX_LAG_SECONDS if max_staleness is None else max_staleness
+        )
+        reason = "lag"
+        now = time.monotonic()
+        written = self._last_write.get(tenant_id) if tenant_id else None
+        if written is not None and now - written < bound:
+            bound, reason = now - written, "own_writes"
+        candidates = []
+        for replica in self.replicas:
+            staleness = replica.staleness(now)
+            if staleness is not None and staleness <= bound:
+                candidates.append(
+                    (replica.session_maker.scheduler.in_use, staleness, replica)
+                )
+        if not candidates:
+            if not any(r.healthy for r in self.replicas):
+                reason = "unhealthy"
+            self.primary_reads[reason] += 1
+            return None
+        replica = min(candidates, key=lambda c: c[:2])[2]
+        replica.reads += 1
+        return replica
+
+    async def check(self) -> None:
+        """Sample the primary's WAL position, then every replica's replay position."""
+        now = time.monotonic()
+        try:
+            async with engine.connect() as conn:
+                lsn = (await conn.execute(_PRIMARY_SQL)).scalar()
+            self._lsn_history.append((now, int(lsn)))
+        except Exception as e:
+            logger.warning(
+                f"[REPLICA] primary WAL sample failed: {type(e).__name__}: {e}"
+            )
+        for replica in self.replicas:
+            await self._check_replica(replica, now)
+
+    async def _check_replica(self, replica: Replica, now: float) -> None:
+        try:
+            async with replica.engine.connect() as conn:
+                in_recovery, replayed = (await conn.execute(_REPLAY_SQL)).one()
+        except Exception as e:
+            if replica.healthy:
+                logger.warning(f"[REPLICA] {replica.name} unreachable: {e}")
+            replica.healthy = False
+            replica.last_error = f"{type(e).__name__}: {e}"
+            return
+
+        replica.checked_at = now
+        replica.healthy = True
+        replica.last_error = None
+        if not in_recovery:
+            # A standalone copy (e.g. local testing) has no replay position to compare
+            replica.lag_seconds = 0.0
+            return
+        if replayed is None or not self._lsn_history:
+            replica.lag_seconds = None
+            return
+        replica.lag_seconds = replay_lag(self._lsn_history, int(replayed), now)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "replicas": {r.name: r.stats() for r in self.replicas},
+            "primary_reads": dict(self.primary_reads),
+        }
+
+
+replica_router = ReplicaRouter(
+    [url.strip() for url in settings.DATABASE_REPLICA_URLS.split(",") if url.strip()]
+)
+
+
+def read_session(
+    tenant_id: Optional[str] = None, max_staleness: Optional[float] = None
+):
+    """Session for read-only work: a fresh-enough replica when there is one, else the primary.
+
+    `max_staleness` (seconds) overrides REPLICA_MAX_LAG_SECONDS; 0 forces the primary.
+    Staleness counts measured lag plus the time since that measurement.
+    """
+    replica = replica_router.route(tenant_id, max_staleness)
+    if replica is None:
+        return async_session_maker()
+    return replica.session_maker()
+
+
+async def replica_health_task():
+    """Background task: periodically measure replica health and replication lag."""
+    while True:
+        try:
+            await replica_router.check()
+        except asyncio.CancelledError:
+            break
+        except Exception as e:
+            logger.error(f"[REPLICA] health check failed: {type(e).__name__}: {e}")
+        await asyncio.sleep(settings.REPLICA_CHECK_INTERVAL_SECONDS)
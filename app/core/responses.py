@@ -0,0 +1,83 @@
+import json
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Any
+from uuid import UUID
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from app.core.profiling import timed_span
+
+# orjson's natively handled extras: int dict keys, numpy arrays from aggregations
+_ORJSON_OPTIONS = ("OPT_NON_STR_KEYS", "OPT_SERIALIZE_NUMPY")
+
+
+def _orjson():
+    try:
+        import orjson  # optional: 5-30x faster than json.dumps on row arrays
+
+        return orjson
+    except ImportError:
+        return None
+
+
+def _default(value: Any) -> Any:
+    """Types neither encoder handles itself, mapped the way jsonable_encoder would."""
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, Decimal):
+        return int(value) if value.as_tuple().exponent >= 0 else float(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    return str(value)
+
+
+def _default_utc_z(value: Any) -> Any:
+    if isinstance(value, datetime) and value.utcoffset() == timedelta(0):
+        return value.isoformat().replace("+00:00", "Z")
+    return _default(value)
+
+
+def dumps(content: Any, utc_z: bool = False) -> bytes:
+    """Compact UTF-8 JSON; datetimes, UUIDs and models need no pre-encoding pass.
+
+    `utc_z` writes UTC datetimes with a `Z` suffix, the way pydantic does.
+    """
+    orjson = _orjson()
+    if orjson is not None:
+        options = orjson.OPT_UTC_Z if utc_z else 0
+        for name in _ORJSON_OPTIONS:
+            options |= getattr(orjson, name, 0)
+        return orjson.dumps(content, default=_default, option=options)
+    return json.dumps(
+        content,
+        default=_default_utc_z if utc_z else _default,
+        ensure_ascii=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """Default response class: orjson when installed, compact stdlib json otherwise.
+
+    Endpoints that build their payload from rows they just read can return
+    this directly to skip response_model validation and jsonable_encoder;
+    the route's response_model still documents the shape.
+    """
+
+    utc_z = False
+
+    def render(self, content: Any) -> bytes:
+        with timed_span("serialize"):
+            return dumps(content, utc_z=self.utc_z)
+
+
+class ModelJSONResponse(FastJSONResponse):
+    """FastJSONResponse for rows standing in for a response model; datetimes keep its `Z` form."""
+
+    utc_z = True
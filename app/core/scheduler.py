@@ -0,0 +1,393 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.metrics import queue_depth
+from app.core.profiling import add_timing
+
+logger = logging.getLogger("temporallayr.scheduler")
+
+# Priority classes, most urgent first; a class is served only when every
+# class before it has nothing queued
+QUERY_PRIORITIES = ("ingest", "alerting", "interactive", "dashboard", "export")
+DEFAULT_PRIORITY = "interactive"
+# Workloads holding reserved connections; sessions tag one via query_context
+WORKLOADS = ("ingest", "query", "background", "stream")
+# Seed for the running average of how long a session holds its slot
+_INITIAL_HOLD_SECONDS = 0.05
+_HOLD_SMOOTHING = 0.2
+
+_tenant: ContextVar[str] = ContextVar("query_tenant", default="")
+_priority: ContextVar[str] = ContextVar("query_priority", default=DEFAULT_PRIORITY)
+# Absolute time.monotonic() by which a session must have started
+_deadline: ContextVar[Optional[float]] = ContextVar("query_deadline", default=None)
+_workload: ContextVar[Optional[str]] = ContextVar("query_workload", default=None)
+# Sessions this task already holds; nested sessions skip the queue
+_held: ContextVar[int] = ContextVar("query_held", default=0)
+
+# Every pool's scheduler, for health and metrics reporting
+schedulers: List["QueryScheduler"] = []
+
+
+class QueryRejected(Exception):
+    """A session could not start before its deadline."""
+
+    def __init__(self, priority: str, retry_after: float):
+        super().__init__(f"{priority} query rejected: database queue is saturated")
+        self.priority = priority
+        self.retry_after = retry_after
+
+
+@contextmanager
+def query_context(
+    tenant_id: Optional[str] = None,
+    priority: Optional[str] = None,
+    timeout: Optional[float] = None,
+    workload: Optional[str] = None,
+) -> Iterator[None]:
+    """Tag sessions opened inside the block with a tenant, priority class, deadline and workload."""
+    tokens: List[Tuple[ContextVar, Any]] = []
+    if tenant_id is not None:
+        tokens.append((_tenant, _tenant.set(tenant_id)))
+    if priority is not None:
+        if priority not in QUERY_PRIORITIES:
+            raise ValueError(f"Unknown query priority '{priority}'")
+        tokens.append((_priority, _priority.set(priority)))
+    if timeout is not None:
+        tokens.append((_deadline, _deadline.set(time.monotonic() + timeout)))
+    if workload is not None:
+        if workload not in WORKLOADS:
+            raise ValueError(f"Unknown workload '{workload}'")
+        tokens.append((_workload, _workload.set(workload)))
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+
+
+def current_workload() -> str:
+    """Workload of sessions opened now; untagged sessions count as ingest or query."""
+    workload = _workload.get()
+    if workload is None:
+        return "ingest" if _priority.get() == "ingest" else "query"
+    return workload
+
+
+class _Waiter:
+    __slots__ = ("tenant", "priority", "workload", "start", "future", "live")
+
+    def __init__(self, tenant: str, priority: str, workload: str, start: float, future):
+        self.tenant = tenant
+        self.priority = priority
+        self.workload = workload
+        self.start = start
+        self.future = future
+        self.live = True
+
+
+class _ClassStats:
+    __slots__ = ("admitted", "queued", "rejected", "wait_total", "wait_max")
+
+    def __init__(self):
+        self.admitted = 0
+        self.queued = 0
+        self.rejected = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+
+class QueryScheduler:
+    """Admission queue for a connection pool's `slots` sessions.
+
+    Classes are strictly prioritized; within a class tenants share slots by
+    weighted fair queueing on virtual finish tags, so one tenant's burst
+    queues behind its own earlier requests. A request whose estimated queue
+    time already overruns its deadline is rejected on arrival instead.
+
+    `reserved` carves per-workload minimums out of the slots: a workload may
+    always use its own reservation, and beyond it competes for the shared
+    remainder, so a query burst can never take ingest's last connections.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        slots: int,
+        weights: Optional[Dict[str, float]] = None,
+        reserved: Optional[Dict[str, int]] = None,
+    ):
+        self.name = name
+        self.slots = slots
+        self.weights = settings.QUERY_TENANT_WEIGHTS if weights is None else weights
+        self.reserved = {w: (reserved or {}).get(w, 0) for w in WORKLOADS}
+        self.shared = slots - sum(self.reserved.values())
+        if self.shared < 0:
+            raise ValueError(f"{name}: reservations exceed {slots} slots")
+        self.in_use = 0
+        self.in_use_by = {w: 0 for w in WORKLOADS}
+        self._waiting_by = {w: 0 for w in WORKLOADS}
+        self.hold_seconds = _INITIAL_HOLD_SECONDS
+        self._seq = itertools.count()
+        self._queues: Dict[str, List[Tuple[float, int, _Waiter]]] = {
+            p: [] for p in QUERY_PRIORITIES
+        }
+        self._waiting = {p: 0 for p in QUERY_PRIORITIES}
+        self._vtime = {p: 0.0 for p in QUERY_PRIORITIES}
+        self._finish: Dict[Tuple[str, str], float] = {}
+        self._stats = {p: _ClassStats() for p in QUERY_PRIORITIES}
+        queue_depth.track([f"db_{name}"], lambda: sum(self._waiting.values()))
+
+    def _ahead(self, priority: str, tag: float) -> int:
+        rank = QUERY_PRIORITIES.index(priority)
+        ahead = sum(self._waiting[p] for p in QUERY_PRIORITIES[:rank])
+        return ahead + sum(
+            1 for entry in self._queues[priority] if entry[2].live and entry[0] < tag
+        )
+
+    def _admissible(self, workload: str) -> bool:
+        if self.in_use_by[workload] < self.reserved[workload]:
+            return True
+        burst = sum(max(0, n - self.reserved[w]) for w, n in self.in_use_by.items())
+        return burst < self.shared
+
+    def _grant(self, workload: str) -> Tuple[float, str]:
+        self.in_use += 1
+        self.in_use_by[workload] += 1
+        return time.monotonic(), workload
+
+    def _unqueue(self, waiter: _Waiter) -> None:
+        waiter.live = False
+        self._waiting[waiter.priority] -= 1
+        self._waiting_by[waiter.workload] -= 1
+
+    def _estimate(self, ahead: int) -> float:
+        """Seconds until `ahead` queued sessions have been granted a slot."""
+        return (ahead // max(self.slots, 1) + 1) * self.hold_seconds
+
+    async def acquire(self) -> Optional[Tuple[float, str]]:
+        """Wait for a slot; returns the grant to pass back to `release`."""
+        if _held.get():
+            return None
+        priority, tenant, deadline = _priority.get(), _tenant.get(), _deadline.get()
+        workload = current_workload()
+        stats = self._stats[priority]
+        # Queued sessions are never admissible, so only our own workload's can be ahead
+        if self._admissible(workload) and not self._waiting_by[workload]:
+            stats.admitted += 1
+            return self._grant(workload)
+
+        weight = self.weights.get(tenant, 1.0)
+        start = max(self._vtime[priority], self._finish.get((priority, tenant), 0.0))
+        tag = start + 1.0 / weight
+        now = time.monotonic()
+        if deadline is not None:
+            wait = self._estimate(self._ahead(priority, tag))
+            if now + wait > deadline:
+                stats.rejected += 1
+                raise QueryRejected(priority, wait)
+
+        self._finish[(priority, tenant)] = tag
+        waiter = _Waiter(
+            tenant,
+            priority,
+            workload,
+            start,
+            asyncio.get_running_loop().create_future(),
+        )
+        heapq.heappush(self._queues[priority], (tag, next(self._seq), waiter))
+        self._waiting[priority] += 1
+        self._waiting_by[workload] += 1
+        stats.queued += 1
+        try:
+            if deadline is None:
+                await waiter.future
+            else:
+                await asyncio.wait_for(waiter.future, max(0.0, deadline - now))
+        except BaseException as e:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Granted in the same tick we were cancelled; hand the slot on
+                self.in_use -= 1
+                self.in_use_by[workload] -= 1
+                self._dispatch()
+            elif waiter.live:
+                self._unqueue(waiter)
+            if isinstance(e, asyncio.TimeoutError):
+                stats.rejected += 1
+                raise QueryRejected(
+                    priority, self._estimate(self._ahead(priority, tag))
+                )
+            raise
+
+        waited = time.monotonic() - now
+        add_timing("queue", waited)
+        stats.admitted += 1
+        stats.wait_total += waited
+        stats.wait_max = max(stats.wait_max, waited)
+        return waiter.future.result()
+
+    def release(self, grant: Optional[Tuple[float, str]]) -> None:
+        if grant is None:
+            return
+        granted_at, workload = grant
+        held = time.monotonic() - granted_at
+        self.hold_seconds += _HOLD_SMOOTHING * (held - self.hold_seconds)
+        self.in_use -= 1
+        self.in_use_by[workload] -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        for priority in QUERY_PRIORITIES:
+            queue = self._queues[priority]
+            # Waiters whose workload is out of slots keep their place for later
+            blocked = []
+            while queue and self.in_use < self.slots:
+                entry = heapq.heappop(queue)
+                waiter = entry[2]
+                if not waiter.live:
+                    continue
+                if not self._admissible(waiter.workload):
+                    blocked.append(entry)
+                    continue
+                self._unqueue(waiter)
+                if waiter.future.done():
+                    # Timed out, its task has not resumed to notice yet
+                    continue
+                self._vtime[priority] = waiter.start
+                waiter.future.set_result(self._grant(waiter.workload))
+            for entry in blocked:
+                heapq.heappush(queue, entry)
+            if not queue:
+                # Idle class: finish tags only matter relative to each other
+                self._vtime[priority] = 0.0
+                for key in [k for k in self._finish if k[0] == priority]:
+                    del self._finish[key]
+            if self.in_use >= self.slots:
+                return
+
+    def stats(self) -> Dict[str, Any]:
+        classes = {}
+        for priority, stats in self._stats.items():
+            waited = stats.queued - self._waiting[priority]
+            classes[priority] = {
+                "admitted": stats.admitted,
+                "queued": stats.queued,
+                "rejected": stats.rejected,
+                "waiting": self._waiting[priority],
+                "avg_wait_ms": round(stats.wait_total / waited * 1000, 2)
+                if waited
+                else 0.0,
+                "max_wait_ms": round(stats.wait_max * 1000, 2),
+            }
+        return {
+            "slots": self.slots,
+            "in_use": self.in_use,
+            "shared": self.shared,
+            "avg_hold_ms": round(self.hold_seconds * 1000, 2),
+            "classes": classes,
+            "workloads": {
+                w: {
+                    "reserved": self.reserved[w],
+                    "in_use": self.in_use_by[w],
+                    "waiting": self._waiting_by[w],
+                }
+                for w in WORKLOADS
+            },
+        }
+
+
+class _ScheduledSession:
+    __slots__ = ("_maker", "_scheduler", "_session", "_granted", "_token")
+
+    def __init__(self, maker, scheduler: QueryScheduler):
+        self._maker = maker
+        self._scheduler = scheduler
+
+    async def __aenter__(self):
+        self._granted = await self._scheduler.acquire()
+        self._token = _held.set(_held.get() + 1)
+        try:
+            self._session = self._maker()
+            return await self._session.__aenter__()
+        except BaseException:
+            _held.reset(self._token)
+            self._scheduler.release(self._granted)
+            raise
+
+    async def __aexit__(self, *exc_info):
+        try:
+            return await self._session.__aexit__(*exc_info)
+        finally:
+            _held.reset(self._token)
+            self._scheduler.release(self._granted)
+
+
+class ScheduledSessionMaker:
+    """Drop-in for an `async_sessionmaker` whose sessions queue on a QueryScheduler."""
+
+    def __init__(self, maker, scheduler: QueryScheduler):
+        self.maker = maker
+        self.scheduler = scheduler
+        schedulers.append(scheduler)
+
+    def __call__(self):
+        if not settings.QUERY_SCHEDULER_ENABLED:
+            return self.maker()
+        return _ScheduledSession(self.maker, self.scheduler)
+
+
+def request_workload(path: str) -> str:
+    """Workload of an HTTP or websocket request, from its route."""
+    if "/stream" in path or "/ws" in path:
+        return "stream"
+    if path.startswith("/v1/ingest") or path.startswith("/v1/events"):
+        return "ingest"
+    return "query"
+
+
+def request_priority(path: str) -> str:
+    """Priority class of an HTTP request, from its route."""
+    if path.startswith("/v1/ingest") or path.startswith("/v1/events"):
+        return "ingest"
+    if "/alert" in path or "/rules" in path:
+        return "alerting"
+    if "/export" in path:
+        return "export"
+    if path.startswith("/v1/dashboard"):
+        return "dashboard"
+    return DEFAULT_PRIORITY
+
+
+class QueryContextMiddleware:
+    """ASGI middleware tagging each request's sessions with tenant, priority, deadline and workload.
+
+    Clients may shorten or extend the queue deadline with `X-Request-Timeout` (seconds).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] not in ("http", "websocket"):
+            return await self.app(scope, receive, send)
+        headers = {
+            k.decode("latin-1"): v.decode("latin-1") for k, v in scope["headers"]
+        }
+        tenant = headers.get("x-tenant-id") or headers.get("x-api-key") or ""
+        try:
+            timeout = float(headers["x-request-timeout"])
+        except (KeyError, ValueError):
+            timeout = settings.QUERY_QUEUE_TIMEOUT_SECONDS
+        path = scope["path"]
+        workload = request_workload(path)
+        if workload == "stream":
+            # Long-lived connections: a deadline from connect time would soon reject everything
+            timeout = None
+        with query_context(tenant, request_priority(path), timeout, workload):
+            await self.app(scope, receive, send)
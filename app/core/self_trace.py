@@ -0,0 +1,208 @@
+import asyncio
+import logging
+import os
+import random
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.metrics import self_trace_events
+
+logger = logging.getLogger("temporallayr.self_trace")
+
+
+class _Trace:
+    __slots__ = ("id", "nodes", "closed", "truncated")
+
+    def __init__(self):
+        self.id = os.urandom(8).hex()
+        self.nodes: List[Dict[str, Any]] = []
+        self.closed = False
+        self.truncated = 0
+
+
+# (trace, node index new spans hang under); _UNSAMPLED inside a root that lost
+# the sampling draw or inside the lane's own writes, so nothing below records
+_current: ContextVar[Optional[Tuple[Optional[_Trace], int]]] = ContextVar(
+    "self_trace", default=None
+)
+_UNSAMPLED: Tuple[Optional[_Trace], int] = (None, -1)
+
+Handle = Tuple[Any, Optional[_Trace], int]
+
+
+class SelfTracer:
+    """Turns the server's own work into execution graphs in the product's format.
+
+    Roots (HTTP requests, ingest flushes) are head-sampled at
+    SELF_TRACE_SAMPLE_RATE; spans and DB statements inside a sampled root
+    become its nodes, with parent_id, start_time and duration_ms. A finished
+    root is queued as one event for SELF_TRACE_TENANT and written by
+    self_trace_task through the export priority class, so the existing
+    dashboards and aggregate_timeseries can chart the server itself.
+    Unsampled work costs one context variable lookup per span.
+    """
+
+    def __init__(self, capacity: int):
+        self.lane: deque = deque()
+        self.capacity = capacity
+
+    def _node(self, trace: _Trace, parent: int, name: str, start: float) -> int:
+        index = len(trace.nodes)
+        trace.nodes.append(
+            {
+                "id": str(index),
+                "parent_id": str(parent) if parent >= 0 else None,
+                "name": name,
+                "start_time": start,
+                "duration_ms": None,
+                "status": "running",
+            }
+        )
+        return index
+
+    def begin(self, name: str, root: bool = False) -> Optional[Handle]:
+        """Open a span; a root opens a trace when none is active and the sample hits."""
+        current = _current.get()
+        if current is None:
+            if not root or not settings.SELF_TRACE_ENABLED:
+                return None
+            if random.random() >= settings.SELF_TRACE_SAMPLE_RATE:
+                return _current.set(_UNSAMPLED), None, -1
+            trace = _Trace()
+            index = self._node(trace, -1, name, time.time())
+            return _current.set((trace, index)), trace, index
+
+        trace, parent = current
+        if trace is None or trace.closed:
+            return None
+        if len(trace.nodes) >= settings.SELF_TRACE_MAX_NODES:
+            trace.truncated += 1
+            return None
+        index = self._node(trace, parent, name, time.time())
+        return _current.set((trace, index)), trace, index
+
+    def end(
+        self,
+        handle: Handle,
+        seconds: float,
+        error: bool = False,
+        name: Optional[str] = None,
+    ) -> None:
+        token, trace, index = handle
+        _current.reset(token)
+        if trace is None:
+            return
+        node = trace.nodes[index]
+        node["duration_ms"] = round(seconds * 1000, 3)
+        node["status"] = "error" if error else "success"
+        if name is not None:
+            node["name"] = name
+        if node["parent_id"] is None:
+            trace.closed = True
+            self._emit(trace, node, error)
+
+    def record(self, name: str, seconds: float, error: bool = False) -> None:
+        """Add an already finished span, e.g. a DB statement timed by its own hooks."""
+        current = _current.get()
+        if current is None or current[0] is None:
+            return
+        trace, parent = current
+        if trace.closed:
+            return
+        if len(trace.nodes) >= settings.SELF_TRACE_MAX_NODES:
+            trace.truncated += 1
+            return
+        index = self._node(trace, parent, name, time.time() - seconds)
+        node = trace.nodes[index]
+        node["duration_ms"] = round(seconds * 1000, 3)
+        node["status"] = "error" if error else "success"
+
+    @contextmanager
+    def span(self, name: str, root: bool = False) -> Iterator[None]:
+        handle = self.begin(name, root)
+        if handle is None:
+            yield
+            return
+        start = time.perf_counter()
+        error = True
+        try:
+            yield
+            error = False
+        finally:
+            self.end(handle, time.perf_counter() - start, error)
+
+    def _emit(self, trace: _Trace, root: Dict[str, Any], error: bool) -> None:
+        if len(self.lane) >= self.capacity:
+            self_trace_events.labels("dropped").inc()
+            return
+        event = {
+            "execution_id": trace.id,
+            "function_name": root["name"],
+            "status": "FAILED" if error else "SUCCESS",
+            "metrics": {"duration_ms": root["duration_ms"]},
+            "nodes": trace.nodes,
+            "source": "self_trace",
+            "sample_rate": settings.SELF_TRACE_SAMPLE_RATE,
+            "_ingested_at": datetime.fromtimestamp(
+                root["start_time"], timezone.utc
+            ).isoformat(),
+        }
+        if trace.truncated:
+            event["truncated_nodes"] = trace.truncated
+        self.lane.append({"tenant_id": settings.SELF_TRACE_TENANT, "event": event})
+        self_trace_events.labels("sampled").inc()
+
+    def drain(self, limit: int) -> List[Dict[str, Any]]:
+        batch = []
+        while self.lane and len(batch) < limit:
+            batch.append(self.lane.popleft())
+        return batch
+
+
+@contextmanager
+def untraced() -> Iterator[None]:
+    """Keep work inside the block out of self-traces."""
+    token = _current.set(_UNSAMPLED)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+async def self_trace_task():
+    """Low-priority lane: write finished self-traces into SELF_TRACE_TENANT."""
+    from app.core.scheduler import query_context
+    from app.services.hot_store import hot_store
+    from app.services.storage_service import StorageService
+
+    storage = StorageService(max_retries=1, base_delay=1.0)
+    logger.info(
+        f"[SELF TRACE] sampling {settings.SELF_TRACE_SAMPLE_RATE:.2%} of roots "
+        f"into tenant={settings.SELF_TRACE_TENANT}"
+    )
+    while True:
+        try:
+            await asyncio.sleep(settings.SELF_TRACE_FLUSH_SECONDS)
+            batch = self_tracer.drain(settings.SELF_TRACE_BATCH_SIZE)
+            if not batch:
+                continue
+            # Export is the last priority class: any other queued session goes first
+            with untraced(), query_context(priority="export", workload="background"):
+                written = await storage.bulk_insert_events(batch)
+            if written:
+                hot_store.ingest(batch)
+                self_trace_events.labels("written").inc(len(batch))
+            else:
+                self_trace_events.labels("dropped").inc(len(batch))
+        except asyncio.CancelledError:
+            break
+        except Exception as e:
+            logger.error(f"[SELF TRACE] flush failed: {e}")
+
+
+self_tracer = SelfTracer(settings.SELF_TRACE_QUEUE_SIZE)
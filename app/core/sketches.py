@@ -0,0 +1,236 @@
+import hashlib
+import heapq
+import math
+import struct
+from typing import Any, Dict, Iterable, List, Tuple
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter with double hashing over a single blake2b digest.
+
+    Serializes to a compact byte string so it can travel in file footers.
+    """
+
+    _HEADER = struct.Struct("<IB")  # bit count, hash count
+
+    def __init__(self, num_bits: int, num_hashes: int, bits: bytes | None = None):
+        self.num_bits = max(8, num_bits)
+        self.num_hashes = max(1, num_hashes)
+        self.bits = bytearray(bits or b"\x00" * ((self.num_bits + 7) // 8))
+
+    @classmethod
+    def for_capacity(cls, capacity: int, fpp: float = 0.01) -> "BloomFilter":
+        capacity = max(1, capacity)
+        num_bits = int(math.ceil(-capacity * math.log(fpp) / (math.log(2) ** 2)))
+        num_hashes = int(round(num_bits / capacity * math.log(2)))
+        return cls(num_bits, num_hashes)
+
+    def _positions(self, value: str) -> Iterable[int]:
+        digest = hashlib.blake2b(value.encode("utf-8"), digest_size=16).digest()
+        h1, h2 = struct.unpack("<QQ", digest)
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, value: str) -> None:
+        for pos in self._positions(value):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, value: str) -> bool:
+        return all(
+            self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(value)
+        )
+
+    def to_bytes(self) -> bytes:
+        return self._HEADER.pack(self.num_bits, self.num_hashes) + bytes(self.bits)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "BloomFilter":
+        num_bits, num_hashes = cls._HEADER.unpack_from(data)
+        return cls(num_bits, num_hashes, data[cls._HEADER.size :])
+
+
+class HyperLogLog:
+    """HyperLogLog distinct counter with 2**p one-byte registers.
+
+    Merging takes the register-wise max, so it is idempotent: re-merging a
+    sketch that is already folded in changes nothing.
+    """
+
+    _INVERSE_POWERS = [2.0**-r for r in range(65)]
+
+    def __init__(self, p: int = 10, registers: bytes | None = None):
+        self.p = p
+        self.m = 1 << p
+        self.registers = bytearray(registers or self.m)
+
+    def add(self, value: str) -> bool:
+        """Observe a value; True when a register moved."""
+        x = int.from_bytes(
+            hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "little"
+        )
+        idx = x >> (64 - self.p)
+        rest = x & ((1 << (64 - self.p)) - 1)
+        rank = (64 - self.p) - rest.bit_length() + 1
+        if rank > self.registers[idx]:
+            self.registers[idx] = rank
+            return True
+        return False
+
+    def merge(self, other: "HyperLogLog") -> bool:
+        """Fold another sketch of the same precision in; True when anything changed."""
+        if other.p != self.p:
+            raise ValueError("Cannot merge HyperLogLog sketches of different precision")
+        merged = bytearray(map(max, self.registers, other.registers))
+        changed = merged != self.registers
+        self.registers = merged
+        return changed
+
+    def count(self) -> int:
+        m = self.m
+        estimate = (
+            (0.7213 / (1 + 1.079 / m))
+            * m
+            * m
+            / sum(self._INVERSE_POWERS[r] for r in self.registers)
+        )
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            # Linear counting is far more accurate for small cardinalities
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+    def to_bytes(self) -> bytes:
+        return bytes([self.p]) + bytes(self.registers)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "HyperLogLog":
+        return cls(data[0], data[1:])
+
+
+class SpaceSaving:
+    """Space-Saving top-k counter: at most `capacity` items, each with an overcount bound.
+
+    Any item seen more than total/capacity times is guaranteed to be tracked.
+    Summaries merge by summing counts, charging items a side lacks with that
+    side's minimum (Agarwal et al.), so per-bucket sketches roll up freely.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = max(1, capacity)
+        self.total = 0
+        # item -> [count, error]
+        self.counters: Dict[str, List[int]] = {}
+        # Lazy min-heap of (count, item); entries may lag behind the counters
+        self._heap: List[Tuple[int, str]] = []
+
+    def _pop_min(self) -> Tuple[str, int]:
+        if len(self._heap) < len(self.counters):
+            self._heap = [(c[0], item) for item, c in self.counters.items()]
+            heapq.heapify(self._heap)
+        while True:
+            count, item = heapq.heappop(self._heap)
+            current = self.counters.get(item)
+            if current is None:
+                continue
+            if current[0] == count:
+                return item, count
+            heapq.heappush(self._heap, (current[0], item))
+
+    def add(self, item: str, n: int = 1) -> None:
+        self.total += n
+        counter = self.counters.get(item)
+        if counter is not None:
+            counter[0] += n
+        elif len(self.counters) < self.capacity:
+            self.counters[item] = [n, 0]
+            heapq.heappush(self._heap, (n, item))
+        else:
+            # Replace the minimum; the newcomer inherits its count as error
+            evicted, floor = self._pop_min()
+            del self.counters[evicted]
+            self.counters[item] = [floor + n, floor]
+            heapq.heappush(self._heap, (floor + n, item))
+
+    def min_count(self) -> int:
+        """Count any untracked item may have reached; 0 until the summary fills up."""
+        if len(self.counters) < self.capacity:
+            return 0
+        return min(c[0] for c in self.counters.values())
+
+    def merge(self, other: "SpaceSaving") -> None:
+        floor_a, floor_b = self.min_count(), other.min_count()
+        merged = {}
+        for item in self.counters.keys() | other.counters.keys():
+            count_a, error_a = self.counters.get(item, (floor_a, floor_a))
+            count_b, error_b = other.counters.get(item, (floor_b, floor_b))
+            merged[item] = [count_a + count_b, error_a + error_b]
+        keep = heapq.nlargest(self.capacity, merged.items(), key=lambda kv: kv[1][0])
+        self.counters = dict(keep)
+        self.total += other.total
+        self._heap = []
+
+    def top(self, n: int) -> List[Tuple[str, int, int]]:
+        """(item, count, error) for the n largest counts; count - error is a lower bound."""
+        ranked = heapq.nlargest(n, self.counters.items(), key=lambda kv: kv[1][0])
+        return [(item, count, error) for item, (count, error) in ranked]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "capacity": self.capacity,
+            "total": self.total,
+            "items": [[item, c[0], c[1]] for item, c in self.counters.items()],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SpaceSaving":
+        sketch = cls(data["capacity"])
+        sketch.total = data["total"]
+        sketch.counters = {item: [count, error] for item, count, error in data["items"]}
+        return sketch
+
+
+class QuantileSketch:
+    """Log-bucketed quantile sketch (DDSketch) with a fixed relative error.
+
+    A value x lands in bucket ceil(log_gamma(x)); any quantile it reports is
+    within `relative_accuracy` of the true value. Positive values only;
+    zero and below are counted separately. Sketches merge by adding buckets.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.buckets: Dict[int, int] = {}
+        self.zeros = 0
+        self.count = 0
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        if value <= 0:
+            self.zeros += 1
+            return
+        key = math.ceil(math.log(value) / self._log_gamma)
+        self.buckets[key] = self.buckets.get(key, 0) + 1
+
+    def merge(self, other: "QuantileSketch") -> None:
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge quantile sketches of different accuracy")
+        for key, n in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + n
+        self.zeros += other.zeros
+        self.count += other.count
+
+    def quantile(self, q: float) -> float | None:
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zeros
+        if rank < seen:
+            return 0.0
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if seen > rank:
+                # Midpoint of the bucket (gamma**(key-1), gamma**key] in relative terms
+                return 2 * self.gamma**key / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.buckets) / (self.gamma + 1)
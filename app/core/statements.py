@@ -0,0 +1,181 @@
+import hashlib
+import heapq
+import logging
+import re
+import time
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple
+
+from app.core.config import settings
+from app.core.sketches import QuantileSketch
+
+logger = logging.getLogger("temporallayr.statements")
+
+STATEMENT_ORDERINGS = ("total_time", "mean_time", "max_time", "p99", "calls", "rows")
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_PARAM = re.compile(r"\$\d+|%\(\w+\)s|\?")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+# IN lists and multi-row VALUES expand to one placeholder per element
+_LIST = re.compile(r"\(\s*\?(?:\s*(?:::\w+)?\s*,\s*\?)*(?:::\w+)?\s*\)")
+_ROWS = re.compile(r"(\(\.\.\.\))(?:\s*,\s*\(\.\.\.\))+")
+_SPACE = re.compile(r"\s+")
+_TABLE = re.compile(r"\b(?:FROM|INTO|UPDATE|JOIN)\s+\"?([\w.]+)", re.IGNORECASE)
+
+
+@lru_cache(maxsize=4096)
+def normalize_sql(statement: str) -> str:
+    """Statement text with literals and placeholders folded to `?` and lists to `(...)`."""
+    sql = _STRING.sub("?", statement)
+    sql = _PARAM.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _LIST.sub("(...)", sql)
+    sql = _ROWS.sub(r"\1", sql)
+    return _SPACE.sub(" ", sql).strip()
+
+
+@lru_cache(maxsize=4096)
+def statement_fingerprint(statement: str) -> str:
+    """Short stable id for a statement shape: `<verb>:<first table>:<hash>`."""
+    sql = normalize_sql(statement)
+    verb = sql.split(" ", 1)[0].lower() if sql else "empty"
+    table = _TABLE.search(sql)
+    digest = hashlib.blake2b(sql.encode(), digest_size=4).hexdigest()
+    return f"{verb}:{table.group(1) if table else '-'}:{digest}"
+
+
+class _StatementEntry:
+    __slots__ = (
+        "query",
+        "calls",
+        "errors",
+        "total",
+        "max",
+        "rows",
+        "sketch",
+        "logged_at",
+        "suppressed",
+    )
+
+    def __init__(self, query: str):
+        self.query = query
+        self.calls = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.rows = 0
+        self.sketch = QuantileSketch()
+        self.logged_at = float("-inf")
+        self.suppressed = 0
+
+    def summary(self, fingerprint: str) -> Dict[str, Any]:
+        def ms(seconds):
+            return None if seconds is None else round(seconds * 1000, 3)
+
+        return {
+            "fingerprint": fingerprint,
+            "query": self.query,
+            "calls": self.calls,
+            "errors": self.errors,
+            "rows": self.rows,
+            "total_time_ms": ms(self.total),
+            "mean_time_ms": ms(self.total / self.calls) if self.calls else None,
+            "max_time_ms": ms(self.max),
+            "p50_ms": ms(self.sketch.quantile(0.5)),
+            "p99_ms": ms(self.sketch.quantile(0.99)),
+        }
+
+
+class StatementStats:
+    """Per-process pg_stat_statements: call count, time and rows per statement fingerprint.
+
+    Replaces a log line per statement. Only statements slower than
+    DB_SLOW_STATEMENT_MS are logged, at most once per fingerprint per
+    DB_SLOW_STATEMENT_LOG_INTERVAL_SECONDS, with a count of the slow
+    calls skipped since. When STATEMENT_STATS_MAX fingerprints are tracked,
+    the least-called 5% are dropped to make room, as pg_stat_statements does.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = max(1, capacity)
+        self._entries: Dict[str, _StatementEntry] = {}
+        self.evicted = 0
+        self.reset_at = time.time()
+
+    def _entry(self, statement: str) -> Tuple[str, _StatementEntry]:
+        fingerprint = statement_fingerprint(statement)
+        entry = self._entries.get(fingerprint)
+        if entry is None:
+            if len(self._entries) >= self.capacity:
+                self._evict()
+            entry = self._entries[fingerprint] = _StatementEntry(
+                normalize_sql(statement)
+            )
+        return fingerprint, entry
+
+    def _evict(self) -> None:
+        drop = max(1, len(self._entries) // 20)
+        entries = self._entries
+        for fingerprint in heapq.nsmallest(
+            drop, entries, key=lambda f: entries[f].calls
+        ):
+            del entries[fingerprint]
+        self.evicted += drop
+
+    def record(self, statement: str, seconds: float, rows: int) -> None:
+        fingerprint, entry = self._entry(statement)
+        entry.calls += 1
+        entry.total += seconds
+        entry.rows += rows
+        if seconds > entry.max:
+            entry.max = seconds
+        entry.sketch.add(seconds)
+
+        if seconds * 1000 < settings.DB_SLOW_STATEMENT_MS:
+            return
+        now = time.monotonic()
+        if now - entry.logged_at < settings.DB_SLOW_STATEMENT_LOG_INTERVAL_SECONDS:
+            entry.suppressed += 1
+            return
+        logger.warning(
+            f"DB_QUERY SLOW | duration_ms={seconds * 1000:.2f} | fingerprint={fingerprint} "
+            f"| suppressed={entry.suppressed} | query={statement[:500]}"
+        )
+        entry.logged_at = now
+        entry.suppressed = 0
+
+    def record_error(self, statement: str) -> None:
+        self._entry(statement)[1].errors += 1
+
+    def top(
+        self, limit: int = 20, order_by: str = "total_time"
+    ) -> List[Dict[str, Any]]:
+        """Heaviest statements first; `order_by` is one of STATEMENT_ORDERINGS."""
+        keys = {
+            "total_time": lambda e: e.total,
+            "mean_time": lambda e: e.total / e.calls if e.calls else 0.0,
+            "max_time": lambda e: e.max,
+            "p99": lambda e: e.sketch.quantile(0.99) or 0.0,
+            "calls": lambda e: e.calls,
+            "rows": lambda e: e.rows,
+        }
+        key = keys[order_by]
+        ranked = sorted(self._entries.items(), key=lambda kv: key(kv[1]), reverse=True)
+        return [entry.summary(fingerprint) for fingerprint, entry in ranked[:limit]]
+
+    def reset(self) -> None:
+        self._entries.clear()
+        self.evicted = 0
+        self.reset_at = time.time()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "tracked": len(self._entries),
+            "capacity": self.capacity,
+            "evicted": self.evicted,
+            "calls": sum(e.calls for e in self._entries.values()),
+            "since": self.reset_at,
+        }
+
+
+statement_stats = StatementStats(settings.STATEMENT_STATS_MAX)
@@ -1,9 +1,10 @@
 import asyncio
 import logging
 from sqlalchemy import text
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import AsyncGenerator, Optional
 from app.core.config import settings
+from app.core import database as core_database
 
 logger = logging.getLogger(__name__)
 
@@ -39,18 +40,9 @@ if _db_url:
 else:
     logger.error("No DATABASE_URL — all DB operations will be skipped")
 
-engine = create_async_engine(
-    _db_url
-    or "postgresql+asyncpg://invalid/invalid",  # placeholder to avoid import crash
-    pool_size=5,
-    max_overflow=10,
-    pool_pre_ping=True,
-    connect_args={"timeout": 30},  # give Railway cold starts extra time
-)
-
-async_session_maker = async_sessionmaker(
-    engine, class_=AsyncSession, expire_on_commit=False
-)
+# Shares the process-wide engine and workload sub-pools from app.core.pool
+engine = core_database.engine
+async_session_maker = core_database.async_session_maker
 
 
 class DBStatus:
@@ -1,20 +1,58 @@
 import logging
 import asyncio
+import math
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from sqlalchemy import text
 from app.core.config import settings
+from app.core.replicas import replica_health_task, replica_router
+from app.core.database import maintenance_engine, pool_manager
+from app.core.logs import setup_logging
+from app.core.loop_monitor import LoadShedMiddleware, loop_monitor_task
+from app.core.middleware import RequestLoggingMiddleware
+from app.core.profiling import RequestProfilerMiddleware
+from app.core.responses import FastJSONResponse
+from app.core.self_trace import self_trace_task
+from app.core.scheduler import (
+    QueryContextMiddleware,
+    QueryRejected,
+    query_context,
+    schedulers,
+)
 from app.db.session import engine, db_status, db_reconnect_task
 from app.api.ingest import router as ingest_router, ingestion_worker_task
 from app.api.auth_test import router as auth_test_router
 from app.api.stats import router as stats_router
 from app.api.query import router as query_router
+from app.api.export import router as export_router
+from app.api.diff import router as diff_router
+from app.api.admin import router as admin_router
+from app.api.traces import router as traces_router
+from app.api.dashboard_api import router as dashboard_api_router
+from app.api.metrics import exposition_router as metrics_exposition_router
+from app.services.cold_storage import cold_store, cold_tiering_task
+from app.services.schema_catalog import schema_catalog_task
+from app.services.cardinality import cardinality_task
+from app.services.heavy_hitters import heavy_hitters_task
 from app.db.base import Base
+from app.core.database import Base as CoreBase
 import app.models.execution  # Import models to ensure they align with Base
+import app.models.event  # Registers the CoreBase tables created at startup
 
 logger = logging.getLogger(__name__)
-logging.basicConfig(level=logging.INFO)
+setup_logging()
+
+
+def _create_schema(sync_conn):
+    """Create missing tables with their indexes.
+
+    Indexes added to tables that already exist would block writes while they
+    build here, so they ship through scripts/migrate_indexes.py instead.
+    """
+    for metadata in (Base.metadata, CoreBase.metadata):
+        metadata.create_all(sync_conn)
 
 
 @asynccontextmanager
@@ -30,8 +68,8 @@ async def lifespan(app: FastAPI):
     logger.info(f"DATABASE_URL raw (masked): {masked}")
 
     try:
-        async with engine.begin() as conn:
-            await conn.run_sync(Base.metadata.create_all)
+        async with maintenance_engine.begin() as conn:
+            await conn.run_sync(_create_schema)
             await conn.execute(text("SELECT 1"))
             db_status.is_ready = True
             logger.info("Database connected successfully on startup — tables verified")
@@ -48,8 +86,8 @@ async def lifespan(app: FastAPI):
             for attempt in range(1, 4):
                 await asyncio.sleep(5)
                 try:
-                    async with engine.begin() as conn:
-                        await conn.run_sync(Base.metadata.create_all)
+                    async with maintenance_engine.begin() as conn:
+                        await conn.run_sync(_create_schema)
                         await conn.execute(text("SELECT 1"))
                     db_status.is_ready = True
                     logger.info(f"Database connected on startup retry #{attempt}")
@@ -64,15 +102,50 @@ async def lifespan(app: FastAPI):
 
     reconnect_task = asyncio.create_task(db_reconnect_task())
     queue_worker_task = asyncio.create_task(ingestion_worker_task())
+    # Tasks copy the context they are created in, so these run as the background workload
+    with query_context(workload="background"):
+        catalog_task = asyncio.create_task(schema_catalog_task())
+        top_k_task = asyncio.create_task(heavy_hitters_task())
+        distinct_task = asyncio.create_task(cardinality_task())
+        tiering_task = (
+            asyncio.create_task(cold_tiering_task()) if cold_store.enabled else None
+        )
+        trace_task = (
+            asyncio.create_task(self_trace_task())
+            if settings.SELF_TRACE_ENABLED
+            else None
+        )
+    replica_task = (
+        asyncio.create_task(replica_health_task()) if replica_router.enabled else None
+    )
+    monitor_task = asyncio.create_task(loop_monitor_task())
     yield
+    monitor_task.cancel()
     reconnect_task.cancel()
     queue_worker_task.cancel()
+    catalog_task.cancel()
+    top_k_task.cancel()
+    distinct_task.cancel()
+    if tiering_task:
+        tiering_task.cancel()
+    if trace_task:
+        trace_task.cancel()
+    if replica_task:
+        replica_task.cancel()
     await engine.dispose()
+    await maintenance_engine.dispose()
+    await pool_manager.export_engine.dispose()
     logger.info("Database engine disposed")
 
 
-app = FastAPI(title=settings.app_name, lifespan=lifespan)
+app = FastAPI(
+    title=settings.app_name,
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
+)
 
+# Added first so it runs innermost, after CORS has answered preflights
+app.add_middleware(QueryContextMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # Restrict in production
@@ -80,11 +153,23 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Wraps the app (not CORS/metrics) when a request asks to be profiled
+app.add_middleware(RequestProfilerMiddleware)
+# Refuses work while the loop lags; inside metrics so shed 503s are counted
+app.add_middleware(LoadShedMiddleware)
+# Outermost, so request latency covers the whole middleware stack
+app.add_middleware(RequestLoggingMiddleware)
 
 app.include_router(ingest_router, prefix="/v1")
 app.include_router(auth_test_router, prefix="/v1")
 app.include_router(stats_router, prefix="/v1")
 app.include_router(query_router, prefix="/v1")
+app.include_router(export_router, prefix="/v1")
+app.include_router(diff_router, prefix="/v1")
+app.include_router(admin_router, prefix="/v1")
+app.include_router(traces_router, prefix="/v1")
+app.include_router(dashboard_api_router, prefix="/v1")
+app.include_router(metrics_exposition_router)
 
 
 @app.on_event("startup")
@@ -92,6 +177,21 @@ async def startup_event():
     logger.info(f"Starting application in {settings.ENV} environment")
 
 
+@app.exception_handler(QueryRejected)
+async def query_rejected_handler(request: Request, exc: QueryRejected):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(max(1, math.ceil(exc.retry_after)))},
+    )
+
+
 @app.get("/health")
 def health_check():
-    return {"status": "ok", "db": "connected" if db_status.is_ready else "disconnected"}
+    return {
+        "status": "ok",
+        "db": "connected" if db_status.is_ready else "disconnected",
+        "pool": pool_manager.stats() if pool_manager else None,
+        "query_queues": {s.name: s.stats() for s in schedulers},
+        **(replica_router.stats() if replica_router.enabled else {}),
+    }
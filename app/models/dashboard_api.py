@@ -27,7 +27,7 @@ class DashboardSearchRequest(BaseModel):
     time_to: Optional[datetime] = None
     limit: int = Field(50, ge=1, le=1000)
     cursor: Optional[str] = Field(
-        None, description="cursor is formatted as {timestamp_iso}_{uuid}"
+        None, description="opaque next_cursor returned by the previous page"
     )
     select: Optional[List[str]] = None
 
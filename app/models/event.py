@@ -1,10 +1,35 @@
+import json
 import uuid
+from typing import Any, Dict, Optional
+
 from sqlalchemy import Column, String, DateTime, Index, Integer, func
+from sqlalchemy import BigInteger, Boolean, Float, LargeBinary, literal_column
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 
 from app.core.database import Base
 
 
+def execution_key(payload):
+    """coalesce(payload->>'execution_id', payload->>'id') with literal keys.
+
+    Keys are rendered inline rather than bound so query predicates match the
+    expression index below exactly.
+    """
+    return func.coalesce(
+        payload.op("->>")(literal_column("'execution_id'")),
+        payload.op("->>")(literal_column("'id'")),
+    )
+
+
+def payload_execution_key(payload: Dict[str, Any]) -> Optional[str]:
+    """execution_key() over a payload dict: first non-null key, rendered like `->>`."""
+    for key in ("execution_id", "id"):
+        value = payload.get(key)
+        if value is not None:
+            return value if isinstance(value, str) else json.dumps(value)
+    return None
+
+
 class Event(Base):
     """Production telemetry event mapping structural storage backend tables natively."""
 
@@ -19,10 +44,18 @@ class Event(Base):
     payload = Column(JSONB, nullable=False)
 
     # Composite indexes optimizing multi-tenant temporal slice scans naturally
+    # (id is the keyset tie-breaker so cursor seeks stay index-only)
     # Plus GIN index supporting deep JSON payload traversing natively
+    # and a single-row (tenant, execution) lookup newest-first
     __table_args__ = (
-        Index("idx_events_tenant_time", "tenant_id", timestamp.desc()),
+        Index("idx_events_tenant_time_id", "tenant_id", timestamp.desc(), id.desc()),
         Index("ix_events_payload_gin", "payload", postgresql_using="gin"),
+        Index(
+            "ix_events_tenant_execution",
+            tenant_id,
+            execution_key(payload),
+            timestamp.desc(),
+        ),
     )
 
 
@@ -36,7 +69,9 @@ class ExecutionSummary(Base):
     created_at = Column(DateTime(timezone=True), nullable=False, index=True)
     node_count = Column(Integer, nullable=False, default=1)
 
-    __table_args__ = (Index("ix_execs_tenant_created", "tenant_id", "created_at"),)
+    __table_args__ = (
+        Index("ix_execs_tenant_created_id", "tenant_id", "created_at", "id"),
+    )
 
 
 class Incident(Base):
@@ -56,6 +91,10 @@ class Incident(Base):
     fingerprint = Column(String, nullable=False, index=True, default="")
     occurrence_count = Column(Integer, nullable=False, default=1)
 
+    __table_args__ = (
+        Index("ix_incidents_tenant_time_id", "tenant_id", timestamp.desc(), id.desc()),
+    )
+
 
 class AlertRule(Base):
     """Production alert mapping constraints uniquely tracking notification parameters natively."""
@@ -71,3 +110,83 @@ class AlertRule(Base):
     created_at = Column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
+
+
+class TenantCounter(Base):
+    """Per-tenant row totals maintained transactionally at ingest, replacing count(*) scans."""
+
+    __tablename__ = "tenant_counters"
+
+    tenant_id = Column(String, primary_key=True)
+    resource = Column(String, primary_key=True)
+    count = Column(BigInteger, nullable=False, default=0)
+    # False until the first reader reconciles the counter against an exact count(*)
+    seeded = Column(Boolean, nullable=False, default=False)
+    updated_at = Column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+
+class ExecutionDigest(Base):
+    """Merkle digest of an execution graph, pinned to the event it was hashed from."""
+
+    __tablename__ = "execution_digests"
+
+    tenant_id = Column(String, primary_key=True)
+    execution_id = Column(String, primary_key=True)
+    event_id = Column(UUID(as_uuid=True), nullable=False)
+    event_timestamp = Column(DateTime(timezone=True), nullable=False)
+    root_hash = Column(String, nullable=False)
+    # node key -> [content hash, subtree hash]
+    node_hashes = Column(JSONB, nullable=False)
+
+
+class TraceTree(Base):
+    """Trace tree materialized at ingest as preorder parallel arrays (see app.query.trace_tree)."""
+
+    __tablename__ = "trace_trees"
+
+    event_id = Column(UUID(as_uuid=True), primary_key=True)
+    tenant_id = Column(String, nullable=False)
+    node_count = Column(Integer, nullable=False)
+    max_depth = Column(Integer, nullable=False)
+    duration_ms = Column(Float, nullable=False)
+    tree = Column(JSONB, nullable=False)
+
+
+class SchemaField(Base):
+    """Per-tenant payload JSON path catalog maintained from ingest."""
+
+    __tablename__ = "schema_fields"
+
+    tenant_id = Column(String, primary_key=True)
+    path = Column(String, primary_key=True)
+    types = Column(JSONB, nullable=False)
+    first_seen = Column(DateTime(timezone=True), nullable=False)
+    last_seen = Column(DateTime(timezone=True), nullable=False)
+    # Serialized HyperLogLog of the path's values, plus its last computed estimate
+    hll = Column(LargeBinary, nullable=False)
+    distinct_estimate = Column(BigInteger, nullable=False, default=0)
+
+
+class HeavyHitterBucket(Base):
+    """Persisted Space-Saving summary per tenant, kind and time bucket (0 = all time)."""
+
+    __tablename__ = "heavy_hitters"
+
+    tenant_id = Column(String, primary_key=True)
+    kind = Column(String, primary_key=True)
+    bucket = Column(BigInteger, primary_key=True)
+    sketch = Column(JSONB, nullable=False)
+
+
+class CardinalitySketch(Base):
+    """Serialized HyperLogLog per tenant, dimension and time bucket (granularity 0 = all time)."""
+
+    __tablename__ = "cardinality_sketches"
+
+    tenant_id = Column(String, primary_key=True)
+    dimension = Column(String, primary_key=True)
+    granularity = Column(Integer, primary_key=True)
+    bucket = Column(BigInteger, primary_key=True)
+    hll = Column(LargeBinary, nullable=False)
@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime, timezone
-from sqlalchemy import String, DateTime, Integer
+from sqlalchemy import String, DateTime, Integer, Index
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -22,3 +22,8 @@ class ExecutionEvent(Base):
     function_name: Mapped[str | None] = mapped_column(String, nullable=True)
     latency_ms: Mapped[int | None] = mapped_column(Integer, nullable=True)
     status: Mapped[str | None] = mapped_column(String, nullable=True)
+
+    # Backs keyset pagination of /v1/query over (timestamp, id)
+    __table_args__ = (
+        Index("ix_execution_events_tenant_time_id", "tenant_id", "timestamp", "id"),
+    )
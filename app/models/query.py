@@ -92,6 +92,49 @@ class DiffPayload(BaseModel):
     tenant_id: str = "demo-tenant"
 
 
+class DiffFieldChange(BaseModel):
+    """Single top-level key whose value differs; key is None for whole-value changes."""
+
+    key: Optional[Any] = None
+    a: Any = None
+    b: Any = None
+
+
+class DiffNodeRef(BaseModel):
+    """Node present on only one side, addressed by its name path from the root."""
+
+    id: Optional[Any] = None
+    name: str
+    path: str
+
+
+class DiffNodeChange(BaseModel):
+    """Aligned node pair whose own name, inputs or output differ."""
+
+    path: str
+    id_a: Optional[Any] = None
+    id_b: Optional[Any] = None
+    name: str
+    name_a: Optional[str] = None
+    inputs: List[DiffFieldChange] = []
+    output: List[DiffFieldChange] = []
+
+
+class DiffResponse(BaseModel):
+    """Merkle diff between two execution graphs; identical subtrees are never expanded."""
+
+    execution_a: str
+    execution_b: str
+    identical: bool
+    root_hash_a: str
+    root_hash_b: str
+    changed: List[DiffNodeChange]
+    added: List[DiffNodeRef]
+    removed: List[DiffNodeRef]
+    compared_nodes: int
+    skipped_subtrees: int
+
+
 class IncidentItem(BaseModel):
     """Schema tracking single executions isolated anomaly reports structurally."""
 
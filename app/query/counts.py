@@ -0,0 +1,166 @@
+import json
+import logging
+import time
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from app.core.database import async_session_maker
+from app.models.event import TenantCounter
+
+logger = logging.getLogger("temporallayr.query.counts")
+
+# Filtered estimates below this many rows are cheap enough to count exactly
+EXACT_COUNT_THRESHOLD = 1000
+
+
+class TotalCount(NamedTuple):
+    value: int
+    exact: bool
+
+
+class _Explain(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) wrapper so planner estimates reuse normal bind processing."""
+
+    inherit_cache = False
+
+    def __init__(self, stmt):
+        self.stmt = stmt
+
+
+@compiles(_Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.stmt, **kw)
+
+
+class TotalCounter:
+    """Total-count strategy layer.
+
+    Unfiltered totals come from `tenant_counters`, incremented in the same
+    transaction as the ingest that adds the rows. Filtered totals use the
+    planner's row estimate (itself derived from pg_class statistics) unless
+    the caller asks for an exact count(*).
+    """
+
+    def __init__(self, cache_ttl: float = 5.0):
+        self._cache_ttl = cache_ttl
+        # (tenant_id, resource) -> (count, fetched_at)
+        self._cache: Dict[Tuple[str, str], Tuple[int, float]] = {}
+
+    async def increment(self, session, deltas: Dict[Tuple[str, str], int]) -> None:
+        """Add ingest deltas inside the caller's transaction; the caller commits."""
+        # Stable lock order keeps concurrent ingest transactions deadlock-free
+        for (tenant_id, resource), delta in sorted(deltas.items()):
+            if not tenant_id or not delta:
+                continue
+            stmt = insert(TenantCounter).values(
+                tenant_id=tenant_id, resource=resource, count=delta, seeded=False
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[TenantCounter.tenant_id, TenantCounter.resource],
+                set_={
+                    "count": TenantCounter.count + delta,
+                    "updated_at": func.now(),
+                },
+            )
+            await session.execute(stmt)
+            self._cache.pop((tenant_id, resource), None)
+
+    async def unfiltered_total(
+        self, tenant_id: str, resource: str, model: Any, exact: bool = False
+    ) -> TotalCount:
+        """Total rows of `model` for a tenant, from the ingest-maintained counter."""
+        if exact:
+            return TotalCount(await self._exact_count(tenant_id, model), True)
+
+        cached = self._cache.get((tenant_id, resource))
+        if cached and time.monotonic() - cached[1] < self._cache_ttl:
+            # Served without a round-trip, so possibly behind the latest commit
+            return TotalCount(cached[0], False)
+
+        async with async_session_maker() as session:
+            row = (
+                await session.execute(
+                    select(TenantCounter.count, TenantCounter.seeded).where(
+                        TenantCounter.tenant_id == tenant_id,
+                        TenantCounter.resource == resource,
+                    )
+                )
+            ).first()
+
+        if row and row.seeded:
+            value = row.count
+        else:
+            value = await self._seed(tenant_id, resource, model)
+        self._cache[(tenant_id, resource)] = (value, time.monotonic())
+        return TotalCount(value, True)
+
+    async def filtered_total(self, session, stmt, exact: bool = False) -> TotalCount:
+        """Total rows matched by `stmt`: planner estimate by default, count(*) on request."""
+        if not exact:
+            estimate = await self._estimate(session, stmt)
+            if estimate is not None and estimate >= EXACT_COUNT_THRESHOLD:
+                return TotalCount(estimate, False)
+
+        count_stmt = select(func.count()).select_from(stmt.order_by(None).subquery())
+        return TotalCount((await session.execute(count_stmt)).scalar() or 0, True)
+
+    async def _estimate(self, session, stmt) -> Optional[int]:
+        try:
+            plan = (await session.execute(_Explain(stmt.order_by(None)))).scalar()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return int(plan[0]["Plan"]["Plan Rows"])
+        except Exception as e:
+            logger.warning(f"[COUNT] planner estimate unavailable, counting: {e}")
+            return None
+
+    async def _exact_count(self, tenant_id: str, model: Any) -> int:
+        async with async_session_maker() as session:
+            stmt = select(func.count()).where(model.tenant_id == tenant_id)
+            return (await session.execute(stmt.select_from(model))).scalar() or 0
+
+    async def _seed(self, tenant_id: str, resource: str, model: Any) -> int:
+        """Reconcile a counter with count(*) once, under the counter row lock.
+
+        Ingest increments take the same row lock, so every batch is either
+        visible to the count or applied on top of it after this commit.
+        """
+        async with async_session_maker() as session:
+            await session.execute(
+                insert(TenantCounter)
+                .values(tenant_id=tenant_id, resource=resource, count=0, seeded=False)
+                .on_conflict_do_nothing()
+            )
+            await session.execute(
+                select(TenantCounter.count)
+                .where(
+                    TenantCounter.tenant_id == tenant_id,
+                    TenantCounter.resource == resource,
+                )
+                .with_for_update()
+            )
+            exact = (
+                await session.execute(
+                    select(func.count())
+                    .select_from(model)
+                    .where(model.tenant_id == tenant_id)
+                )
+            ).scalar() or 0
+            await session.execute(
+                update(TenantCounter)
+                .where(
+                    TenantCounter.tenant_id == tenant_id,
+                    TenantCounter.resource == resource,
+                )
+                .values(count=exact, seeded=True, updated_at=func.now())
+            )
+            await session.commit()
+            logger.info(f"[COUNT] seeded tenant={tenant_id} {resource}={exact}")
+            return exact
+
+
+total_counter = TotalCounter()
@@ -0,0 +1,349 @@
+import hashlib
+import json
+import logging
+from collections import OrderedDict, defaultdict, deque
+from typing import Any, Deque, Dict, List, NamedTuple, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+
+from app.core.database import async_session_maker
+from app.models.event import Event, ExecutionDigest
+
+logger = logging.getLogger("temporallayr.query.diff")
+
+# Node metadata fields whose changes a diff reports
+DIFF_FIELDS = ("inputs", "output")
+# Diff results kept per process, keyed by both executions' root hashes
+DIFF_CACHE_ENTRIES = 512
+
+
+class GraphDigest(NamedTuple):
+    root: str
+    # node key -> (content hash, subtree hash)
+    nodes: Dict[str, Tuple[str, str]]
+
+
+class ExecutionNotFound(LookupError):
+    pass
+
+
+def _hash(data: str) -> str:
+    return hashlib.blake2b(data.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _fields(node: Dict[str, Any]) -> Dict[str, Any]:
+    metadata = node.get("metadata")
+    if not isinstance(metadata, dict):
+        metadata = {}
+    return {field: metadata.get(field) for field in DIFF_FIELDS}
+
+
+class GraphTree:
+    """Parent/child index over a graph's flat node list.
+
+    Nodes are keyed by id, or by list position when they have none; nodes
+    with a missing parent become roots, and cycles are cut where first seen.
+    """
+
+    def __init__(self, graph: Dict[str, Any]):
+        nodes = graph.get("nodes") or []
+        self.nodes: Dict[str, Dict[str, Any]] = {}
+        # node key -> index in the payload's node list
+        self.positions: Dict[str, int] = {}
+        for position, node in enumerate(nodes if isinstance(nodes, list) else []):
+            if not isinstance(node, dict):
+                continue
+            key = str(node["id"]) if node.get("id") not in (None, "") else ""
+            if not key or key in self.nodes:
+                key = f"{key}#{position}"
+            self.nodes[key] = node
+            self.positions[key] = position
+
+        self.children: Dict[str, List[str]] = {key: [] for key in self.nodes}
+        self.roots: List[str] = []
+        parents: Dict[str, str] = {}
+        for key, node in self.nodes.items():
+            parent = node.get("parent_id")
+            parent = str(parent) if parent not in (None, "") else None
+            if parent in self.children and parent != key:
+                self.children[parent].append(key)
+                parents[key] = parent
+            else:
+                self.roots.append(key)
+
+        reached: set = set()
+        self._reach(self.roots, reached)
+        for key in self.nodes:
+            if key not in reached:
+                # Only cycle members are unreachable from the roots; cut one loose
+                self.children[parents.pop(key)].remove(key)
+                self.roots.append(key)
+                self._reach([key], reached)
+
+    def _reach(self, keys: List[str], reached: set) -> None:
+        stack = list(keys)
+        while stack:
+            key = stack.pop()
+            if key not in reached:
+                reached.add(key)
+                stack.extend(self.children[key])
+
+    def name(self, key: str) -> str:
+        return str(self.nodes[key].get("name", ""))
+
+
+def tree_digest(tree: GraphTree) -> GraphDigest:
+    """Iterative post-order hash: content covers name and DIFF_FIELDS, subtrees
+    fold in sorted child hashes so sibling order does not matter."""
+    nodes: Dict[str, Tuple[str, str]] = {}
+    for root in tree.roots:
+        stack = [(root, False)]
+        while stack:
+            key, expanded = stack.pop()
+            children = tree.children[key]
+            if not expanded:
+                stack.append((key, True))
+                stack.extend((child, False) for child in children)
+                continue
+            node = tree.nodes[key]
+            content = _hash(
+                json.dumps(
+                    [node.get("name"), _fields(node)],
+                    sort_keys=True,
+                    separators=(",", ":"),
+                    default=str,
+                )
+            )
+            subtree = _hash(content + "".join(sorted(nodes[c][1] for c in children)))
+            nodes[key] = (content, subtree)
+    root = _hash("".join(sorted(nodes[r][1] for r in tree.roots)))
+    return GraphDigest(root, nodes)
+
+
+def upsert_digests(rows: List[Dict[str, Any]]):
+    """Store digests computed at ingest; an older event never replaces a newer one."""
+    stmt = insert(ExecutionDigest).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=[ExecutionDigest.tenant_id, ExecutionDigest.execution_id],
+        set_={
+            column: stmt.excluded[column]
+            for column in ("event_id", "event_timestamp", "root_hash", "node_hashes")
+        },
+        where=ExecutionDigest.event_timestamp <= stmt.excluded.event_timestamp,
+    )
+
+
+def _field_changes(a: Any, b: Any) -> List[Dict[str, Any]]:
+    """Top-level key changes between two values; non-dicts compare whole."""
+    if a == b:
+        return []
+    if not (isinstance(a, dict) and isinstance(b, dict)):
+        return [{"key": None, "a": a, "b": b}]
+    return [
+        {"key": key, "a": a.get(key), "b": b.get(key)}
+        for key in sorted(a.keys() | b.keys(), key=str)
+        if key not in a or key not in b or a[key] != b[key]
+    ]
+
+
+def _align(
+    tree_a: GraphTree, keys_a: List[str], tree_b: GraphTree, keys_b: List[str]
+) -> Tuple[List[Tuple[str, str]], List[str], List[str]]:
+    """Pair siblings by shared id, then by name in sibling order."""
+    ids_b = {key for key in keys_b if "#" not in key}
+    pairs, rest_a, used = [], [], set()
+    for key in keys_a:
+        if key in ids_b:
+            pairs.append((key, key))
+            used.add(key)
+        else:
+            rest_a.append(key)
+
+    by_name: Dict[str, Deque[str]] = defaultdict(deque)
+    for key in keys_b:
+        if key not in used:
+            by_name[tree_b.name(key)].append(key)
+    only_a = []
+    for key in rest_a:
+        queue = by_name.get(tree_a.name(key))
+        if queue:
+            pairs.append((key, queue.popleft()))
+        else:
+            only_a.append(key)
+    left = {key for queue in by_name.values() for key in queue}
+    only_b = [key for key in keys_b if key in left]
+    return pairs, only_a, only_b
+
+
+def _node_ref(tree: GraphTree, key: str, path: str) -> Dict[str, Any]:
+    return {"id": tree.nodes[key].get("id"), "name": tree.name(key), "path": path}
+
+
+def _subtree_refs(tree: GraphTree, key: str, prefix: str) -> List[Dict[str, Any]]:
+    refs, stack = [], [(key, prefix)]
+    while stack:
+        current, parent_path = stack.pop()
+        path = f"{parent_path}/{tree.name(current)}"
+        refs.append(_node_ref(tree, current, path))
+        stack.extend((child, path) for child in reversed(tree.children[current]))
+    return refs
+
+
+def _result(root_a: str, root_b: str, **details: Any) -> Dict[str, Any]:
+    result = {
+        "identical": root_a == root_b,
+        "root_hash_a": root_a,
+        "root_hash_b": root_b,
+        "changed": [],
+        "added": [],
+        "removed": [],
+        "compared_nodes": 0,
+        "skipped_subtrees": 0,
+    }
+    result.update(details)
+    return result
+
+
+def diff_trees(
+    tree_a: GraphTree, digest_a: GraphDigest, tree_b: GraphTree, digest_b: GraphDigest
+) -> Dict[str, Any]:
+    """Walk both trees top-down, skipping every aligned pair whose subtree hashes match."""
+    changed: List[Dict[str, Any]] = []
+    added: List[Dict[str, Any]] = []
+    removed: List[Dict[str, Any]] = []
+    compared = skipped = 0
+
+    if digest_a.root != digest_b.root:
+        stack = [(tree_a.roots, tree_b.roots, "")]
+        while stack:
+            keys_a, keys_b, prefix = stack.pop()
+            pairs, only_a, only_b = _align(tree_a, keys_a, tree_b, keys_b)
+            for key_a, key_b in pairs:
+                content_a, subtree_a = digest_a.nodes[key_a]
+                content_b, subtree_b = digest_b.nodes[key_b]
+                if subtree_a == subtree_b:
+                    skipped += 1
+                    continue
+                compared += 1
+                path = f"{prefix}/{tree_b.name(key_b)}"
+                if content_a != content_b:
+                    node_a, node_b = tree_a.nodes[key_a], tree_b.nodes[key_b]
+                    fields_a, fields_b = _fields(node_a), _fields(node_b)
+                    change = {
+                        "path": path,
+                        "id_a": node_a.get("id"),
+                        "id_b": node_b.get("id"),
+                        "name": tree_b.name(key_b),
+                    }
+                    if tree_a.name(key_a) != tree_b.name(key_b):
+                        change["name_a"] = tree_a.name(key_a)
+                    for field in DIFF_FIELDS:
+                        change[field] = _field_changes(fields_a[field], fields_b[field])
+                    changed.append(change)
+                stack.append((tree_a.children[key_a], tree_b.children[key_b], path))
+            for key in only_a:
+                removed.extend(_subtree_refs(tree_a, key, prefix))
+            for key in only_b:
+                added.extend(_subtree_refs(tree_b, key, prefix))
+
+    return _result(
+        digest_a.root,
+        digest_b.root,
+        changed=changed,
+        added=added,
+        removed=removed,
+        compared_nodes=compared,
+        skipped_subtrees=skipped,
+    )
+
+
+class DiffEngine:
+    """Execution graph diffs driven by the Merkle digests stored at ingest.
+
+    Identical executions are answered from the digest rows alone; results
+    are cached by root-hash pair, so re-ingesting either side misses naturally.
+    """
+
+    def __init__(self, max_entries: int = DIFF_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[Tuple[str, ...], Dict[str, Any]]" = OrderedDict()
+
+    async def _roots(self, tenant_id: str, ids: List[str]) -> Dict[str, str]:
+        async with async_session_maker() as session:
+            rows = await session.execute(
+                select(ExecutionDigest.execution_id, ExecutionDigest.root_hash).where(
+                    ExecutionDigest.tenant_id == tenant_id,
+                    ExecutionDigest.execution_id.in_(ids),
+                )
+            )
+            return {execution_id: root for execution_id, root in rows}
+
+    async def _load(
+        self, tenant_id: str, ids: List[str]
+    ) -> Dict[str, Tuple[GraphTree, GraphDigest]]:
+        """Graph plus stored digest, joined on the exact event the digest came from."""
+        loaded: Dict[str, Tuple[GraphTree, GraphDigest]] = {}
+        async with async_session_maker() as session:
+            rows = await session.execute(
+                select(
+                    ExecutionDigest.execution_id,
+                    ExecutionDigest.root_hash,
+                    ExecutionDigest.node_hashes,
+                    Event.payload,
+                )
+                .join(Event, Event.id == ExecutionDigest.event_id)
+                .where(
+                    ExecutionDigest.tenant_id == tenant_id,
+                    ExecutionDigest.execution_id.in_(ids),
+                )
+            )
+            for execution_id, root, node_hashes, payload in rows:
+                tree = GraphTree(payload)
+                if node_hashes.keys() == tree.nodes.keys():
+                    nodes = {key: tuple(pair) for key, pair in node_hashes.items()}
+                    loaded[execution_id] = (tree, GraphDigest(root, nodes))
+
+        # Digest-less (pre-digest or cold-tiered) executions are hashed on the fly
+        from app.query.service import storage_engine
+
+        for execution_id in ids:
+            if execution_id not in loaded:
+                graph = await storage_engine.get_execution(tenant_id, execution_id)
+                if graph is None:
+                    raise ExecutionNotFound(execution_id)
+                tree = GraphTree(graph)
+                loaded[execution_id] = (tree, tree_digest(tree))
+        return loaded
+
+    async def diff(
+        self, tenant_id: str, execution_a: str, execution_b: str
+    ) -> Dict[str, Any]:
+        ids = [execution_a, execution_b]
+        roots = await self._roots(tenant_id, ids)
+        cache_key = None
+        if all(execution_id in roots for execution_id in ids):
+            root_a, root_b = roots[execution_a], roots[execution_b]
+            if root_a == root_b:
+                # Equal roots: identical graphs, no payload needs loading
+                return _result(
+                    root_a, root_b, execution_a=execution_a, execution_b=execution_b
+                )
+            cache_key = (tenant_id, execution_a, execution_b, root_a, root_b)
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                self._cache.move_to_end(cache_key)
+                return cached
+
+        loaded = await self._load(tenant_id, list(dict.fromkeys(ids)))
+        result = diff_trees(*loaded[execution_a], *loaded[execution_b])
+        result.update(execution_a=execution_a, execution_b=execution_b)
+
+        if cache_key and self.max_entries > 0:
+            self._cache[cache_key] = result
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return result
+
+
+diff_engine = DiffEngine()
@@ -1,14 +1,17 @@
 import asyncio
+import json
 import time
 import logging
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Optional, Tuple
 from sqlalchemy.future import select
 from sqlalchemy import or_, and_, asc, desc, cast, String
 from sqlalchemy.dialects.postgresql import JSONB
 
-from app.core.database import async_session_maker
+from app.core.replicas import read_session
+from app.core.pagination import apply_keyset, decode_cursor, encode_cursor, paginate
 from app.models.event import Event, Incident
-from app.query.models import MultiResourceQueryRequest, QueryResult
+from app.query.models import MultiResourceQueryRequest, QueryResult, TimeRange
+from app.services.cold_storage import cold_store
 
 logger = logging.getLogger("temporallayr.query.engine")
 
@@ -20,19 +23,39 @@ class QueryEngine:
         self.default_timeout = default_timeout
         self.max_limit = max_limit
 
+    def _page_limit(self, query: MultiResourceQueryRequest) -> int:
+        return min(query.limit, self.max_limit)
+
+    def _keyset(self, stmt, query: MultiResourceQueryRequest, resource: str, columns):
+        """Seek past the request cursor; OFFSET survives only for cursor-less legacy callers."""
+        scope = f"query:{resource}:{query.tenant_id}:{query.sort.direction}"
+        stmt = apply_keyset(
+            stmt,
+            columns,
+            query.cursor,
+            scope,
+            descending=query.sort.direction == "desc",
+        )
+        if query.offset and not query.cursor:
+            stmt = stmt.offset(query.offset)
+        return stmt, scope
+
     async def _execute_with_safeguards(
-        self, stmt, limit: int
+        self, stmt, limit: int, tenant_id: Optional[str] = None
     ) -> Tuple[List[Any], bool]:
-        """Runs structurally complex SQL natively trapping timeouts accurately preserving app stability."""
+        """Runs structurally complex SQL natively trapping timeouts accurately preserving app stability.
+
+        Fetches one row past the capped limit so callers can tell whether a next page exists.
+        """
         actual_limit = min(limit, self.max_limit)
-        stmt = stmt.limit(actual_limit)
+        stmt = stmt.limit(actual_limit + 1)
 
         start_time = time.time()
         is_partial = False
         results = []
 
         try:
-            async with async_session_maker() as session:
+            async with read_session(tenant_id) as session:
                 task = asyncio.create_task(session.execute(stmt))
                 result = await asyncio.wait_for(task, timeout=self.default_timeout)
                 results = list(result.scalars().all())
@@ -52,8 +75,74 @@ class QueryEngine:
 
         return results, is_partial
 
-    async def search_events(self, query: MultiResourceQueryRequest) -> QueryResult:
-        """Search execution trace payloads directly checking boundaries natively."""
+    async def _union_cold(
+        self,
+        query: MultiResourceQueryRequest,
+        scope: str,
+        hot_rows: List[Event],
+        time_range: TimeRange | None,
+        equals: Dict[str, str],
+        match,
+    ) -> Tuple[List[Event], bool]:
+        """Merge cold Parquet segment rows into a hot page, preserving (timestamp, id) order.
+
+        Legacy OFFSET pages cover the hot tier only; cursor pages span both.
+        The cold scan stops at limit+1 rows past the cursor, so a page costs
+        the same wherever it falls in the cold tier.
+        """
+        if not cold_store.enabled or (query.offset and not query.cursor):
+            return hot_rows, False
+
+        descending = query.sort.direction == "desc"
+        limit = self._page_limit(query) + 1
+        start = time_range.start if time_range else None
+        end = time_range.end if time_range else None
+        bound = tuple(decode_cursor(scope, query.cursor)) if query.cursor else None
+        if bound and descending:
+            end = min(end, bound[0]) if end else bound[0]
+        elif bound:
+            start = max(start, bound[0]) if start else bound[0]
+        if len(hot_rows) >= limit:
+            # A full hot page only takes cold rows that sort before its last row
+            last = hot_rows[-1].timestamp
+            if descending:
+                start = max(start, last) if start else last
+            else:
+                end = min(end, last) if end else last
+        if start and end and start > end:
+            return hot_rows, False
+
+        try:
+            cold_rows = await asyncio.wait_for(
+                cold_store.scan_events(
+                    query.tenant_id,
+                    start,
+                    end,
+                    equals,
+                    match,
+                    limit=limit,
+                    descending=descending,
+                    after=bound,
+                ),
+                timeout=self.default_timeout,
+            )
+        except asyncio.TimeoutError:
+            logger.warning("[QUERY] cold segment scan timed out, hot rows only.")
+            return hot_rows, True
+        except Exception as e:
+            logger.error(f"[QUERY] cold segment scan failed: {e}")
+            return hot_rows, True
+
+        # Ids guard against a segment written just before its rows were deleted
+        seen = {r.id for r in hot_rows}
+        merged = hot_rows + [e for e in cold_rows if e.id not in seen]
+        merged.sort(key=lambda r: (r.timestamp, r.id), reverse=descending)
+        return merged[:limit], False
+
+    async def _search_event_rows(
+        self, query: MultiResourceQueryRequest
+    ) -> Tuple[List[Event], bool, Any]:
+        """Shared event scan behind search_events and search_nodes, returning rows plus next cursor."""
         stmt = select(Event).where(Event.tenant_id == query.tenant_id)
 
         # Apply strict query boundaries natively
@@ -82,16 +171,44 @@ class QueryEngine:
             # We query if payload->'graph'->'nodes' contains this dict natively
             stmt = stmt.where(Event.payload["graph"]["nodes"].contains(node_match))
 
-        # Apply sort boundaries natively
-        if query.sort.field == "timestamp":
-            if query.sort.direction == "desc":
-                stmt = stmt.order_by(Event.timestamp.desc())
-            else:
-                stmt = stmt.order_by(Event.timestamp.asc())
+        # Apply sort boundaries natively; timestamp is the only sortable field
+        stmt, scope = self._keyset(stmt, query, "events", [Event.timestamp, Event.id])
 
-        stmt = stmt.offset(query.offset)
+        results, is_partial = await self._execute_with_safeguards(
+            stmt, query.limit, query.tenant_id
+        )
 
-        results, is_partial = await self._execute_with_safeguards(stmt, query.limit)
+        # Same predicates against the cold tier: bloom-backed equality plus payload checks
+        equals = {
+            k: v
+            for k, v in (
+                ("execution_id", filters.execution_id),
+                ("status", filters.status),
+            )
+            if v
+        }
+        needle = query.search_text.lower() if query.search_text else None
+
+        def match(event: Event) -> bool:
+            if needle and needle not in json.dumps(event.payload).lower():
+                return False
+            if filters.node_name:
+                nodes = event.payload.get("graph", {}).get("nodes", [])
+                return any(n.get("name") == filters.node_name for n in nodes)
+            return True
+
+        results, cold_partial = await self._union_cold(
+            query, scope, results, filters.time_range, equals, match
+        )
+        is_partial = is_partial or cold_partial
+        results, next_cursor = paginate(
+            results, self._page_limit(query), scope, key=lambda r: (r.timestamp, r.id)
+        )
+        return results, is_partial, next_cursor
+
+    async def search_events(self, query: MultiResourceQueryRequest) -> QueryResult:
+        """Search execution trace payloads directly checking boundaries natively."""
+        results, is_partial, next_cursor = await self._search_event_rows(query)
 
         logger.info(f"[QUERY] tenant={query.tenant_id} rows={len(results)}")
         warning = (
@@ -103,7 +220,11 @@ class QueryEngine:
         # Hydrate JSON explicitly avoiding Pydantic ORM strict serialization issues
         data = [r.payload for r in results]
         return QueryResult(
-            data=data, total=len(data), partial=is_partial, warning=warning
+            data=data,
+            total=len(data),
+            partial=is_partial,
+            warning=warning,
+            next_cursor=next_cursor,
         )
 
     async def search_incidents(self, query: MultiResourceQueryRequest) -> QueryResult:
@@ -129,14 +250,16 @@ class QueryEngine:
         if query.search_text:
             stmt = stmt.where(Incident.summary.ilike(f"%{query.search_text}%"))
 
-        if query.sort.direction == "desc":
-            stmt = stmt.order_by(Incident.timestamp.desc())
-        else:
-            stmt = stmt.order_by(Incident.timestamp.asc())
-
-        stmt = stmt.offset(query.offset)
+        stmt, scope = self._keyset(
+            stmt, query, "incidents", [Incident.timestamp, Incident.id]
+        )
 
-        results, is_partial = await self._execute_with_safeguards(stmt, query.limit)
+        results, is_partial = await self._execute_with_safeguards(
+            stmt, query.limit, query.tenant_id
+        )
+        results, next_cursor = paginate(
+            results, self._page_limit(query), scope, key=lambda r: (r.timestamp, r.id)
+        )
         logger.info(f"[QUERY] tenant={query.tenant_id} rows={len(results)}")
 
         data = [
@@ -155,36 +278,53 @@ class QueryEngine:
 
         warning = "Partial results returned natively." if is_partial else None
         return QueryResult(
-            data=data, total=len(data), partial=is_partial, warning=warning
+            data=data,
+            total=len(data),
+            partial=is_partial,
+            warning=warning,
+            next_cursor=next_cursor,
         )
 
     async def search_nodes(self, query: MultiResourceQueryRequest) -> QueryResult:
         """Isolated wrapper delegating to search_events but specifically requesting node extracts.
         For architectural purity, we filter events by node and extract matching nodes physically.
+
+        Pages advance a whole event at a time: the cursor points after the last event whose
+        matching nodes were all returned, so no node is skipped between pages. An event with
+        more matching nodes than the limit is returned whole, as a page of its own.
         """
         # We parse the base executions and extract nodes explicitly bounding in memory to simulate
         # complex PostgreSQL lateral joins without destabilizing bounds organically.
-        event_res = await self.search_events(query)
+        events, is_partial, next_cursor = await self._search_event_rows(query)
+        limit = self._page_limit(query)
+        scope = f"query:events:{query.tenant_id}:{query.sort.direction}"
 
         extracted_nodes = []
-        for ev in event_res.data:
-            nodes = ev.get("graph", {}).get("nodes", [])
-            for n in nodes:
+        for idx, ev in enumerate(events):
+            nodes = [
+                n
+                for n in ev.payload.get("graph", {}).get("nodes", [])
                 # Apply text search explicitly if it wasn't caught safely
-                if query.filters.node_name and n.get("name") != query.filters.node_name:
-                    continue
-                extracted_nodes.append(n)
-                if len(extracted_nodes) >= min(query.limit, self.max_limit):
-                    break
-            if len(extracted_nodes) >= min(query.limit, self.max_limit):
+                if not query.filters.node_name
+                or n.get("name") == query.filters.node_name
+            ]
+            if extracted_nodes and len(extracted_nodes) + len(nodes) > limit:
+                # Resume from this event on the next page
+                next_cursor = encode_cursor(
+                    scope, (events[idx - 1].timestamp, events[idx - 1].id)
+                )
                 break
+            extracted_nodes.extend(nodes)
 
         logger.info(f"[QUERY] tenant={query.tenant_id} rows={len(extracted_nodes)}")
         return QueryResult(
             data=extracted_nodes,
             total=len(extracted_nodes),
-            partial=event_res.partial,
-            warning=event_res.warning,
+            partial=is_partial,
+            warning="Partial results returned due to heavy query limits."
+            if is_partial
+            else None,
+            next_cursor=next_cursor,
         )
 
     async def search_clusters(self, query: MultiResourceQueryRequest) -> QueryResult:
@@ -197,14 +337,31 @@ class QueryEngine:
                 Event.payload.op("->>")("cluster_id") == query.filters.cluster_id
             )
 
-        if query.time_range:
-            if query.time_range.start:
-                stmt = stmt.where(Event.timestamp >= query.time_range.start)
-            if query.time_range.end:
-                stmt = stmt.where(Event.timestamp <= query.time_range.end)
+        time_range = query.filters.time_range
+        if time_range:
+            if time_range.start:
+                stmt = stmt.where(Event.timestamp >= time_range.start)
+            if time_range.end:
+                stmt = stmt.where(Event.timestamp <= time_range.end)
 
-        stmt = stmt.offset(query.offset)
-        results, is_partial = await self._execute_with_safeguards(stmt, query.limit)
+        stmt, scope = self._keyset(stmt, query, "clusters", [Event.timestamp, Event.id])
+        results, is_partial = await self._execute_with_safeguards(
+            stmt, query.limit, query.tenant_id
+        )
+
+        cluster_id = query.filters.cluster_id
+        results, cold_partial = await self._union_cold(
+            query,
+            scope,
+            results,
+            time_range,
+            {},
+            lambda e: not cluster_id or e.payload.get("cluster_id") == cluster_id,
+        )
+        is_partial = is_partial or cold_partial
+        results, next_cursor = paginate(
+            results, self._page_limit(query), scope, key=lambda r: (r.timestamp, r.id)
+        )
 
         logger.info(f"[QUERY] tenant={query.tenant_id} rows={len(results)}")
         warning = "Partial results returned natively." if is_partial else None
@@ -212,7 +369,11 @@ class QueryEngine:
         # Return exact cluster trace bounds organically
         data = [r.payload for r in results]
         return QueryResult(
-            data=data, total=len(data), partial=is_partial, warning=warning
+            data=data,
+            total=len(data),
+            partial=is_partial,
+            warning=warning,
+            next_cursor=next_cursor,
         )
 
 
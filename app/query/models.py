@@ -30,6 +30,7 @@ class MultiResourceQueryRequest(BaseModel):
     sort: SortOption = Field(default_factory=SortOption)
     limit: int = Field(default=100, le=5000)
     offset: int = Field(default=0, ge=0)
+    cursor: Optional[str] = None
 
 
 class QueryResult(BaseModel):
@@ -37,6 +38,7 @@ class QueryResult(BaseModel):
     total: int
     partial: bool = False
     warning: Optional[str] = None
+    next_cursor: Optional[str] = None
 
 
 class QueryRequest(BaseModel):
@@ -48,3 +50,4 @@ class QueryRequest(BaseModel):
     limit: int = Field(default=100)
     offset: int = Field(default=0)
     sort: Literal["asc", "desc"] = "desc"
+    cursor: Optional[str] = None
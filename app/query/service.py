@@ -3,6 +3,7 @@ import logging
 import time
 from typing import Dict, Any
 
+from app.core.pagination import InvalidCursorError
 from app.query.models import QueryRequest
 from app.services.storage_service import StorageService
 
@@ -13,11 +14,12 @@ storage_engine = StorageService()
 
 
 async def query_events(
-    request: QueryRequest, storage_engine: StorageService = None
+    request: QueryRequest, storage_engine: StorageService = None, raw: bool = False
 ) -> Dict[str, Any]:
     """
     Production Analytics Query Engine fetching bounds securely isolated via StorageService.
     Supports 5s strict server-side timeouts naturally guarding against DOS scans.
+    `raw` returns payloads as RawJSON text for app.core.raw_json responses.
     """
     from app.query.service import storage_engine as global_storage
 
@@ -51,6 +53,8 @@ async def query_events(
                 limit=request.limit,
                 offset=request.offset,
                 sort=request.sort,
+                cursor=request.cursor,
+                raw=raw,
             ),
             timeout=5.0,
         )
@@ -60,13 +64,19 @@ async def query_events(
         logger.info(f"[QUERY] result_count={len(results)}")
         logger.info(f"[QUERY] duration_ms={duration_ms}")
 
-        return {"results": results, "count": len(results)}
+        return {
+            "results": results,
+            "count": len(results),
+            "next_cursor": getattr(results, "next_cursor", None),
+        }
 
     except asyncio.TimeoutError:
         logger.warning(
             f"[QUERY] Exceeded 5s timeout limits natively tenant={request.tenant_id}"
         )
         return {"error": "query timeout"}
+    except InvalidCursorError as e:
+        return {"error": f"invalid cursor: {e}"}
     except Exception as e:
         logger.error(f"[QUERY] Server failure extracting bindings natively: {e}")
         return {"error": "internal server error"}
@@ -1,12 +1,16 @@
+import json
 import logging
 import math
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime, timezone
 
 from sqlalchemy.future import select
 
-from app.core.database import async_session_maker
+from app.core.profiling import timed
+from app.core.replicas import read_session
 from app.models.event import Event
+from app.services.cold_storage import BLOOM_COLUMNS, cold_store, payload_text
+from app.services.hot_store import empty_bucket, hot_store
 
 logger = logging.getLogger("temporallayr.query.timeseries")
 
@@ -29,21 +33,77 @@ def _compute_percentile(data: List[float], percentile: float) -> float:
     return d0 + (d1 - d0) * (k - f)
 
 
-async def aggregate_timeseries(
+def _accumulate(
+    buckets: Dict[int, Dict[str, Any]],
+    timestamp: datetime,
+    status: Optional[str],
+    duration_ms: Any,
+    interval_seconds: int,
+) -> None:
+    """Folds one event into its bucket; shared by the Postgres stream and cold segment scans."""
+    # Map absolute timestamps into bounded epoch discrete grids natively
+    if not timestamp.tzinfo:
+        ts = timestamp.replace(tzinfo=timezone.utc).timestamp()
+    else:
+        ts = timestamp.timestamp()
+
+    bucket_idx = int(ts // interval_seconds) * interval_seconds
+
+    if bucket_idx not in buckets:
+        buckets[bucket_idx] = empty_bucket(bucket_idx)
+
+    b = buckets[bucket_idx]
+    b["count"] += 1
+    if status == "FAILED":
+        b["errors"] += 1
+    b["latencies"].append(float(duration_ms))
+
+
+async def _accumulate_cold(
+    buckets: Dict[int, Dict[str, Any]],
     tenant_id: str,
     start_time: datetime,
     end_time: datetime,
     interval_seconds: int,
-    metric: str,
-    filters: Optional[Dict[str, Any]] = None,
-) -> List[Dict[str, Any]]:
-    """
-    Consumes highly-optimized execution streams grouping structural blocks naturally matching requested UI dimensions natively.
-    """
-    logger.info(
-        f"[TIMESERIES QUERY START] tenant={tenant_id} metric={metric} start={start_time} end={end_time}"
-    )
+    filters: Optional[Dict[str, Any]],
+) -> int:
+    """Adds tiered Parquet events to the buckets, pruning segments by time and filters."""
+    filters = filters or {}
+    equals = {k: str(v) for k, v in filters.items() if k in BLOOM_COLUMNS}
+    residual = {k: v for k, v in filters.items() if k not in BLOOM_COLUMNS}
+    columns = ["timestamp", "status", "duration_ms"]
+    if residual:
+        columns.append("payload")
+
+    rows = await cold_store.scan(tenant_id, start_time, end_time, equals, columns)
+    processed = 0
+    for row in rows:
+        if residual:
+            payload = json.loads(row["payload"])
+            if any(
+                payload_text(payload.get(key)) != str(val)
+                for key, val in residual.items()
+            ):
+                continue
+        _accumulate(
+            buckets,
+            row["timestamp"],
+            row["status"],
+            row["duration_ms"],
+            interval_seconds,
+        )
+        processed += 1
+    return processed
 
+
+async def _accumulate_stored(
+    tenant_id: str,
+    start_time: datetime,
+    end_time: datetime,
+    interval_seconds: int,
+    filters: Optional[Dict[str, Any]],
+) -> Tuple[Dict[int, Dict[str, Any]], int]:
+    """Buckets from Postgres plus any cold segments, with the number of events folded."""
     # 1. Bootstrapping SQL limits dynamically resolving across streaming cursors effortlessly safely avoiding N+1 blocks
     query = (
         select(Event)
@@ -63,7 +123,7 @@ async def aggregate_timeseries(
     buckets: Dict[int, Dict[str, Any]] = {}
     total_events_processed = 0
 
-    async with async_session_maker() as session:
+    async with read_session(tenant_id) as session:
         # Utilize yield_per dynamically resolving execution bounds into strictly memory-safe buffers (chunked by 5000 records organically)
         execution_stream = await session.stream(query.execution_options(yield_per=5000))
 
@@ -71,35 +131,48 @@ async def aggregate_timeseries(
             event: Event = row[0]
             total_events_processed += 1
 
-            # Map absolute timestamps into bounded epoch discrete grids natively
-            if not event.timestamp.tzinfo:
-                ts = event.timestamp.replace(tzinfo=timezone.utc).timestamp()
-            else:
-                ts = event.timestamp.timestamp()
-
-            bucket_idx = int(ts // interval_seconds) * interval_seconds
-
-            if bucket_idx not in buckets:
-                buckets[bucket_idx] = {
-                    "timestamp": datetime.fromtimestamp(
-                        bucket_idx, tz=timezone.utc
-                    ).isoformat(),
-                    "count": 0,
-                    "errors": 0,
-                    "latencies": [],
-                    "avg_duration": 0.0,
-                    "error_rate": 0.0,
-                }
-
-            b = buckets[bucket_idx]
-            b["count"] += 1
-            status = event.payload.get("status", "UNKNOWN")
-            if status == "FAILED":
-                b["errors"] += 1
-
             metrics_payload = event.payload.get("metrics", {})
-            duration_ms = metrics_payload.get("duration_ms", 0.0)
-            b["latencies"].append(float(duration_ms))
+            _accumulate(
+                buckets,
+                event.timestamp,
+                event.payload.get("status", "UNKNOWN"),
+                metrics_payload.get("duration_ms", 0.0),
+                interval_seconds,
+            )
+
+    # Union events already tiered out of Postgres into cold segments
+    if cold_store.enabled:
+        total_events_processed += await _accumulate_cold(
+            buckets, tenant_id, start_time, end_time, interval_seconds, filters
+        )
+
+    return buckets, total_events_processed
+
+
+@timed("aggregate_timeseries")
+async def aggregate_timeseries(
+    tenant_id: str,
+    start_time: datetime,
+    end_time: datetime,
+    interval_seconds: int,
+    metric: str,
+    filters: Optional[Dict[str, Any]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Consumes highly-optimized execution streams grouping structural blocks naturally matching requested UI dimensions natively.
+    """
+    logger.info(
+        f"[TIMESERIES QUERY START] tenant={tenant_id} metric={metric} start={start_time} end={end_time}"
+    )
+
+    if not filters and hot_store.covers(tenant_id, start_time):
+        # Window lies entirely inside the in-memory hot store: no database round-trip
+        buckets = hot_store.buckets(tenant_id, start_time, end_time, interval_seconds)
+        total_events_processed = sum(b["count"] for b in buckets.values())
+    else:
+        buckets, total_events_processed = await _accumulate_stored(
+            tenant_id, start_time, end_time, interval_seconds, filters
+        )
 
     # 2. Materializing calculations neatly over streaming bins inherently correctly!
     final_series = []
@@ -0,0 +1,259 @@
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.dialects.postgresql import insert
+
+from app.models.event import TraceTree
+from app.query.diff import GraphTree
+
+logger = logging.getLogger("temporallayr.query.trace_tree")
+
+TRACE_TREE_ORDERS = ("tree", "timeline")
+# Node timestamp fields, in order of preference
+_START_FIELDS = ("start_time", "created_at", "timestamp")
+
+
+def _epoch(value: Any) -> Optional[float]:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if not isinstance(value, str) or not value:
+        return None
+    try:
+        dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if not dt.tzinfo:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def _timing(node: Dict[str, Any]) -> Tuple[Optional[float], Optional[float]]:
+    """(start epoch seconds, duration ms) from whatever the SDK recorded."""
+    start = next(
+        (ts for ts in (_epoch(node.get(f)) for f in _START_FIELDS) if ts is not None),
+        None,
+    )
+    for source in (node, node.get("metrics"), node.get("metadata")):
+        if isinstance(source, dict) and source.get("duration_ms") is not None:
+            try:
+                return start, max(0.0, float(source["duration_ms"]))
+            except (TypeError, ValueError):
+                break
+    end = _epoch(node.get("end_time"))
+    if start is not None and end is not None:
+        return start, max(0.0, (end - start) * 1000)
+    return start, None
+
+
+def _covered_ms(intervals: List[Tuple[float, float]], lo: float, hi: float) -> float:
+    """Length of the union of intervals clipped to [lo, hi], in ms."""
+    covered, reach = 0.0, lo
+    for start, end in sorted(intervals):
+        start, end = max(start, reach), min(end, hi)
+        if end > start:
+            covered += end - start
+            reach = end
+    return covered * 1000
+
+
+def build_trace_tree(tree: GraphTree) -> Dict[str, Any]:
+    """Flatten a graph into preorder parallel arrays with timings and critical path.
+
+    Preorder puts every subtree in the contiguous range [i, i + size[i]), so
+    pages and subtree slices need no tree walk at read time.
+    """
+    timings = {key: _timing(node) for key, node in tree.nodes.items()}
+
+    def sibling_order(keys: List[str]) -> List[str]:
+        return sorted(
+            keys,
+            key=lambda k: (timings[k][0] is None, timings[k][0] or 0.0),
+        )
+
+    order: List[str] = []
+    parent: List[int] = []
+    depth: List[int] = []
+    stack = [(key, -1) for key in reversed(sibling_order(tree.roots))]
+    while stack:
+        key, parent_idx = stack.pop()
+        order.append(key)
+        parent.append(parent_idx)
+        depth.append(depth[parent_idx] + 1 if parent_idx >= 0 else 0)
+        idx = len(order) - 1
+        stack.extend(
+            (child, idx) for child in reversed(sibling_order(tree.children[key]))
+        )
+
+    n = len(order)
+    children: List[List[int]] = [[] for _ in range(n)]
+    for idx in range(n):
+        if parent[idx] >= 0:
+            children[parent[idx]].append(idx)
+
+    start = [timings[key][0] for key in order]
+    size = [1] * n
+    total = [0.0] * n
+    self_ms = [0.0] * n
+    end: List[Optional[float]] = [None] * n
+    # Children precede parents in reverse preorder, so one backward pass suffices
+    for idx in range(n - 1, -1, -1):
+        kids = children[idx]
+        duration = timings[order[idx]][1]
+        child_ends = [end[c] for c in kids if end[c] is not None]
+        if duration is not None:
+            total[idx] = duration
+        elif start[idx] is not None and child_ends:
+            total[idx] = max(0.0, (max(child_ends) - start[idx]) * 1000)
+        else:
+            total[idx] = sum(total[c] for c in kids)
+        if start[idx] is not None:
+            end[idx] = start[idx] + total[idx] / 1000
+
+        timed = all(start[c] is not None for c in kids)
+        if kids and timed and start[idx] is not None:
+            busy = _covered_ms([(start[c], end[c]) for c in kids], start[idx], end[idx])
+        else:
+            busy = sum(total[c] for c in kids)
+        self_ms[idx] = max(0.0, total[idx] - busy)
+        if parent[idx] >= 0:
+            size[parent[idx]] += size[idx]
+
+    def finish(idx: int) -> Tuple[bool, float]:
+        # Latest end wins; untimed nodes fall back to the longest total
+        return (end[idx] is not None, end[idx] or total[idx])
+
+    critical: List[int] = []
+    level = [idx for idx in range(n) if parent[idx] < 0]
+    while level:
+        idx = max(level, key=finish)
+        critical.append(idx)
+        level = children[idx]
+
+    known = [s for s in start if s is not None]
+    trace_start = min(known) if known else None
+    # Untimed nodes sort at their parent's start so they stay beside it
+    effective: List[float] = []
+    for idx in range(n):
+        inherited = effective[parent[idx]] if parent[idx] >= 0 else 0.0
+        effective.append(start[idx] if start[idx] is not None else inherited)
+    timeline = sorted(range(n), key=lambda idx: (effective[idx], idx))
+
+    ends = [e for e in end if e is not None]
+    if trace_start is not None and ends:
+        duration_ms = (max(ends) - trace_start) * 1000
+    else:
+        duration_ms = sum(total[idx] for idx in range(n) if parent[idx] < 0)
+
+    return {
+        "ids": [tree.nodes[key].get("id") for key in order],
+        "src": [tree.positions[key] for key in order],
+        "parent": parent,
+        "depth": depth,
+        "size": size,
+        "start_ms": [
+            round((s - trace_start) * 1000, 3) if s is not None else None for s in start
+        ],
+        "total_ms": [round(t, 3) for t in total],
+        "self_ms": [round(t, 3) for t in self_ms],
+        "timeline": timeline,
+        "critical_path": critical,
+        "trace_start": datetime.fromtimestamp(trace_start, tz=timezone.utc).isoformat()
+        if trace_start is not None
+        else None,
+        "duration_ms": round(duration_ms, 3),
+        "max_depth": max(depth, default=0),
+    }
+
+
+def trace_tree_row(event_id: Any, tenant_id: str, tree: GraphTree) -> Dict[str, Any]:
+    doc = build_trace_tree(tree)
+    return {
+        "event_id": event_id,
+        "tenant_id": tenant_id,
+        "node_count": len(doc["ids"]),
+        "max_depth": doc["max_depth"],
+        "duration_ms": doc["duration_ms"],
+        "tree": doc,
+    }
+
+
+def insert_trace_trees(rows: List[Dict[str, Any]]):
+    return insert(TraceTree).values(rows).on_conflict_do_nothing()
+
+
+def subtree_root(doc: Dict[str, Any], node_id: Optional[str]) -> Optional[int]:
+    """Preorder index of `node_id`; None for the whole forest, -1 when absent."""
+    if node_id is None:
+        return None
+    for idx, candidate in enumerate(doc["ids"]):
+        if candidate is not None and str(candidate) == node_id:
+            return idx
+    return -1
+
+
+def render_page(
+    doc: Dict[str, Any],
+    nodes: List[Any],
+    root: Optional[int],
+    max_depth: Optional[int],
+    order: str,
+    offset: int,
+    limit: int,
+) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+    """One page of render-ready nodes under `root`, plus the offset of the next page.
+
+    Tree order pages through the preorder range and jumps over subtrees
+    deeper than `max_depth`; timeline order filters the precomputed timeline.
+    """
+    total = len(doc["ids"])
+    lo, hi = (0, total) if root is None else (root, root + doc["size"][root])
+    base = 0 if root is None else doc["depth"][root]
+    deepest = None if max_depth is None else base + max_depth
+    depth = doc["depth"]
+
+    picked: List[int] = []
+    next_offset = None
+    if order == "timeline":
+        candidates = [
+            idx
+            for idx in doc["timeline"]
+            if lo <= idx < hi and (deepest is None or depth[idx] <= deepest)
+        ]
+        picked = candidates[offset : offset + limit]
+        if offset + limit < len(candidates):
+            next_offset = offset + limit
+    else:
+        idx = max(lo, offset)
+        while idx < hi:
+            if len(picked) == limit:
+                next_offset = idx
+                break
+            picked.append(idx)
+            # Past the depth limit the whole subtree is skipped in one step
+            idx += doc["size"][idx] if depth[idx] == deepest else 1
+
+    critical = set(doc["critical_path"])
+    rendered = []
+    for idx in picked:
+        src = doc["src"][idx]
+        node = nodes[src] if src < len(nodes) and isinstance(nodes[src], dict) else {}
+        parent = doc["parent"][idx]
+        rendered.append(
+            {
+                "index": idx,
+                "id": doc["ids"][idx],
+                "name": node.get("name"),
+                "status": node.get("status"),
+                "parent_index": parent if parent >= 0 else None,
+                "depth": depth[idx] - base,
+                "start_ms": doc["start_ms"][idx],
+                "total_ms": doc["total_ms"][idx],
+                "self_ms": doc["self_ms"][idx],
+                "subtree_size": doc["size"][idx],
+                "truncated": depth[idx] == deepest and doc["size"][idx] > 1,
+                "critical": idx in critical,
+                "metadata": node.get("metadata"),
+            }
+        )
+    return rendered, next_offset
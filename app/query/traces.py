@@ -2,45 +2,154 @@ import logging
 from typing import Dict, Any, List, Optional
 from uuid import UUID
 
+from sqlalchemy import or_
 from sqlalchemy.future import select
-from sqlalchemy import desc
 
-from app.core.database import async_session_maker
-from app.models.event import Event
+from app.core.replicas import read_session
+from app.core.pagination import (
+    InvalidCursorError,
+    Page,
+    apply_keyset,
+    decode_cursor,
+    encode_cursor,
+    paginate,
+)
+from app.models.event import Event, TraceTree, execution_key
+from app.query.diff import GraphTree
+from app.query.trace_tree import build_trace_tree, render_page, subtree_root
 
 logger = logging.getLogger("temporallayr.query.traces")
 
 
-async def get_trace(tenant_id: str, trace_id: str) -> Dict[str, Any]:
-    """Retrieves a fully bounded execution generic graph organically fetching explicitly."""
-    logger.info(f"[TRACE FETCH] tenant={tenant_id} trace_id={trace_id}")
+def _trace_lookup(stmt, tenant_id: str, trace_id: str):
+    """Narrow `stmt` to one trace addressed by event id or by execution id.
 
+    An execution id resolves to its latest event through the
+    (tenant, execution_key, timestamp) index.
+    """
+    by_execution = execution_key(Event.payload) == trace_id
     try:
-        query_id = UUID(trace_id)
+        match = or_(Event.id == UUID(trace_id), by_execution)
     except ValueError:
-        return None
+        match = by_execution
+    return (
+        stmt.where(Event.tenant_id == tenant_id, match)
+        .order_by(Event.timestamp.desc())
+        .limit(1)
+    )
 
-    async with async_session_maker() as session:
-        query = select(Event).where(Event.id == query_id, Event.tenant_id == tenant_id)
+
+async def get_trace(tenant_id: str, trace_id: str) -> Dict[str, Any]:
+    """Retrieves a fully bounded execution generic graph organically fetching explicitly."""
+    logger.info(f"[TRACE FETCH] tenant={tenant_id} trace_id={trace_id}")
+
+    async with read_session(tenant_id) as session:
+        query = _trace_lookup(
+            select(Event, TraceTree.tree).outerjoin(
+                TraceTree, TraceTree.event_id == Event.id
+            ),
+            tenant_id,
+            trace_id,
+        )
 
         result = await session.execute(query)
-        event = result.scalars().first()
+        row = result.first()
 
-        if not event:
+        if not row:
             return None
+        event, doc = row
 
-        return {
+        trace = {
             "id": str(event.id),
             "timestamp": event.timestamp.isoformat() if event.timestamp else None,
             "tenant_id": event.tenant_id,
             "payload": event.payload,
         }
+        if doc:
+            # Precomputed at ingest; node-level detail pages via get_trace_tree
+            trace["summary"] = {
+                "node_count": len(doc["ids"]),
+                "max_depth": doc["max_depth"],
+                "duration_ms": doc["duration_ms"],
+                "trace_start": doc["trace_start"],
+                "critical_path": [doc["ids"][idx] for idx in doc["critical_path"]],
+            }
+        return trace
+
+
+async def get_trace_tree(
+    tenant_id: str,
+    trace_id: str,
+    node_id: Optional[str] = None,
+    max_depth: Optional[int] = None,
+    order: str = "tree",
+    limit: int = 500,
+    cursor: Optional[str] = None,
+) -> Optional[Dict[str, Any]]:
+    """Pages a trace's materialized tree, optionally below `node_id` and `max_depth` levels deep.
+
+    Traces ingested before trees were materialized are built on the fly.
+    """
+    logger.info(
+        f"[TRACE TREE] tenant={tenant_id} trace_id={trace_id} node={node_id} order={order}"
+    )
+
+    scope = f"trace-tree:{tenant_id}:{trace_id}:{node_id}:{max_depth}:{order}"
+    offset = decode_cursor(scope, cursor)[0] if cursor else 0
+    if not isinstance(offset, int) or offset < 0:
+        raise InvalidCursorError("Malformed cursor")
+
+    async with read_session(tenant_id) as session:
+        result = await session.execute(
+            _trace_lookup(
+                select(Event.payload, TraceTree.tree).outerjoin(
+                    TraceTree, TraceTree.event_id == Event.id
+                ),
+                tenant_id,
+                trace_id,
+            )
+        )
+        row = result.first()
+
+    if not row:
+        return None
+    payload, doc = row
+    if doc is None:
+        doc = build_trace_tree(GraphTree(payload))
+
+    root = subtree_root(doc, node_id)
+    if root == -1:
+        return None
+    nodes, next_offset = render_page(
+        doc, payload.get("nodes") or [], root, max_depth, order, offset, limit
+    )
+
+    ids = doc["ids"]
+    return {
+        "trace_id": trace_id,
+        "node_count": len(ids),
+        "max_depth": doc["max_depth"],
+        "duration_ms": doc["duration_ms"],
+        "trace_start": doc["trace_start"],
+        "critical_path": [ids[idx] for idx in doc["critical_path"]],
+        "nodes": nodes,
+        "next_cursor": encode_cursor(scope, [next_offset])
+        if next_offset is not None
+        else None,
+    }
 
 
 async def list_traces(
-    tenant_id: str, limit: int = 100, offset: int = 0, status: Optional[str] = None
+    tenant_id: str,
+    limit: int = 100,
+    offset: int = 0,
+    status: Optional[str] = None,
+    cursor: Optional[str] = None,
 ) -> List[Dict[str, Any]]:
-    """Lists bounded executions sequentially natively masking trace bounds across limits correctly."""
+    """Lists bounded executions sequentially natively masking trace bounds across limits correctly.
+
+    Returns a `Page` keyset-paginated over (timestamp, id); `offset` only applies without a cursor.
+    """
     logger.info(
         f"[TRACE LIST] tenant={tenant_id} limit={limit} offset={offset} status={status}"
     )
@@ -49,30 +158,36 @@ async def list_traces(
     limit = min(max(1, limit), 100)
     offset = max(0, offset)
 
-    async with async_session_maker() as session:
-        query = select(Event).where(Event.tenant_id == tenant_id)
+    query = select(Event.id, Event.timestamp, Event.payload["status"].astext).where(
+        Event.tenant_id == tenant_id
+    )
 
-        if status:
-            query = query.where(Event.payload["status"].astext == status)
+    if status:
+        query = query.where(Event.payload["status"].astext == status)
 
-        # Natively sorting descending tracking most recent executions automatically
-        query = query.order_by(desc(Event.timestamp)).limit(limit).offset(offset)
+    # Natively sorting descending tracking most recent executions automatically
+    scope = f"traces:{tenant_id}"
+    query = apply_keyset(query, [Event.timestamp, Event.id], cursor, scope)
+    query = query.limit(limit + 1)
+    if offset and not cursor:
+        query = query.offset(offset)
 
+    async with read_session(tenant_id) as session:
         result = await session.execute(query)
-        events = result.scalars().all()
+        rows, next_cursor = paginate(
+            result.all(), limit, scope, key=lambda r: (r[1], r[0])
+        )
 
         # Build optimized trace references masking payloads inherently mapping cleanly
-        items = []
-        for event in events:
-            evt_status = event.payload.get("status", "UNKNOWN")
+        items = Page(next_cursor=next_cursor)
+        for event_id, timestamp, evt_status in rows:
+            evt_status = evt_status or "UNKNOWN"
             is_error = evt_status == "FAILED"
 
             items.append(
                 {
-                    "id": str(event.id),
-                    "timestamp": event.timestamp.isoformat()
-                    if event.timestamp
-                    else None,
+                    "id": str(event_id),
+                    "timestamp": timestamp.isoformat() if timestamp else None,
                     "error": is_error,
                     "status": evt_status,
                 }
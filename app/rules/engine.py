@@ -1,6 +1,8 @@
 import logging
 from typing import Dict, Any, Optional
 
+from app.core.metrics import rule_evaluation_seconds
+from app.core.profiling import timed
 from app.rules.models import RuleSchema
 from app.rules.store import rule_store
 
@@ -16,11 +18,18 @@ class TriggerResult:
 class RuleEngine:
     """Enterprise evaluating structure isolated securely catching execution triggers mapping robust evaluations."""
 
+    @timed("evaluate_event")
     async def evaluate_event(self, event: Dict[str, Any]) -> Optional[TriggerResult]:
         tenant_id = event.get("tenant_id")
         if not tenant_id:
             return None
 
+        with rule_evaluation_seconds.time():
+            return await self._evaluate_rules(tenant_id, event)
+
+    async def _evaluate_rules(
+        self, tenant_id: str, event: Dict[str, Any]
+    ) -> Optional[TriggerResult]:
         try:
             rules = await rule_store.get_rules_for_tenant(tenant_id)
             if not rules:
@@ -38,11 +47,11 @@ class RuleEngine:
 
                 if is_triggered:
                     logger.info(f"[RULE] triggered rule={rule.id} name='{rule.name}'")
-                    logger.info(f"[RULE] evaluated {evaluated_count} rules")
+                    logger.debug(f"[RULE] evaluated {evaluated_count} rules")
                     return TriggerResult(rule=rule, event=event)
 
             # If no triggers match
-            logger.info(f"[RULE] evaluated {evaluated_count} rules")
+            logger.debug(f"[RULE] evaluated {evaluated_count} rules")
             return None
 
         except Exception as e:
@@ -18,9 +18,17 @@ class QueryRequest(BaseModel):
     function_name: Optional[str] = None
     status: Optional[str] = None
     limit: int = 50
+    # Deprecated: only honoured when no cursor is supplied
     offset: int = 0
+    # Opaque next_cursor from the previous response
+    cursor: Optional[str] = None
+    # Force count(*) instead of the counter / planner estimate for `total`
+    exact_total: bool = False
 
 
 class QueryResponse(BaseModel):
     items: List[ExecutionEventResponse]
     total: int
+    # False when `total` is an estimate
+    total_exact: bool = True
+    next_cursor: Optional[str] = None
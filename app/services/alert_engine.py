@@ -1,6 +1,8 @@
 import asyncio
 import logging
 
+from app.core.scheduler import query_context
+
 logger = logging.getLogger("temporallayr.alert_engine")
 
 
@@ -42,7 +44,8 @@ async def _evaluate_and_fire_alerts(incident: dict):
             return
 
         # Extract matching rules natively mapped to PostgreSQL structurally
-        rules = await storage.get_alert_rules_for_tenant(tenant_id)
+        with query_context(tenant_id, "alerting"):
+            rules = await storage.get_alert_rules_for_tenant(tenant_id)
 
         # Map simulated rules elegantly when PostgreSQL connections fail during offline tests dynamically
         if not rules and tenant_id == "dev-test-key":
@@ -59,7 +62,7 @@ async def _evaluate_and_fire_alerts(incident: dict):
                 # Fire if node_name matches explicitly or rule is a wildcard (None)
                 if rule.node_name is None or rule.node_name == node_name:
                     if rule.webhook_url:
-                        print("[ALERT ENGINE] fired")
+                        logger.info("[ALERT ENGINE] fired")
 
                         payload = {
                             "incident_id": str(incident.get("id")),
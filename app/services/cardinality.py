@@ -0,0 +1,365 @@
+import asyncio
+import logging
+import math
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import BigInteger, delete, func, select, true, tuple_
+from sqlalchemy.dialects.postgresql import insert
+
+from app.core.config import settings
+from app.core.database import async_session_maker
+from app.core.sketches import HyperLogLog
+from app.models.event import CardinalitySketch, Event, execution_key
+
+logger = logging.getLogger("temporallayr.cardinality")
+
+CARDINALITY_DIMENSIONS = ("function", "execution", "node", "cluster", "fingerprint")
+HOUR = 3600
+DAY = 86400
+# Granularity of the all-time sketch kept next to the hourly and daily ones
+ALL_TIME = 0
+# Granularity of the per tenant and dimension backfill marker; non-empty hll = seeded
+COVERAGE = -1
+
+# (tenant_id, dimension, granularity, bucket)
+_Key = Tuple[str, str, int, int]
+
+
+class DistinctCount(NamedTuple):
+    estimate: int
+    # Standard error relative to the estimate
+    relative_error: float
+
+
+def _numpy():
+    try:
+        import numpy as np  # optional: vectorizes register merges when present
+
+        return np
+    except ImportError:
+        return None
+
+
+def _epoch(dt: datetime) -> float:
+    return (dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)).timestamp()
+
+
+def _cover(start: float, end: float) -> List[Tuple[int, int]]:
+    """Fewest (granularity, bucket) pairs spanning [start, end], rounded out to hours."""
+    keys = []
+    bucket = int(start // HOUR) * HOUR
+    last = int(end // HOUR) * HOUR
+    while bucket <= last:
+        if bucket % DAY == 0 and bucket + DAY - HOUR <= last:
+            keys.append((DAY, bucket))
+            bucket += DAY
+        else:
+            keys.append((HOUR, bucket))
+            bucket += HOUR
+    return keys
+
+
+def _dimension_values(dimension: str):
+    """(value expression, extra FROM) of a dimension over stored events, as observed at ingest."""
+    payload = Event.payload
+    if dimension == "node":
+        node = func.jsonb_array_elements(payload["nodes"]).alias("node")
+        return func.jsonb_extract_path_text(node.column, "name"), node
+    column = {
+        "function": payload["function_name"].astext,
+        "execution": execution_key(payload),
+        "cluster": payload["cluster_id"].astext,
+        "fingerprint": payload["fingerprint"].astext,
+    }[dimension]
+    return column, None
+
+
+class CardinalityStore:
+    """HyperLogLog distinct counts per tenant and dimension, hourly, daily and all-time.
+
+    Ingest adds to in-memory deltas; a background flush folds them into
+    `cardinality_sketches` under row locks. Register-max merging is
+    idempotent, so any range is answered by merging the fewest covering
+    hour and day sketches plus unflushed deltas. For the same reason the
+    first query of a tenant and dimension can fold in every stored event
+    once, so tenants with history from before the sketches count it too.
+    """
+
+    def __init__(self, precision: Optional[int] = None):
+        self.precision = (
+            settings.CARDINALITY_PRECISION if precision is None else precision
+        )
+        self._deltas: Dict[_Key, HyperLogLog] = {}
+        self._seeded: set = set()
+        self._seed_lock = asyncio.Lock()
+
+    @property
+    def relative_error(self) -> float:
+        return 1.04 / math.sqrt(1 << self.precision)
+
+    def observe(
+        self,
+        tenant_id: str,
+        dimension: str,
+        value: Optional[str],
+        seen_at: Optional[datetime] = None,
+    ) -> None:
+        if not tenant_id or value is None:
+            return
+        ts = time.time() if seen_at is None else _epoch(seen_at)
+        for granularity in (HOUR, DAY, ALL_TIME):
+            bucket = int(ts // granularity) * granularity if granularity else 0
+            key = (tenant_id, dimension, granularity, bucket)
+            sketch = self._deltas.get(key)
+            if sketch is None:
+                sketch = self._deltas[key] = HyperLogLog(self.precision)
+            sketch.add(str(value))
+
+    def _merge_all(self, sketches: List[HyperLogLog]) -> HyperLogLog:
+        merged = HyperLogLog(self.precision)
+        np = _numpy()
+        if np is not None and len(sketches) > 1:
+            registers = np.maximum.reduce(
+                [np.frombuffer(s.registers, dtype=np.uint8) for s in sketches]
+            )
+            merged.registers = bytearray(registers.tobytes())
+        else:
+            for sketch in sketches:
+                merged.merge(sketch)
+        return merged
+
+    async def distinct(
+        self,
+        tenant_id: str,
+        dimension: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> Optional[DistinctCount]:
+        """Distinct values over [start, end] (hour-aligned), or all time without bounds.
+
+        None when nothing has been recorded for the range yet.
+        """
+        if (tenant_id, dimension) not in self._seeded:
+            await self._seed(tenant_id, dimension)
+        if start is None and end is None:
+            keys = [(ALL_TIME, 0)]
+        else:
+            horizon = time.time() - settings.CARDINALITY_RETENTION_DAYS * DAY
+            keys = _cover(
+                max(_epoch(start), horizon) if start else horizon,
+                _epoch(end) if end else time.time(),
+            )
+
+        async with async_session_maker() as session:
+            blobs = await session.scalars(
+                select(CardinalitySketch.hll).where(
+                    CardinalitySketch.tenant_id == tenant_id,
+                    CardinalitySketch.dimension == dimension,
+                    tuple_(CardinalitySketch.granularity, CardinalitySketch.bucket).in_(
+                        keys
+                    ),
+                )
+            )
+            sketches = [HyperLogLog.from_bytes(blob) for blob in blobs if blob]
+
+        for granularity, bucket in keys:
+            delta = self._deltas.get((tenant_id, dimension, granularity, bucket))
+            if delta is not None:
+                sketches.append(delta)
+        if not sketches:
+            return None
+        return DistinctCount(self._merge_all(sketches).count(), self.relative_error)
+
+    async def _seed(self, tenant_id: str, dimension: str) -> None:
+        """Fold every stored execution graph of the tenant into its sketches, once.
+
+        The COVERAGE row is locked for the whole backfill, so one worker seeds
+        and the rest find it marked. Events the sketches already saw are
+        merged again harmlessly.
+        """
+        async with self._seed_lock:
+            if (tenant_id, dimension) in self._seeded:
+                return
+            async with async_session_maker() as session:
+                await session.execute(
+                    insert(CardinalitySketch)
+                    .values(
+                        tenant_id=tenant_id,
+                        dimension=dimension,
+                        granularity=COVERAGE,
+                        bucket=0,
+                        hll=b"",
+                    )
+                    .on_conflict_do_nothing()
+                )
+                marker = await session.scalar(
+                    select(CardinalitySketch)
+                    .where(
+                        CardinalitySketch.tenant_id == tenant_id,
+                        CardinalitySketch.dimension == dimension,
+                        CardinalitySketch.granularity == COVERAGE,
+                    )
+                    .with_for_update()
+                )
+                if not marker.hll:
+                    backfill = await self._backfill(session, tenant_id, dimension)
+                    if backfill:
+                        await self._merge(session, tenant_id, backfill)
+                    marker.hll = b"\x01"
+                    logger.info(
+                        f"[HLL] seeded tenant={tenant_id} dimension={dimension} "
+                        f"sketches={len(backfill)}"
+                    )
+                await session.commit()
+            self._seeded.add((tenant_id, dimension))
+
+    async def _backfill(
+        self, session, tenant_id: str, dimension: str
+    ) -> Dict[_Key, HyperLogLog]:
+        """Sketches of stored events: all-time, plus hours and days within retention."""
+        value, joined = _dimension_values(dimension)
+        horizon = int(
+            (time.time() - settings.CARDINALITY_RETENTION_DAYS * DAY) // DAY * DAY
+        )
+        epoch = func.extract("epoch", Event.timestamp)
+        # Older rows only feed the all-time sketch, so they group under one bucket
+        hour = func.cast(
+            func.greatest(func.floor(epoch / HOUR) * HOUR, horizon - HOUR), BigInteger
+        )
+        stmt = select(value, hour).select_from(Event)
+        if joined is not None:
+            stmt = stmt.join(joined, true()).where(
+                func.jsonb_typeof(Event.payload["nodes"]) == "array"
+            )
+        stmt = stmt.where(
+            Event.tenant_id == tenant_id, Event.event_type == "execution_graph"
+        ).group_by(value, hour)
+
+        backfill: Dict[_Key, HyperLogLog] = {}
+
+        def add(granularity: int, bucket: int, item: str) -> None:
+            key = (tenant_id, dimension, granularity, bucket)
+            if key not in backfill:
+                backfill[key] = HyperLogLog(self.precision)
+            backfill[key].add(item)
+
+        for item, bucket in await session.execute(stmt):
+            if item is None:
+                continue
+            add(ALL_TIME, 0, item)
+            if bucket >= horizon:
+                add(HOUR, bucket, item)
+                add(DAY, bucket // DAY * DAY, item)
+        return backfill
+
+    async def flush(self) -> int:
+        """Fold pending deltas into their persisted sketches; returns sketches written."""
+        deltas, self._deltas = self._deltas, {}
+        by_tenant: Dict[str, Dict[_Key, HyperLogLog]] = defaultdict(dict)
+        for key, delta in deltas.items():
+            by_tenant[key[0]][key] = delta
+
+        written = 0
+        for tenant_id, pending in by_tenant.items():
+            try:
+                written += await self._flush_tenant(tenant_id, pending)
+            except Exception as e:
+                logger.error(
+                    f"[HLL] flush failed tenant={tenant_id}: {type(e).__name__}: {e}"
+                )
+                # Merging is idempotent, so folding back into newer deltas is safe
+                for key, delta in pending.items():
+                    current = self._deltas.get(key)
+                    if current is not None:
+                        delta.merge(current)
+                    self._deltas[key] = delta
+        return written
+
+    async def _flush_tenant(
+        self, tenant_id: str, pending: Dict[_Key, HyperLogLog]
+    ) -> int:
+        async with async_session_maker() as session:
+            written = await self._merge(session, tenant_id, pending)
+            await session.commit()
+        return written
+
+    async def _merge(
+        self, session, tenant_id: str, pending: Dict[_Key, HyperLogLog]
+    ) -> int:
+        """Fold sketches into their persisted rows inside the caller's transaction."""
+        keys = sorted(pending)
+        # Create missing rows first so the row lock below also covers first writes
+        await session.execute(
+            insert(CardinalitySketch)
+            .values(
+                [
+                    {
+                        "tenant_id": t,
+                        "dimension": d,
+                        "granularity": g,
+                        "bucket": b,
+                        "hll": b"",
+                    }
+                    for t, d, g, b in keys
+                ]
+            )
+            .on_conflict_do_nothing()
+        )
+        rows = await session.scalars(
+            select(CardinalitySketch)
+            .where(
+                CardinalitySketch.tenant_id == tenant_id,
+                tuple_(
+                    CardinalitySketch.dimension,
+                    CardinalitySketch.granularity,
+                    CardinalitySketch.bucket,
+                ).in_([key[1:] for key in keys]),
+            )
+            .order_by(
+                CardinalitySketch.dimension,
+                CardinalitySketch.granularity,
+                CardinalitySketch.bucket,
+            )
+            .with_for_update()
+        )
+        for row in rows:
+            sketch = pending[
+                (row.tenant_id, row.dimension, row.granularity, row.bucket)
+            ]
+            if row.hll:
+                sketch.merge(HyperLogLog.from_bytes(row.hll))
+            row.hll = sketch.to_bytes()
+        return len(keys)
+
+    async def prune(self, now: Optional[float] = None) -> None:
+        """Drop hourly and daily sketches past retention; all-time sketches and markers are kept."""
+        horizon = (now or time.time()) - settings.CARDINALITY_RETENTION_DAYS * DAY
+        async with async_session_maker() as session:
+            await session.execute(
+                delete(CardinalitySketch).where(
+                    CardinalitySketch.granularity > ALL_TIME,
+                    CardinalitySketch.bucket < int(horizon // DAY) * DAY,
+                )
+            )
+            await session.commit()
+
+
+cardinality_store = CardinalityStore()
+
+
+async def cardinality_task():
+    """Background task: periodically persist distinct-count sketches and prune old ones."""
+    while True:
+        await asyncio.sleep(settings.CARDINALITY_FLUSH_SECONDS)
+        try:
+            written = await cardinality_store.flush()
+            if written:
+                logger.info(f"[HLL] flushed {written} cardinality sketches")
+            await cardinality_store.prune()
+        except asyncio.CancelledError:
+            break
+        except Exception as e:
+            logger.error(f"[HLL] flush failed: {type(e).__name__}: {e}")
@@ -0,0 +1,532 @@
+import asyncio
+import base64
+import json
+import logging
+import os
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence
+from urllib.parse import quote
+
+from sqlalchemy import delete, func, select
+
+from app.core.config import settings
+from app.core.database import (
+    async_session_maker,
+    maintenance_engine,
+    maintenance_session_maker,
+)
+from app.core.sketches import BloomFilter
+from app.models.event import Event, ExecutionDigest, TraceTree
+
+logger = logging.getLogger("temporallayr.cold_storage")
+
+# Payload fields lifted into their own columns, each with a bloom filter in the footer
+BLOOM_COLUMNS = ("execution_id", "status")
+EVENT_COLUMNS = ["id", "tenant_id", "event_type", "timestamp", "payload"]
+
+# Rows per server-side fetch while tiering; each fetch becomes one Parquet row group
+TIER_BATCH_ROWS = 10000
+_FOOTER_PREFIX = "temporallayr."
+# Segments are written under this suffix and renamed once their rows are deleted
+_PENDING_SUFFIX = ".tmp"
+# Session advisory lock held for a whole tiering pass, one pass across workers
+_TIERING_LOCK = 0x746C636F6C64
+
+
+class SegmentFooter(NamedTuple):
+    path: str
+    min_ts: datetime
+    max_ts: datetime
+    rows: int
+    blooms: Dict[str, BloomFilter]
+
+
+def _segment_schema():
+    import pyarrow as pa
+
+    return pa.schema(
+        [
+            ("id", pa.string()),
+            ("tenant_id", pa.string()),
+            ("event_type", pa.string()),
+            ("timestamp", pa.timestamp("us", tz="UTC")),
+            ("execution_id", pa.string()),
+            ("status", pa.string()),
+            ("duration_ms", pa.float64()),
+            ("payload", pa.string()),
+        ]
+    )
+
+
+def payload_text(value: Any) -> Optional[str]:
+    """Mirror Postgres `->>`: strings verbatim, everything else as JSON text."""
+    if value is None or isinstance(value, str):
+        return value
+    return json.dumps(value)
+
+
+def _flatten(event: Event) -> Dict[str, Any]:
+    payload = event.payload or {}
+    try:
+        duration_ms = float((payload.get("metrics") or {}).get("duration_ms", 0.0))
+    except (TypeError, ValueError, AttributeError):
+        duration_ms = 0.0
+    return {
+        "id": str(event.id),
+        "tenant_id": event.tenant_id,
+        "event_type": event.event_type,
+        "timestamp": event.timestamp,
+        "execution_id": payload_text(payload.get("execution_id")),
+        "status": payload_text(payload.get("status")),
+        "duration_ms": duration_ms,
+        "payload": json.dumps(payload, default=str),
+    }
+
+
+class _SegmentWriter:
+    """Streams event batches into one Parquet segment, building its footer as it goes."""
+
+    def __init__(self, path: str, capacity: int):
+        import pyarrow.parquet as pq
+
+        self.path = path
+        self.schema = _segment_schema()
+        self.writer = pq.ParquetWriter(path, self.schema, compression="zstd")
+        self.blooms = {
+            "execution_id": BloomFilter.for_capacity(capacity),
+            "status": BloomFilter.for_capacity(min(capacity, 64)),
+        }
+        self.min_ts: Optional[datetime] = None
+        self.max_ts: Optional[datetime] = None
+        self.rows = 0
+
+    def write(self, events: Sequence[Event]) -> None:
+        import pyarrow as pa
+
+        records = [_flatten(e) for e in events]
+        for record in records:
+            for column, bloom in self.blooms.items():
+                if record[column] is not None:
+                    bloom.add(record[column])
+            ts = record["timestamp"]
+            if self.min_ts is None or ts < self.min_ts:
+                self.min_ts = ts
+            if self.max_ts is None or ts > self.max_ts:
+                self.max_ts = ts
+        self.rows += len(records)
+        self.writer.write_table(pa.Table.from_pylist(records, schema=self.schema))
+
+    def close(self, final_path: str) -> SegmentFooter:
+        meta = {
+            "min_ts": self.min_ts.isoformat(),
+            "max_ts": self.max_ts.isoformat(),
+            "rows": str(self.rows),
+        }
+        for column, bloom in self.blooms.items():
+            meta[f"bloom.{column}"] = base64.b64encode(bloom.to_bytes()).decode()
+        self.writer.add_key_value_metadata(
+            {_FOOTER_PREFIX + k: v for k, v in meta.items()}
+        )
+        self.writer.close()
+        # Durable before the deletes commit, so a crash cannot lose both copies
+        with open(self.path, "rb") as f:
+            os.fsync(f.fileno())
+        return SegmentFooter(
+            final_path, self.min_ts, self.max_ts, self.rows, dict(self.blooms)
+        )
+
+
+class ColdStore:
+    """Tiered cold storage: aged events as compressed Parquet segments on local disk.
+
+    Segments live under `<root>/tenant=<id>/date=<YYYY-MM-DD>/` and carry
+    min/max timestamps plus bloom filters for execution_id and status in
+    their footer key-value metadata, so scans skip most files unopened.
+    """
+
+    def __init__(
+        self, root: Optional[str] = None, tier_after_days: Optional[int] = None
+    ):
+        self.root = settings.COLD_STORAGE_DIR if root is None else root
+        self.tier_after = timedelta(
+            days=settings.COLD_TIER_AFTER_DAYS
+            if tier_after_days is None
+            else tier_after_days
+        )
+        self._footers: Dict[str, SegmentFooter] = {}
+        self._available: Optional[bool] = None
+
+    @property
+    def enabled(self) -> bool:
+        if not self.root:
+            return False
+        if self._available is None:
+            try:
+                import pyarrow.parquet  # noqa: F401
+
+                self._available = True
+            except ImportError:
+                logger.error("[COLD] COLD_STORAGE_DIR is set but pyarrow is missing")
+                self._available = False
+        return self._available
+
+    def _tenant_dir(self, tenant_id: str) -> str:
+        return os.path.join(self.root, f"tenant={quote(tenant_id, safe='')}")
+
+    def _footer(self, path: str) -> Optional[SegmentFooter]:
+        footer = self._footers.get(path)
+        if footer is None:
+            import pyarrow.parquet as pq
+
+            meta = pq.read_metadata(path).metadata or {}
+            meta = {
+                k.decode()[len(_FOOTER_PREFIX) :]: v.decode()
+                for k, v in meta.items()
+                if k.startswith(_FOOTER_PREFIX.encode())
+            }
+            if "min_ts" not in meta:
+                logger.warning(f"[COLD] ignoring segment without footer: {path}")
+                return None
+            footer = SegmentFooter(
+                path,
+                datetime.fromisoformat(meta["min_ts"]),
+                datetime.fromisoformat(meta["max_ts"]),
+                int(meta["rows"]),
+                {
+                    column: BloomFilter.from_bytes(base64.b64decode(meta[key]))
+                    for column in BLOOM_COLUMNS
+                    if (key := f"bloom.{column}") in meta
+                },
+            )
+            self._footers[path] = footer
+        return footer
+
+    def _segments(
+        self,
+        tenant_id: str,
+        start: Optional[datetime],
+        end: Optional[datetime],
+        equals: Dict[str, str],
+    ) -> List[SegmentFooter]:
+        """Prune by day directory, then footer min/max, then footer bloom filters."""
+        tenant_dir = self._tenant_dir(tenant_id)
+        if not os.path.isdir(tenant_dir):
+            return []
+
+        segments = []
+        for day_dir in os.scandir(tenant_dir):
+            if not day_dir.name.startswith("date="):
+                continue
+            day_start = datetime.combine(
+                date.fromisoformat(day_dir.name[5:]), datetime.min.time(), timezone.utc
+            )
+            if (end and day_start > end) or (
+                start and day_start + timedelta(days=1) <= start
+            ):
+                continue
+            for entry in os.scandir(day_dir.path):
+                if not entry.name.endswith(".parquet"):
+                    continue
+                footer = self._footer(entry.path)
+                if footer is None:
+                    continue
+                if (end and footer.min_ts > end) or (start and footer.max_ts < start):
+                    continue
+                if any(
+                    column in footer.blooms and value not in footer.blooms[column]
+                    for column, value in equals.items()
+                ):
+                    continue
+                segments.append(footer)
+        return segments
+
+    @staticmethod
+    def _filters(start, end, equals) -> Optional[List[tuple]]:
+        filters = [(column, "=", value) for column, value in equals.items()]
+        if start:
+            filters.append(("timestamp", ">=", start))
+        if end:
+            filters.append(("timestamp", "<=", end))
+        return filters or None
+
+    def _scan_sync(
+        self, tenant_id, start, end, equals, columns
+    ) -> List[Dict[str, Any]]:
+        import pyarrow.parquet as pq
+
+        filters = self._filters(start, end, equals)
+        rows: List[Dict[str, Any]] = []
+        for segment in self._segments(tenant_id, start, end, equals):
+            # Row-group min/max statistics prune inside the file as well
+            table = pq.read_table(segment.path, columns=columns, filters=filters)
+            rows.extend(table.to_pylist())
+        return rows
+
+    def _scan_events_sync(
+        self, tenant_id, start, end, equals, match, limit, descending, after
+    ) -> List[Event]:
+        """Rehydrate matching rows past `after`, keeping the first `limit` in sort order.
+
+        Segments are read in sort order of their near edge; once `limit` rows
+        are held, a segment whose near edge falls beyond the last of them
+        cannot contribute, and neither can any after it, so the walk stops.
+        """
+        import pyarrow.parquet as pq
+
+        filters = self._filters(start, end, equals)
+        segments = self._segments(tenant_id, start, end, equals)
+        segments.sort(
+            key=lambda s: s.max_ts if descending else s.min_ts, reverse=descending
+        )
+
+        def sort_key(event: Event):
+            return (event.timestamp, event.id)
+
+        events: List[Event] = []
+        for segment in segments:
+            if limit is not None and len(events) >= limit:
+                edge = events[limit - 1].timestamp
+                if (segment.max_ts < edge) if descending else (segment.min_ts > edge):
+                    break
+            table = pq.read_table(segment.path, columns=EVENT_COLUMNS, filters=filters)
+            for row in table.to_pylist():
+                key = (row["timestamp"], uuid.UUID(row["id"]))
+                # Cheap key check before paying for the payload decode
+                if after is not None and not (
+                    key < after if descending else key > after
+                ):
+                    continue
+                event = Event(
+                    id=key[1],
+                    tenant_id=row["tenant_id"],
+                    event_type=row["event_type"],
+                    timestamp=row["timestamp"],
+                    payload=json.loads(row["payload"]),
+                )
+                if match is None or match(event):
+                    events.append(event)
+            if limit is not None:
+                events.sort(key=sort_key, reverse=descending)
+                del events[limit:]
+        return events
+
+    async def scan(
+        self,
+        tenant_id: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        equals: Optional[Dict[str, str]] = None,
+        columns: Optional[List[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Rows from every cold segment overlapping the range; `equals` keys must be BLOOM_COLUMNS."""
+        if not self.enabled:
+            return []
+        return await asyncio.to_thread(
+            self._scan_sync, tenant_id, start, end, equals or {}, columns
+        )
+
+    async def scan_events(
+        self,
+        tenant_id: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        equals: Optional[Dict[str, str]] = None,
+        match: Optional[Callable[[Event], bool]] = None,
+        limit: Optional[int] = None,
+        descending: bool = False,
+        after: Optional[tuple] = None,
+    ) -> List[Event]:
+        """Cold rows rehydrated as detached Event instances, optionally post-filtered.
+
+        With `limit`, only the first `limit` matches in (timestamp, id) order
+        strictly past the `after` key are returned, and segments beyond them
+        are never opened.
+        """
+        if not self.enabled:
+            return []
+        return await asyncio.to_thread(
+            self._scan_events_sync,
+            tenant_id,
+            start,
+            end,
+            equals or {},
+            match,
+            limit,
+            descending,
+            after,
+        )
+
+    async def tier_old_events(self, now: Optional[datetime] = None) -> int:
+        """Move every (tenant, day) of events older than the tiering horizon to disk."""
+        if not self.enabled:
+            return 0
+        async with maintenance_engine.connect() as lock:
+            if not await lock.scalar(select(func.pg_try_advisory_lock(_TIERING_LOCK))):
+                return 0
+            try:
+                await self._settle_pending()
+                return await self._tier_before(now)
+            finally:
+                await lock.scalar(select(func.pg_advisory_unlock(_TIERING_LOCK)))
+
+    def _pending_sync(self) -> List[tuple]:
+        """Segments left unpublished by a crash, each with its first event id (None if unreadable)."""
+        import pyarrow.parquet as pq
+
+        pending = []
+        if not os.path.isdir(self.root):
+            return pending
+        for tenant_dir in os.scandir(self.root):
+            if not tenant_dir.is_dir():
+                continue
+            for day_dir in os.scandir(tenant_dir.path):
+                if not day_dir.is_dir():
+                    continue
+                for entry in os.scandir(day_dir.path):
+                    if not entry.name.endswith(".parquet" + _PENDING_SUFFIX):
+                        continue
+                    try:
+                        ids = pq.ParquetFile(entry.path).read_row_group(0, ["id"])
+                        first = ids.column("id")[0].as_py()
+                    except Exception:
+                        first = None
+                    pending.append((entry.path, first))
+        return pending
+
+    @staticmethod
+    def _publish_sync(tmp_path: str, publish: bool) -> None:
+        if publish:
+            os.replace(tmp_path, tmp_path[: -len(_PENDING_SUFFIX)])
+        elif os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    async def _settle_pending(self) -> None:
+        """Publish leftover segments whose deletes committed, discard the rest.
+
+        A window's deletes commit all at once, so one of its ids still being
+        hot means they did not and the rows are still served from Postgres.
+        """
+        for tmp_path, event_id in await asyncio.to_thread(self._pending_sync):
+            publish = False
+            if event_id is not None:
+                async with async_session_maker() as session:
+                    hot = await session.scalar(
+                        select(Event.id).where(Event.id == uuid.UUID(event_id))
+                    )
+                publish = hot is None
+            await asyncio.to_thread(self._publish_sync, tmp_path, publish)
+            logger.warning(
+                f"[COLD] {'published' if publish else 'discarded'} "
+                f"unfinished segment {tmp_path}"
+            )
+
+    async def _tier_before(self, now: Optional[datetime]) -> int:
+        cutoff = (now or datetime.now(timezone.utc)) - self.tier_after
+
+        day = func.date_trunc("day", func.timezone("UTC", Event.timestamp)).label("day")
+        async with async_session_maker() as session:
+            groups = (
+                await session.execute(
+                    select(Event.tenant_id, day)
+                    .where(Event.timestamp < cutoff)
+                    .group_by(Event.tenant_id, day)
+                    .order_by(day)
+                )
+            ).all()
+
+        moved = 0
+        for tenant_id, day_value in groups:
+            day_start = day_value.replace(tzinfo=timezone.utc)
+            moved += await self._tier_window(
+                tenant_id, day_start, min(day_start + timedelta(days=1), cutoff)
+            )
+        return moved
+
+    async def _tier_window(self, tenant_id: str, start: datetime, end: datetime) -> int:
+        """Write one segment, delete its rows, trace trees and digests in that snapshot, then publish it.
+
+        Export and deletes share one REPEATABLE READ transaction. The segment
+        is renamed into place only after the deletes commit; a crash in
+        between leaves it pending for _settle_pending.
+
+        Late rows committed mid-run are invisible to both the export and the
+        delete, so they stay hot until the next run picks them up.
+        """
+        window = (
+            Event.tenant_id == tenant_id,
+            Event.timestamp >= start,
+            Event.timestamp < end,
+        )
+        day_dir = os.path.join(
+            self._tenant_dir(tenant_id), f"date={start.date().isoformat()}"
+        )
+        path = os.path.join(day_dir, f"{uuid.uuid4().hex}.parquet")
+        tmp_path = path + _PENDING_SUFFIX
+
+        # The bulk deletes can outlast the serving command timeout
+        async with maintenance_session_maker() as session:
+            await session.connection(
+                execution_options={"isolation_level": "REPEATABLE READ"}
+            )
+            rows = await session.scalar(
+                select(func.count()).select_from(Event).where(*window)
+            )
+            if not rows:
+                return 0
+
+            await asyncio.to_thread(os.makedirs, day_dir, exist_ok=True)
+            writer = _SegmentWriter(tmp_path, rows)
+            committing = False
+            try:
+                result = await session.stream(
+                    select(Event)
+                    .where(*window)
+                    .order_by(Event.timestamp.asc(), Event.id.asc())
+                    .execution_options(yield_per=TIER_BATCH_ROWS)
+                )
+                async for partition in result.partitions():
+                    await asyncio.to_thread(writer.write, [r[0] for r in partition])
+                footer = await asyncio.to_thread(writer.close, path)
+
+                # Derived rows are keyed by event id and go with their events;
+                # diffs rehash tiered executions from their cold payloads
+                tiered = select(Event.id).where(*window)
+                await session.execute(
+                    delete(TraceTree).where(TraceTree.event_id.in_(tiered))
+                )
+                await session.execute(
+                    delete(ExecutionDigest).where(ExecutionDigest.event_id.in_(tiered))
+                )
+                await session.execute(delete(Event).where(*window))
+                committing = True
+                await session.commit()
+            except BaseException:
+                # A failed commit may still have landed; the next pass settles it
+                if not committing:
+                    await asyncio.to_thread(self._publish_sync, tmp_path, False)
+                raise
+
+        await asyncio.to_thread(self._publish_sync, tmp_path, True)
+        self._footers[path] = footer
+        logger.info(
+            f"[COLD] tiered tenant={tenant_id} day={start.date()} rows={footer.rows}"
+        )
+        return footer.rows
+
+
+cold_store = ColdStore()
+
+
+async def cold_tiering_task():
+    """Background task: periodically move aged events into cold segments."""
+    while True:
+        try:
+            moved = await cold_store.tier_old_events()
+            if moved:
+                logger.info(f"[COLD] tiering pass moved {moved} events")
+        except asyncio.CancelledError:
+            break
+        except Exception as e:
+            logger.error(f"[COLD] tiering pass failed: {type(e).__name__}: {e}")
+        await asyncio.sleep(settings.COLD_TIER_INTERVAL_SECONDS)
@@ -1,5 +1,8 @@
+import logging
 from typing import Optional, Dict, Any
 
+logger = logging.getLogger("temporallayr.failure_detector")
+
 
 async def detect_execution_failure(
     execution: Dict[str, Any],
@@ -7,7 +10,7 @@ async def detect_execution_failure(
     """
     Robustly scan execution payloads natively determining if structural failures exist.
     """
-    print("[FAILURE DETECTOR] checked execution")
+    logger.debug("[FAILURE DETECTOR] checked execution")
 
     if not isinstance(execution, dict):
         return None
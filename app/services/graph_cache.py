@@ -0,0 +1,78 @@
+import json
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger("temporallayr.graph_cache")
+
+_Key = Tuple[str, str]
+
+
+class GraphCache:
+    """Byte-budgeted LRU of decoded execution graphs keyed by (tenant_id, execution_id).
+
+    Cached graphs are shared objects; callers must treat them as read-only.
+    Invalidation is in-process: it sees only ingest that runs in this process.
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None):
+        self.max_bytes = (
+            settings.GRAPH_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        )
+        self._entries: "OrderedDict[_Key, Tuple[Dict[str, Any], int]]" = OrderedDict()
+        self._nbytes = 0
+        # Bumped by every invalidation so in-flight loads can detect they raced one
+        self._epoch = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def epoch(self) -> int:
+        return self._epoch
+
+    @property
+    def nbytes(self) -> int:
+        return self._nbytes
+
+    def get(self, tenant_id: str, execution_id: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get((tenant_id, execution_id))
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end((tenant_id, execution_id))
+        self.hits += 1
+        return entry[0]
+
+    def put(
+        self, tenant_id: str, execution_id: str, graph: Dict[str, Any], epoch: int
+    ) -> None:
+        """Cache a graph loaded when `epoch` was current; dropped if ingest invalidated since."""
+        if epoch != self._epoch or self.max_bytes <= 0:
+            return
+        size = len(json.dumps(graph, default=str))
+        if size > self.max_bytes:
+            return
+
+        key = (tenant_id, execution_id)
+        self._discard(key)
+        self._entries[key] = (graph, size)
+        self._nbytes += size
+        while self._nbytes > self.max_bytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self._nbytes -= evicted
+
+    def invalidate(self, keys: Iterable[_Key]) -> None:
+        """Drop graphs whose executions just received new events."""
+        self._epoch += 1
+        for key in keys:
+            self._discard(key)
+
+    def _discard(self, key: _Key) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._nbytes -= entry[1]
+
+
+graph_cache = GraphCache()
@@ -0,0 +1,332 @@
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import BigInteger, delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+
+from app.core.config import settings
+from app.core.database import async_session_maker
+from app.core.sketches import SpaceSaving
+from app.models.event import HeavyHitterBucket
+
+logger = logging.getLogger("temporallayr.heavy_hitters")
+
+# Tracked dimensions: graph node names, execution_events function names,
+# incident node names and incident fingerprints
+HEAVY_HITTER_KINDS = ("node", "function", "failing_node", "fingerprint")
+# Bucket id of the all-time summary kept next to the time buckets
+ALL_TIME = 0
+# Bucket id of the per tenant and kind coverage marker: {"since": epoch, "seeded": bool}
+COVERAGE = -1
+
+_Key = Tuple[str, str, int]
+# (rows before this time, bucket seconds) -> SELECT of (item, bucket, count)
+SeedQuery = Callable[[datetime, int], object]
+
+
+def bucket_column(ts_column, bucket_seconds: int):
+    """SQL twin of HeavyHitters.bucket_of for grouping stored rows into buckets."""
+    epoch = func.extract("epoch", ts_column)
+    return func.cast(
+        func.floor(epoch / bucket_seconds) * bucket_seconds + 1, BigInteger
+    )
+
+
+class HeavyHitters:
+    """Per-tenant Space-Saving summaries per kind, per time bucket and all-time.
+
+    Ingest adds to in-memory deltas; a background flush merges each delta
+    into its persisted bucket under a row lock, so several workers can feed
+    the same bucket. Queries merge the persisted buckets of the window with
+    the deltas not flushed yet.
+
+    Summaries only see what was ingested since they were deployed. The
+    COVERAGE marker records the earliest observation; a query given a
+    `seed` folds the stored rows from before it in once, exactly.
+    """
+
+    def __init__(
+        self, capacity: Optional[int] = None, bucket_seconds: Optional[int] = None
+    ):
+        self.capacity = (
+            settings.HEAVY_HITTERS_CAPACITY if capacity is None else capacity
+        )
+        self.bucket_seconds = (
+            settings.HEAVY_HITTERS_BUCKET_SECONDS
+            if bucket_seconds is None
+            else bucket_seconds
+        )
+        self._deltas: Dict[_Key, SpaceSaving] = {}
+        # (tenant, kind) -> earliest observation not flushed yet
+        self._since: Dict[Tuple[str, str], float] = {}
+        self._seeded: set = set()
+        self._seed_lock = asyncio.Lock()
+
+    def bucket_of(self, ts: float) -> int:
+        # Time buckets are 1-based so they never collide with ALL_TIME
+        return int(ts // self.bucket_seconds) * self.bucket_seconds + 1
+
+    def observe(
+        self,
+        tenant_id: str,
+        kind: str,
+        item: Optional[str],
+        seen_at: Optional[datetime] = None,
+        n: int = 1,
+    ) -> None:
+        if not tenant_id or item is None:
+            return
+        if seen_at is None:
+            ts = time.time()
+        else:
+            ts = (
+                seen_at if seen_at.tzinfo else seen_at.replace(tzinfo=timezone.utc)
+            ).timestamp()
+        if ts < self._since.get((tenant_id, kind), float("inf")):
+            self._since[(tenant_id, kind)] = ts
+        bucket = self.bucket_of(ts)
+        for key in ((tenant_id, kind, bucket), (tenant_id, kind, ALL_TIME)):
+            delta = self._deltas.get(key)
+            if delta is None:
+                delta = self._deltas[key] = SpaceSaving(self.capacity)
+            delta.add(str(item), n)
+
+    async def top(
+        self,
+        tenant_id: str,
+        kind: str,
+        n: int = 10,
+        since: Optional[datetime] = None,
+        capacity: Optional[int] = None,
+        seed: Optional[SeedQuery] = None,
+    ) -> Optional[List[Tuple[str, int, int]]]:
+        """Top (item, count, error) from the bucket holding `since` onwards, or all time.
+
+        `capacity` trims the merged summary for a cheaper, coarser answer.
+        `seed` backfills rows stored before the summaries existed, once.
+        None when nothing has been recorded for the tenant and kind yet.
+        """
+        if seed is not None and (tenant_id, kind) not in self._seeded:
+            await self._seed(tenant_id, kind, seed)
+        lo = self.bucket_of(since.timestamp()) if since else None
+        stmt = select(HeavyHitterBucket.sketch).where(
+            HeavyHitterBucket.tenant_id == tenant_id, HeavyHitterBucket.kind == kind
+        )
+        if lo is None:
+            stmt = stmt.where(HeavyHitterBucket.bucket == ALL_TIME)
+        else:
+            stmt = stmt.where(HeavyHitterBucket.bucket >= lo)
+        async with async_session_maker() as session:
+            sketches = [SpaceSaving.from_dict(s) for s in await session.scalars(stmt)]
+
+        for (t, k, bucket), delta in list(self._deltas.items()):
+            wanted = bucket == ALL_TIME if lo is None else bucket >= lo
+            if t == tenant_id and k == kind and wanted:
+                sketches.append(delta)
+        if not sketches:
+            return None
+
+        merged = SpaceSaving(capacity or self.capacity)
+        for sketch in sketches:
+            merged.merge(sketch)
+        return merged.top(n)
+
+    async def _seed(self, tenant_id: str, kind: str, seed: SeedQuery) -> None:
+        """Fold stored rows from before the first observation into the summaries.
+
+        The COVERAGE row is locked for the whole backfill, so one worker seeds
+        and the rest find it marked. Rows a worker observed but had not
+        flushed before the cutoff was read may be counted twice; the summary's
+        error bound absorbs that.
+        """
+        async with self._seed_lock:
+            if (tenant_id, kind) in self._seeded:
+                return
+            async with async_session_maker() as session:
+                marker = await self._coverage(session, tenant_id, kind)
+                if not marker.sketch.get("seeded"):
+                    pending_since = self._since.get((tenant_id, kind))
+                    known = [
+                        t for t in (marker.sketch.get("since"), pending_since) if t
+                    ]
+                    cutoff = min(known) if known else time.time()
+                    horizon = self.bucket_of(
+                        time.time() - settings.HEAVY_HITTERS_RETENTION_DAYS * 86400
+                    )
+                    backfill: Dict[_Key, SpaceSaving] = {}
+                    rows = await session.execute(
+                        seed(
+                            datetime.fromtimestamp(cutoff, timezone.utc),
+                            self.bucket_seconds,
+                        )
+                    )
+                    for item, bucket, count in rows:
+                        if item is None:
+                            continue
+                        buckets = (
+                            (ALL_TIME, bucket) if bucket >= horizon else (ALL_TIME,)
+                        )
+                        for b in buckets:
+                            key = (tenant_id, kind, int(b))
+                            if key not in backfill:
+                                backfill[key] = SpaceSaving(self.capacity)
+                            backfill[key].add(str(item), count)
+                    if backfill:
+                        await self._merge(session, tenant_id, backfill)
+                    marker.sketch = {"since": cutoff, "seeded": True}
+                    logger.info(
+                        f"[HEAVY] seeded tenant={tenant_id} kind={kind} "
+                        f"buckets={len(backfill)} before={cutoff:.0f}"
+                    )
+                await session.commit()
+            self._seeded.add((tenant_id, kind))
+
+    async def _coverage(self, session, tenant_id: str, kind: str) -> HeavyHitterBucket:
+        """The locked COVERAGE row of a tenant and kind, created unseeded if missing."""
+        await session.execute(
+            insert(HeavyHitterBucket)
+            .values(
+                tenant_id=tenant_id,
+                kind=kind,
+                bucket=COVERAGE,
+                sketch={"since": None, "seeded": False},
+            )
+            .on_conflict_do_nothing()
+        )
+        return await session.scalar(
+            select(HeavyHitterBucket)
+            .where(
+                HeavyHitterBucket.tenant_id == tenant_id,
+                HeavyHitterBucket.kind == kind,
+                HeavyHitterBucket.bucket == COVERAGE,
+            )
+            .with_for_update()
+        )
+
+    async def flush(self) -> int:
+        """Merge every pending delta into its persisted bucket; returns buckets written."""
+        deltas, self._deltas = self._deltas, {}
+        since, self._since = self._since, {}
+        by_tenant: Dict[str, Dict[_Key, SpaceSaving]] = defaultdict(dict)
+        for key, delta in deltas.items():
+            by_tenant[key[0]][key] = delta
+
+        written = 0
+        for tenant_id, pending in by_tenant.items():
+            first_seen = {k: ts for (t, k), ts in since.items() if t == tenant_id}
+            try:
+                written += await self._flush_tenant(tenant_id, pending, first_seen)
+            except Exception as e:
+                logger.error(
+                    f"[HEAVY] flush failed tenant={tenant_id}: {type(e).__name__}: {e}"
+                )
+                # Fold back into whatever arrived meanwhile; retried next pass
+                for key, delta in pending.items():
+                    current = self._deltas.get(key)
+                    if current is not None:
+                        delta.merge(current)
+                    self._deltas[key] = delta
+                for kind, ts in first_seen.items():
+                    current = self._since.get((tenant_id, kind), ts)
+                    self._since[(tenant_id, kind)] = min(ts, current)
+        return written
+
+    async def _flush_tenant(
+        self,
+        tenant_id: str,
+        pending: Dict[_Key, SpaceSaving],
+        first_seen: Dict[str, float],
+    ) -> int:
+        async with async_session_maker() as session:
+            # Coverage markers first, in kind order, as _seed locks them
+            for kind in sorted(first_seen):
+                marker = await self._coverage(session, tenant_id, kind)
+                since = marker.sketch.get("since")
+                if not marker.sketch.get("seeded") and (
+                    since is None or first_seen[kind] < since
+                ):
+                    marker.sketch = {"since": first_seen[kind], "seeded": False}
+            written = await self._merge(session, tenant_id, pending)
+            await session.commit()
+        return written
+
+    async def _merge(
+        self, session, tenant_id: str, pending: Dict[_Key, SpaceSaving]
+    ) -> int:
+        """Merge summaries into their persisted buckets inside the caller's transaction."""
+        # Lock in key order so concurrent flushes cannot deadlock
+        keys = sorted(pending)
+        rows = await session.execute(
+            select(HeavyHitterBucket)
+            .where(
+                HeavyHitterBucket.tenant_id == tenant_id,
+                HeavyHitterBucket.kind.in_({k for _, k, _ in keys}),
+                HeavyHitterBucket.bucket.in_({b for _, _, b in keys}),
+            )
+            .order_by(HeavyHitterBucket.kind, HeavyHitterBucket.bucket)
+            .with_for_update()
+        )
+        persisted = {
+            (row.tenant_id, row.kind, row.bucket): row.sketch for row in rows.scalars()
+        }
+
+        values = []
+        for key in keys:
+            merged = SpaceSaving(self.capacity)
+            if key in persisted:
+                merged.merge(SpaceSaving.from_dict(persisted[key]))
+            merged.merge(pending[key])
+            values.append(
+                {
+                    "tenant_id": key[0],
+                    "kind": key[1],
+                    "bucket": key[2],
+                    "sketch": merged.to_dict(),
+                }
+            )
+        stmt = insert(HeavyHitterBucket).values(values)
+        await session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[
+                    HeavyHitterBucket.tenant_id,
+                    HeavyHitterBucket.kind,
+                    HeavyHitterBucket.bucket,
+                ],
+                set_={"sketch": stmt.excluded.sketch},
+            )
+        )
+        return len(values)
+
+    async def prune(self, now: Optional[float] = None) -> None:
+        """Drop time buckets past retention; all-time summaries and markers are kept."""
+        horizon = (now or time.time()) - settings.HEAVY_HITTERS_RETENTION_DAYS * 86400
+        async with async_session_maker() as session:
+            await session.execute(
+                delete(HeavyHitterBucket).where(
+                    HeavyHitterBucket.bucket > ALL_TIME,
+                    HeavyHitterBucket.bucket < self.bucket_of(horizon),
+                )
+            )
+            await session.commit()
+
+
+heavy_hitters = HeavyHitters()
+
+
+async def heavy_hitters_task():
+    """Background task: periodically persist heavy-hitter deltas and prune old buckets."""
+    while True:
+        await asyncio.sleep(settings.HEAVY_HITTERS_FLUSH_SECONDS)
+        try:
+            written = await heavy_hitters.flush()
+            if written:
+                logger.info(f"[HEAVY] flushed {written} top-k buckets")
+            await heavy_hitters.prune()
+        except asyncio.CancelledError:
+            break
+        except Exception as e:
+            logger.error(f"[HEAVY] flush failed: {type(e).__name__}: {e}")
@@ -0,0 +1,354 @@
+import logging
+import os
+import time
+from array import array
+from collections import Counter, deque
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.models.event import payload_execution_key
+
+logger = logging.getLogger("temporallayr.hot_store")
+
+# Rows per column chunk; eviction drops whole chunks so it never shifts arrays
+CHUNK_ROWS = 4096
+# Fixed column cost per row: ts + duration (d), status (i), node offset (I), list slots
+_ROW_BYTES = 8 + 8 + 4 + 4 + 16
+# Rough retained cost of one node dict (keys, small values, dict overhead)
+_NODE_BYTES = 512
+
+
+def _estimate_bytes(event: Dict[str, Any], node_count: int) -> int:
+    """Cheap payload size estimate: top-level strings plus a fixed cost per node."""
+    size = _NODE_BYTES * node_count
+    for value in event.values():
+        if isinstance(value, str):
+            size += len(value)
+    return size
+
+
+def _numpy():
+    try:
+        import numpy as np  # optional: vectorizes window scans when present
+
+        return np
+    except ImportError:
+        return None
+
+
+def _epoch(event: Dict[str, Any]) -> float:
+    """Same `_ingested_at` rule StorageService uses for the persisted timestamp."""
+    raw = event.get("_ingested_at")
+    try:
+        dt = datetime.fromisoformat(raw) if raw else None
+    except ValueError:
+        dt = None
+    if dt is None:
+        return time.time()
+    if not dt.tzinfo:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def empty_bucket(bucket_idx: int) -> Dict[str, Any]:
+    """One aggregate_timeseries bucket, shared so hot and stored paths agree on layout."""
+    return {
+        "timestamp": datetime.fromtimestamp(bucket_idx, tz=timezone.utc).isoformat(),
+        "count": 0,
+        "errors": 0,
+        "latencies": [],
+        "avg_duration": 0.0,
+        "error_rate": 0.0,
+    }
+
+
+class _Chunk:
+    """Append-only column block; node names are stored CSR-style via offsets."""
+
+    __slots__ = (
+        "ts",
+        "status",
+        "duration",
+        "node_offsets",
+        "node_ids",
+        "execution_ids",
+        "payloads",
+        "nbytes",
+        "min_ts",
+        "max_ts",
+    )
+
+    def __init__(self):
+        self.ts = array("d")
+        self.status = array("i")
+        self.duration = array("d")
+        self.node_offsets = array("I", [0])
+        self.node_ids = array("i")
+        self.execution_ids: List[Optional[str]] = []
+        self.payloads: List[Dict[str, Any]] = []
+        self.nbytes = 0
+        self.min_ts = float("inf")
+        self.max_ts = float("-inf")
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+
+class _TenantWindow:
+    def __init__(self, covered_from: float):
+        self.chunks: Deque[_Chunk] = deque()
+        # Interned dictionaries so the hot columns stay fixed-width integers
+        self.status_codes: Dict[str, int] = {}
+        self.node_codes: Dict[str, int] = {}
+        self.node_names: List[str] = []
+        # Every event with ts > covered_from is held in the window
+        self.covered_from = covered_from
+
+    def intern_node(self, name: str) -> int:
+        code = self.node_codes.get(name)
+        if code is None:
+            code = self.node_codes[name] = len(self.node_names)
+            self.node_names.append(name)
+        return code
+
+
+class HotStore:
+    """In-process columnar window over the last few minutes of ingested events.
+
+    Fed after each committed ingest batch; answers window aggregates that it
+    fully covers without a database round-trip. Holds only what this process
+    ingested, so it is off by default and refuses to start under several
+    workers (WEB_CONCURRENCY > 1), where each would answer from a partial window.
+    """
+
+    def __init__(
+        self, window_minutes: Optional[int] = None, max_bytes: Optional[int] = None
+    ):
+        minutes = (
+            settings.HOT_WINDOW_MINUTES if window_minutes is None else window_minutes
+        )
+        if minutes > 0 and int(os.environ.get("WEB_CONCURRENCY") or 1) > 1:
+            logger.error(
+                "[HOT] HOT_WINDOW_MINUTES is set but WEB_CONCURRENCY > 1; "
+                "the hot window only sees its own worker's ingest, disabling it"
+            )
+            minutes = 0
+        self.window_seconds = minutes * 60
+        self.max_bytes = (
+            settings.HOT_WINDOW_MAX_BYTES if max_bytes is None else max_bytes
+        )
+        self.started_at = time.time()
+        self._tenants: Dict[str, _TenantWindow] = {}
+        self._nbytes = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.window_seconds > 0
+
+    @property
+    def nbytes(self) -> int:
+        return self._nbytes
+
+    def ingest(self, batch: List[Dict[str, Any]]) -> None:
+        """Append a committed batch of {"tenant_id", "event"} items."""
+        if not self.enabled:
+            return
+        for item in batch:
+            tenant_id = item.get("tenant_id")
+            event = item.get("event") or {}
+            if not tenant_id:
+                continue
+            window = self._tenants.get(tenant_id)
+            if window is None:
+                window = self._tenants[tenant_id] = _TenantWindow(self.started_at)
+            self._append(window, event)
+        self._evict()
+
+    def _append(self, window: _TenantWindow, event: Dict[str, Any]) -> None:
+        chunk = window.chunks[-1] if window.chunks else None
+        if chunk is None or len(chunk) >= CHUNK_ROWS:
+            chunk = _Chunk()
+            window.chunks.append(chunk)
+
+        ts = _epoch(event)
+        status = str(event.get("status", "UNKNOWN"))
+        metrics = event.get("metrics") or {}
+        try:
+            duration = float(metrics.get("duration_ms", 0.0))
+        except (TypeError, ValueError, AttributeError):
+            duration = 0.0
+
+        chunk.ts.append(ts)
+        chunk.status.append(
+            window.status_codes.setdefault(status, len(window.status_codes))
+        )
+        chunk.duration.append(duration)
+        nodes = event.get("nodes") or []
+        for node in nodes if isinstance(nodes, list) else []:
+            name = node.get("name") if isinstance(node, dict) else None
+            if name is not None:
+                chunk.node_ids.append(window.intern_node(str(name)))
+        chunk.node_offsets.append(len(chunk.node_ids))
+        chunk.execution_ids.append(payload_execution_key(event))
+        chunk.payloads.append(event)
+
+        node_count = len(nodes) if isinstance(nodes, list) else 0
+        size = _ROW_BYTES + 4 * node_count + _estimate_bytes(event, node_count)
+        chunk.nbytes += size
+        self._nbytes += size
+        chunk.min_ts = min(chunk.min_ts, ts)
+        chunk.max_ts = max(chunk.max_ts, ts)
+
+    def _drop_oldest(self, window: _TenantWindow) -> None:
+        chunk = window.chunks.popleft()
+        self._nbytes -= chunk.nbytes
+        window.covered_from = max(window.covered_from, chunk.max_ts)
+
+    def _evict(self) -> None:
+        """Drop chunks past the window age, then the globally oldest until under budget."""
+        horizon = time.time() - self.window_seconds
+        for window in self._tenants.values():
+            while window.chunks and window.chunks[0].max_ts < horizon:
+                self._drop_oldest(window)
+
+        while self._nbytes > self.max_bytes:
+            oldest = min(
+                (w for w in self._tenants.values() if w.chunks),
+                key=lambda w: w.chunks[0].min_ts,
+                default=None,
+            )
+            if oldest is None:
+                break
+            self._drop_oldest(oldest)
+
+    def covers(self, tenant_id: str, start: datetime) -> bool:
+        """True when every event of the tenant after `start` is held in memory."""
+        if not self.enabled:
+            return False
+        window = self._tenants.get(tenant_id)
+        covered_from = window.covered_from if window else self.started_at
+        return start.timestamp() > covered_from
+
+    def _chunks(self, tenant_id: str, start: float, end: float):
+        window = self._tenants.get(tenant_id)
+        if window is None:
+            return None, []
+        chunks = [c for c in window.chunks if c.max_ts >= start and c.min_ts <= end]
+        return window, chunks
+
+    def buckets(
+        self, tenant_id: str, start: datetime, end: datetime, interval_seconds: int
+    ) -> Dict[int, Dict[str, Any]]:
+        """Time-series buckets in the aggregate_timeseries accumulator layout."""
+        lo, hi = start.timestamp(), end.timestamp()
+        window, chunks = self._chunks(tenant_id, lo, hi)
+        failed = window.status_codes.get("FAILED", -1) if window else -1
+        buckets: Dict[int, Dict[str, Any]] = {}
+
+        def bucket(idx: int) -> Dict[str, Any]:
+            b = buckets.get(idx)
+            if b is None:
+                b = buckets[idx] = empty_bucket(idx)
+            return b
+
+        np = _numpy()
+        for chunk in chunks:
+            if np is not None:
+                ts = np.frombuffer(chunk.ts, dtype=np.float64)
+                mask = (ts >= lo) & (ts <= hi)
+                idx = (ts[mask] // interval_seconds).astype(np.int64) * interval_seconds
+                keys, inverse, counts = np.unique(
+                    idx, return_inverse=True, return_counts=True
+                )
+                errors = np.bincount(
+                    inverse,
+                    weights=np.frombuffer(chunk.status, dtype=np.int32)[mask] == failed,
+                    minlength=len(keys),
+                )
+                durations = np.frombuffer(chunk.duration, dtype=np.float64)[mask]
+                grouped = np.split(
+                    durations[np.argsort(inverse, kind="stable")],
+                    np.cumsum(counts)[:-1],
+                )
+                for key, count, err, lat in zip(
+                    keys.tolist(), counts.tolist(), errors.tolist(), grouped
+                ):
+                    b = bucket(key)
+                    b["count"] += count
+                    b["errors"] += int(err)
+                    b["latencies"].extend(lat.tolist())
+            else:
+                for ts, status, duration in zip(chunk.ts, chunk.status, chunk.duration):
+                    if lo <= ts <= hi:
+                        b = bucket(int(ts // interval_seconds) * interval_seconds)
+                        b["count"] += 1
+                        b["errors"] += status == failed
+                        b["latencies"].append(duration)
+        return buckets
+
+    def error_stats(
+        self, tenant_id: str, start: datetime, end: datetime
+    ) -> Tuple[int, int]:
+        """(total_events, error_events) over the range."""
+        lo, hi = start.timestamp(), end.timestamp()
+        window, chunks = self._chunks(tenant_id, lo, hi)
+        failed = window.status_codes.get("FAILED", -1) if window else -1
+        total = errors = 0
+
+        np = _numpy()
+        for chunk in chunks:
+            if np is not None:
+                ts = np.frombuffer(chunk.ts, dtype=np.float64)
+                mask = (ts >= lo) & (ts <= hi)
+                total += int(mask.sum())
+                status = np.frombuffer(chunk.status, dtype=np.int32)
+                errors += int((status[mask] == failed).sum())
+            else:
+                for ts, status in zip(chunk.ts, chunk.status):
+                    if lo <= ts <= hi:
+                        total += 1
+                        errors += status == failed
+        return total, errors
+
+    def top_functions(
+        self, tenant_id: str, start: datetime, end: datetime, limit: int = 10
+    ) -> List[Tuple[str, int]]:
+        """Most frequent node names over the range, most common first."""
+        lo, hi = start.timestamp(), end.timestamp()
+        window, chunks = self._chunks(tenant_id, lo, hi)
+        counts: Counter = Counter()
+
+        np = _numpy()
+        for chunk in chunks:
+            if np is not None:
+                ts = np.frombuffer(chunk.ts, dtype=np.float64)
+                offsets = np.frombuffer(chunk.node_offsets, dtype=np.uint32)
+                # Expand the per-row mask over each row's slice of node ids
+                row_mask = np.repeat((ts >= lo) & (ts <= hi), np.diff(offsets))
+                ids = np.frombuffer(chunk.node_ids, dtype=np.int32)[row_mask]
+                for code, n in enumerate(np.bincount(ids).tolist()):
+                    if n:
+                        counts[code] += n
+            else:
+                for row, ts in enumerate(chunk.ts):
+                    if lo <= ts <= hi:
+                        start_at, end_at = chunk.node_offsets[row : row + 2]
+                        counts.update(chunk.node_ids[start_at:end_at])
+
+        return [(window.node_names[code], n) for code, n in counts.most_common(limit)]
+
+    def recent_payloads(self, tenant_id: str, limit: int = 100) -> List[Dict[str, Any]]:
+        """Newest payload references for the tenant, newest first."""
+        window = self._tenants.get(tenant_id)
+        out: List[Dict[str, Any]] = []
+        if limit <= 0:
+            return out
+        for chunk in reversed(window.chunks if window else ()):
+            out.extend(reversed(chunk.payloads[-(limit - len(out)) :]))
+            if len(out) >= limit:
+                break
+        return out
+
+
+hot_store = HotStore()
@@ -3,6 +3,16 @@ import logging
 from typing import Any, Dict, List
 from datetime import datetime, UTC
 
+from app.core.metrics import (
+    ingest_commit_latency_seconds,
+    ingest_flush_batch_size,
+    queue_depth,
+)
+from app.core.profiling import timed
+from app.core.scheduler import query_context
+from app.services.cardinality import cardinality_store
+from app.services.heavy_hitters import heavy_hitters
+from app.services.hot_store import hot_store
 from app.services.storage_service import StorageService
 
 logger = logging.getLogger("temporallayr.ingestion")
@@ -21,6 +31,7 @@ class IngestionService:
         """Start the background ingestion worker."""
         if not self._is_running:
             self._queue = asyncio.Queue(maxsize=10000)
+            queue_depth.track(["ingest_service"], self._queue.qsize)
             self._is_running = True
             logger.info("IngestionService background worker starting...")
             self._worker_task = asyncio.create_task(self._process_queue())
@@ -94,13 +105,23 @@ class IngestionService:
             except asyncio.CancelledError:
                 break
             except Exception as e:
-                import traceback
-
-                print(f"[FATAL] Worker exception: {e}")
-                traceback.print_exc()
-                logger.error(f"Error in background ingestion worker: {e}")
+                logger.exception(f"Error in background ingestion worker: {e}")
                 await asyncio.sleep(1)  # Prevent rapid spin on generic crash
 
+    @staticmethod
+    def _observe_commit(batch: List[Dict[str, Any]]) -> None:
+        """Enqueue-to-commit latency from each event's server-side receipt stamp."""
+        committed = datetime.now(UTC)
+        ingest_flush_batch_size.labels("service").observe(len(batch))
+        latency = ingest_commit_latency_seconds.labels("service")
+        for item in batch:
+            try:
+                received = datetime.fromisoformat(item["event"]["_ingested_at"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            latency.observe((committed - received).total_seconds())
+
+    @timed("_write_batch", root=True)
     async def _write_batch(self, batch: List[Dict[str, Any]]) -> bool:
         """Write a batch of events reliably to secondary storage through structured backend routing.
         Stream publication is fire-and-forget and always fires, regardless of storage success.
@@ -108,7 +129,7 @@ class IngestionService:
         from app.core.event_stream import EventStream
         from app.services.failure_detector import detect_execution_failure
         from app.core.database import async_session_maker
-        from app.models.event import Incident
+        from app.models.event import Incident, payload_execution_key
         from datetime import datetime, UTC
 
         stream = EventStream()
@@ -116,7 +137,7 @@ class IngestionService:
         # Publish to live stream immediately — non-blocking, independent of DB outcome
         for item in batch:
             event_payload = item.get("event", {})
-            exec_id = event_payload.get("execution_id") or event_payload.get("id")
+            exec_id = payload_execution_key(event_payload)
             tenant_id = item.get("tenant_id")
 
             if exec_id and tenant_id:
@@ -136,9 +157,10 @@ class IngestionService:
             f"Dispatching {len(batch)} queued events into PostgreSQL storage backend natively..."
         )
         try:
-            success = await asyncio.wait_for(
-                self._storage.bulk_insert_events(batch), timeout=10.0
-            )
+            with query_context(priority="ingest"):
+                success = await asyncio.wait_for(
+                    self._storage.bulk_insert_events(batch), timeout=10.0
+                )
             if not success:
                 logger.error(
                     "Failed persisting batch cleanly via storage backend layer boundaries. Halting batch to preserve events."
@@ -150,6 +172,10 @@ class IngestionService:
             )
             return False
 
+        # Committed: make the batch visible to in-memory window queries
+        hot_store.ingest(batch)
+        self._observe_commit(batch)
+
         from app.stream.stream_manager import stream_manager_v2
         from app.rules.engine import rule_engine
 
@@ -180,7 +206,7 @@ class IngestionService:
                         "node_name": event_payload.get("node", "analyzer"),
                         "summary": f"Detected anomaly matching rule: {result.rule.name}",
                     }
-                    print(
+                    logger.info(
                         f"[RULE] triggered incident proactively logic='{result.rule.name}'"
                     )
                     asyncio.create_task(
@@ -255,6 +281,18 @@ class IngestionService:
                 # Natively map fingerprint bounds uniquely locking identical error paths
                 fp_raw = f"{incident_data.get('failure_type', '')}:{incident_data.get('node_name', '')}"
                 fingerprint = hashlib.sha256(fp_raw.encode("utf-8")).hexdigest()
+                heavy_hitters.observe(
+                    incident_data["tenant_id"],
+                    "failing_node",
+                    incident_data.get("node_name"),
+                    dt,
+                )
+                heavy_hitters.observe(
+                    incident_data["tenant_id"], "fingerprint", fingerprint, dt
+                )
+                cardinality_store.observe(
+                    incident_data["tenant_id"], "fingerprint", fingerprint, dt
+                )
 
                 if async_session_maker:
                     try:
@@ -284,7 +322,7 @@ class IngestionService:
                                 # Safe native isolation bounds mapping aggregates sequentially
                                 existing_incident.occurrence_count += 1
                                 existing_incident.timestamp = dt
-                                print(f"[INCIDENT GROUPED] {fp_raw}")
+                                logger.info(f"[INCIDENT GROUPED] {fp_raw}")
                             else:
                                 new_incident = Incident(
                                     tenant_id=incident_data["tenant_id"],
@@ -297,7 +335,7 @@ class IngestionService:
                                     occurrence_count=1,
                                 )
                                 session.add(new_incident)
-                                print(f"[INCIDENT CREATED] {exec_id}")
+                                logger.info(f"[INCIDENT CREATED] {exec_id}")
 
                             await session.commit()
 
@@ -319,10 +357,12 @@ class IngestionService:
                         logger.error(
                             f"Failed persisting localized incidents securely to database: {e}"
                         )
-                        print(
+                        logger.warning(
                             f"[INCIDENT OFFLINE] {exec_id} (Fingerprint: {fingerprint})"
                         )
                 else:
-                    print(f"[INCIDENT OFFLINE] {exec_id} (Fingerprint: {fingerprint})")
+                    logger.warning(
+                        f"[INCIDENT OFFLINE] {exec_id} (Fingerprint: {fingerprint})"
+                    )
 
         return True
@@ -0,0 +1,293 @@
+import asyncio
+import bisect
+import json
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Set
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+
+from app.core.config import settings
+from app.core.database import async_session_maker
+from app.core.sketches import HyperLogLog
+from app.models.event import Event, SchemaField
+
+logger = logging.getLogger("temporallayr.schema_catalog")
+
+# Rows per upsert statement while flushing, well under the bind parameter limit
+FLUSH_CHUNK_ROWS = 1000
+# Recent payloads observed to seed a tenant that has no catalog rows yet
+SEED_PAYLOADS = 100
+
+
+def _json_type(value: Any) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "boolean"
+    if isinstance(value, (int, float)):
+        return "number"
+    if isinstance(value, str):
+        return "string"
+    if isinstance(value, list):
+        return "array"
+    return "object"
+
+
+def _aware(dt: datetime) -> datetime:
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+class _Field:
+    __slots__ = ("types", "first_seen", "last_seen", "hll", "estimate")
+
+    def __init__(self, seen_at: datetime):
+        self.types: Set[str] = set()
+        self.first_seen = seen_at
+        self.last_seen = seen_at
+        self.hll = HyperLogLog()
+        self.estimate = 0
+
+    def merge_row(self, row: SchemaField) -> None:
+        """Fold a persisted row in; every part of the merge is idempotent."""
+        self.types.update(row.types)
+        self.first_seen = min(self.first_seen, row.first_seen)
+        self.last_seen = max(self.last_seen, row.last_seen)
+        if self.hll.merge(HyperLogLog.from_bytes(row.hll)) or not self.estimate:
+            self.estimate = self.hll.count()
+
+
+class _TenantCatalog:
+    def __init__(self):
+        self.fields: Dict[str, _Field] = {}
+        self.dirty: Set[str] = set()
+        self.loaded = False
+        # Sorted path list for prefix search; rebuilt only when a new path appears
+        self._paths: Optional[List[str]] = None
+
+    def field(self, path: str, seen_at: datetime) -> _Field:
+        field = self.fields.get(path)
+        if field is None:
+            field = self.fields[path] = _Field(seen_at)
+            self._paths = None
+        return field
+
+    @property
+    def paths(self) -> List[str]:
+        if self._paths is None:
+            self._paths = sorted(self.fields)
+        return self._paths
+
+
+class SchemaCatalog:
+    """Per-tenant catalog of payload JSON paths, maintained from ingest.
+
+    Paths follow the dashboard convention (dotted keys, `*` for list items)
+    and record observed types, first/last seen and an HLL distinct estimate.
+    Ingest updates memory only; a background flush merges dirty paths into
+    `schema_fields` under row locks and pulls other workers' updates back.
+    """
+
+    def __init__(self):
+        self._tenants: Dict[str, _TenantCatalog] = {}
+
+    def _catalog(self, tenant_id: str) -> _TenantCatalog:
+        catalog = self._tenants.get(tenant_id)
+        if catalog is None:
+            catalog = self._tenants[tenant_id] = _TenantCatalog()
+        return catalog
+
+    def observe(self, tenant_id: str, payload: Any, seen_at: datetime) -> None:
+        """Record every leaf path of one payload."""
+        if not tenant_id:
+            return
+        catalog = self._catalog(tenant_id)
+        seen_at = _aware(seen_at)
+        stack = [("", payload)]
+        while stack:
+            path, value = stack.pop()
+            if isinstance(value, dict):
+                stack.extend(
+                    (f"{path}.{k}" if path else str(k), v) for k, v in value.items()
+                )
+                continue
+            if isinstance(value, list) and value:
+                item_path = f"{path}.*" if path else "*"
+                stack.extend((item_path, item) for item in value)
+                continue
+
+            field = catalog.field(path, seen_at)
+            kind = _json_type(value)
+            changed = kind not in field.types
+            field.types.add(kind)
+            if seen_at < field.first_seen:
+                field.first_seen, changed = seen_at, True
+            if seen_at > field.last_seen:
+                field.last_seen, changed = seen_at, True
+            text = value if isinstance(value, str) else json.dumps(value)
+            if field.hll.add(text) or changed:
+                catalog.dirty.add(path)
+
+    async def fields(
+        self, tenant_id: str, prefix: Optional[str] = None, limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Catalog entries sorted by path, optionally only those starting with `prefix`."""
+        catalog = self._catalog(tenant_id)
+        if not catalog.loaded:
+            await self._load(tenant_id, catalog)
+
+        paths = catalog.paths
+        lo, hi = 0, len(paths)
+        if prefix:
+            lo = bisect.bisect_left(paths, prefix)
+            # Every string with the prefix sorts below prefix + U+FFFF
+            hi = bisect.bisect_left(paths, prefix + "\uffff", lo)
+        if limit is not None:
+            hi = min(hi, lo + limit)
+
+        out = []
+        for path in paths[lo:hi]:
+            field = catalog.fields[path]
+            out.append(
+                {
+                    "path": path,
+                    "types": sorted(field.types),
+                    "first_seen": field.first_seen.isoformat(),
+                    "last_seen": field.last_seen.isoformat(),
+                    "distinct_estimate": field.estimate,
+                }
+            )
+        return out
+
+    async def _load(self, tenant_id: str, catalog: _TenantCatalog) -> None:
+        """Merge the persisted catalog in; seed never-cataloged tenants from recent events."""
+        async with async_session_maker() as session:
+            rows = (
+                (
+                    await session.execute(
+                        select(SchemaField).where(SchemaField.tenant_id == tenant_id)
+                    )
+                )
+                .scalars()
+                .all()
+            )
+            payloads = []
+            if not rows and not catalog.loaded:
+                payloads = (
+                    await session.execute(
+                        select(Event.payload, Event.timestamp)
+                        .where(
+                            Event.tenant_id == tenant_id,
+                            Event.event_type == "execution_graph",
+                        )
+                        .order_by(Event.timestamp.desc())
+                        .limit(SEED_PAYLOADS)
+                    )
+                ).all()
+
+        for row in rows:
+            catalog.field(row.path, row.first_seen).merge_row(row)
+        for payload, timestamp in payloads:
+            self.observe(tenant_id, payload, timestamp)
+        for path in catalog.dirty:
+            catalog.fields[path].estimate = catalog.fields[path].hll.count()
+        catalog.loaded = True
+
+    async def flush(self) -> int:
+        """Persist dirty paths and refresh the tenants that had any; returns rows written."""
+        written = 0
+        for tenant_id, catalog in list(self._tenants.items()):
+            if not catalog.dirty:
+                continue
+            dirty = sorted(catalog.dirty)
+            catalog.dirty.clear()
+            try:
+                written += await self._flush_tenant(tenant_id, catalog, dirty)
+            except Exception as e:
+                logger.error(
+                    f"[SCHEMA] flush failed tenant={tenant_id}: {type(e).__name__}: {e}"
+                )
+                # Keep them dirty so the next pass retries
+                catalog.dirty.update(dirty)
+                continue
+            if catalog.loaded:
+                # Pick up paths other workers persisted since the last load
+                try:
+                    await self._load(tenant_id, catalog)
+                except Exception as e:
+                    logger.error(
+                        f"[SCHEMA] reload failed tenant={tenant_id}: {type(e).__name__}: {e}"
+                    )
+        return written
+
+    async def _flush_tenant(
+        self, tenant_id: str, catalog: _TenantCatalog, dirty: List[str]
+    ) -> int:
+        if not dirty:
+            return 0
+        async with async_session_maker() as session:
+            for start in range(0, len(dirty), FLUSH_CHUNK_ROWS):
+                chunk = dirty[start : start + FLUSH_CHUNK_ROWS]
+                # Lock persisted rows so concurrent workers merge one at a time
+                rows = await session.execute(
+                    select(SchemaField)
+                    .where(
+                        SchemaField.tenant_id == tenant_id,
+                        SchemaField.path.in_(chunk),
+                    )
+                    .with_for_update()
+                )
+                for row in rows.scalars():
+                    catalog.fields[row.path].merge_row(row)
+
+                values = []
+                for path in chunk:
+                    field = catalog.fields[path]
+                    field.estimate = field.hll.count()
+                    values.append(
+                        {
+                            "tenant_id": tenant_id,
+                            "path": path,
+                            "types": sorted(field.types),
+                            "first_seen": field.first_seen,
+                            "last_seen": field.last_seen,
+                            "hll": field.hll.to_bytes(),
+                            "distinct_estimate": field.estimate,
+                        }
+                    )
+                stmt = insert(SchemaField).values(values)
+                await session.execute(
+                    stmt.on_conflict_do_update(
+                        index_elements=[SchemaField.tenant_id, SchemaField.path],
+                        set_={
+                            column: stmt.excluded[column]
+                            for column in (
+                                "types",
+                                "first_seen",
+                                "last_seen",
+                                "hll",
+                                "distinct_estimate",
+                            )
+                        },
+                    )
+                )
+            await session.commit()
+        return len(dirty)
+
+
+schema_catalog = SchemaCatalog()
+
+
+async def schema_catalog_task():
+    """Background task: periodically persist the ingest-maintained schema catalog."""
+    while True:
+        await asyncio.sleep(settings.SCHEMA_CATALOG_FLUSH_SECONDS)
+        try:
+            written = await schema_catalog.flush()
+            if written:
+                logger.info(f"[SCHEMA] flushed {written} catalog fields")
+        except asyncio.CancelledError:
+            break
+        except Exception as e:
+            logger.error(f"[SCHEMA] catalog flush failed: {type(e).__name__}: {e}")
@@ -4,6 +4,7 @@ from datetime import datetime
 from sqlalchemy import select
 
 from app.core.database import async_session_maker
+from app.core.replicas import read_session
 from app.models.event import ExecutionSummary
 
 logger = logging.getLogger("temporallayr.search")
@@ -22,7 +23,7 @@ async def search_executions(
     Always filters by tenant_id aggressively.
     Order is newest first natively.
     """
-    print("[SEARCH] executed query")
+    logger.debug("[SEARCH] executed query")
 
     if not async_session_maker:
         return _mock_search_fallback(tenant_id, function_name, offset, limit)
@@ -32,7 +33,7 @@ async def search_executions(
 
         storage = StorageService()
 
-        async with async_session_maker() as session:
+        async with read_session(tenant_id) as session:
             # 1. Base query against lightweight summaries natively tracking graphs
             stmt = select(ExecutionSummary).where(
                 ExecutionSummary.tenant_id == tenant_id
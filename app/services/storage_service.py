@@ -1,15 +1,67 @@
 import logging
 import asyncio
+import uuid
+from collections import Counter
 from typing import List, Dict, Any
 from datetime import datetime
+from sqlalchemy import Text, and_, cast, literal_column, or_
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import SQLAlchemyError
 
 from app.core.database import async_session_maker
-from app.models.event import Event, ExecutionSummary
+from app.core.replicas import replica_router
+from app.core.raw_json import RawJSON
+from app.core.pagination import Page, apply_keyset, paginate
+from app.core.profiling import timed
+from app.models.event import (
+    Event,
+    ExecutionSummary,
+    execution_key,
+    payload_execution_key,
+)
+from app.query.counts import total_counter
+from app.query.diff import GraphTree, tree_digest, upsert_digests
+from app.query.trace_tree import insert_trace_trees, trace_tree_row
+from app.services.cardinality import cardinality_store
+from app.services.cold_storage import cold_store
+from app.services.graph_cache import graph_cache
+from app.services.heavy_hitters import heavy_hitters
+from app.services.schema_catalog import schema_catalog
 
 logger = logging.getLogger("temporallayr.storage")
 
 
+# asyncpg binds at most 32767 parameters per statement
+_MAX_BIND_PARAMS = 32767
+
+
+def _chunked(rows: List[Dict[str, Any]]):
+    """Slices of `rows` small enough to bind as one multi-row VALUES statement."""
+    size = max(1, _MAX_BIND_PARAMS // len(rows[0]))
+    for start in range(0, len(rows), size):
+        yield rows[start : start + size]
+
+
+def _upsert_summaries(rows: List[Dict[str, Any]]):
+    """Insert execution summaries, refreshing node_count for executions seen before.
+
+    Conflicts with another tenant's execution of the same id leave that row untouched.
+    """
+    stmt = insert(ExecutionSummary).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=[ExecutionSummary.id],
+        set_={"node_count": stmt.excluded.node_count},
+        where=ExecutionSummary.tenant_id == stmt.excluded.tenant_id,
+    ).returning(
+        ExecutionSummary.tenant_id, literal_column("xmax = 0").label("inserted")
+    )
+
+
+def _raw_payload():
+    # jsonb rendered to text by Postgres; asyncpg hands back the string as-is
+    return cast(Event.payload, Text).label("payload")
+
+
 class StorageService:
     def __init__(self, max_retries: int = 3, base_delay: float = 1.0):
         self.max_retries = max_retries
@@ -19,8 +71,57 @@ class StorageService:
         # tenant_id -> list of execution IDs sorted by newest first
         self._execution_cache: Dict[str, List[str]] = {}
 
-        print("[INDEX] ready")
+        logger.info("[INDEX] ready")
+
+    def _observe_committed(self, event: Event) -> None:
+        """Feed a committed event into the ingest-maintained catalog and sketches."""
+        tenant_id, payload, seen_at = event.tenant_id, event.payload, event.timestamp
+        schema_catalog.observe(tenant_id, payload, seen_at)
+        # Sketches count what the baseline queries count: execution graphs only
+        if (event.event_type or "execution_graph") != "execution_graph":
+            return
+        for dimension, value in (
+            ("function", payload.get("function_name")),
+            ("execution", payload_execution_key(payload)),
+            ("cluster", payload.get("cluster_id")),
+            ("fingerprint", payload.get("fingerprint")),
+        ):
+            cardinality_store.observe(tenant_id, dimension, value, seen_at)
+        nodes = payload.get("nodes")
+        for node in nodes if isinstance(nodes, list) else []:
+            if isinstance(node, dict):
+                heavy_hitters.observe(tenant_id, "node", node.get("name"), seen_at)
+                cardinality_store.observe(tenant_id, "node", node.get("name"), seen_at)
+
+    def _after_commit(self, touched: set, events: List[Event]) -> None:
+        """Side effects of a committed batch; each is guarded so none can undo it."""
+        try:
+            # Cached graphs of these executions are now stale
+            graph_cache.invalidate(touched)
+        except Exception as e:
+            logger.error(
+                f"[STORAGE] graph cache invalidation failed: {type(e).__name__}: {e}"
+            )
+        try:
+            for tenant_id in {event.tenant_id for event in events}:
+                replica_router.note_write(tenant_id)
+        except Exception as e:
+            logger.error(
+                f"[STORAGE] replica write note failed: {type(e).__name__}: {e}"
+            )
+        failed = 0
+        for event in events:
+            try:
+                self._observe_committed(event)
+            except Exception as e:
+                failed += 1
+                error = f"{type(e).__name__}: {e}"
+        if failed:
+            logger.error(
+                f"[STORAGE] catalog/sketch observation failed for {failed} events: {error}"
+            )
 
+    @timed("bulk_insert_events")
     async def bulk_insert_events(self, batch: List[Dict[str, Any]]) -> bool:
         """
         Execute high-throughput async DB batch inserts reliably explicitly backing off on transient PostgreSQL faults.
@@ -36,6 +137,11 @@ class StorageService:
 
         # Transform raw structured batches mapping natively over target SQLAlchemy model entities tightly
         event_models = []
+        # (tenant_id, execution_id) pairs whose cached graphs this batch supersedes
+        touched = set()
+        summaries: Dict[str, Dict[str, Any]] = {}
+        digests: Dict[Any, Dict[str, Any]] = {}
+        trace_trees: List[Dict[str, Any]] = []
         for item in batch:
             tenant_id = item.get("tenant_id")
             event_data = item.get("event", {})
@@ -51,23 +157,42 @@ class StorageService:
             except ValueError:
                 dt = datetime.utcnow()
 
-            event_models.append(
-                Event(tenant_id=tenant_id, timestamp=dt, payload=event_data)
+            event = Event(
+                id=uuid.uuid4(), tenant_id=tenant_id, timestamp=dt, payload=event_data
             )
+            event_models.append(event)
+
+            graph = None
+            if tenant_id and isinstance(event_data.get("nodes"), list):
+                # Parsed once for both the materialized trace tree and the digest
+                graph = GraphTree(event_data)
+                trace_trees.append(trace_tree_row(event.id, tenant_id, graph))
 
             # Build parallel index record extracting graph topologies gracefully
-            exec_id = event_data.get("execution_id") or event_data.get("id")
+            exec_id = payload_execution_key(event_data)
+            if tenant_id and exec_id:
+                touched.add((tenant_id, str(exec_id)))
             if exec_id:
                 nodes = event_data.get("nodes", [])
                 node_count = len(nodes) if isinstance(nodes, list) else 1
-                event_models.append(
-                    ExecutionSummary(
-                        id=str(exec_id),
-                        tenant_id=tenant_id,
-                        created_at=dt,
-                        node_count=node_count,
-                    )
+                # One summary row per execution; later events refresh node_count
+                summary = summaries.setdefault(
+                    str(exec_id),
+                    {"id": str(exec_id), "tenant_id": tenant_id, "created_at": dt},
                 )
+                summary["node_count"] = node_count
+
+                # Merkle digest of the graph, pinned to this event for later diffs
+                if graph is not None:
+                    digest = tree_digest(graph)
+                    digests[(tenant_id, str(exec_id))] = {
+                        "tenant_id": tenant_id,
+                        "execution_id": str(exec_id),
+                        "event_id": event.id,
+                        "event_timestamp": dt,
+                        "root_hash": digest.root,
+                        "node_hashes": digest.nodes,
+                    }
 
                 # Push to in-memory cache directly resolving mock fallbacks
                 if tenant_id and exec_id:
@@ -82,11 +207,23 @@ class StorageService:
             try:
                 async with async_session_maker() as session:  # type: AsyncSession
                     session.add_all(event_models)
+                    # (tenant_id, resource) -> rows added, applied in the same transaction
+                    deltas: Counter = Counter()
+                    if summaries:
+                        # Only rows actually inserted (xmax = 0) are new executions
+                        for chunk in _chunked(list(summaries.values())):
+                            for row in await session.execute(_upsert_summaries(chunk)):
+                                if row.inserted:
+                                    deltas[(row.tenant_id, "executions")] += 1
+                    if trace_trees:
+                        for chunk in _chunked(trace_trees):
+                            await session.execute(insert_trace_trees(chunk))
+                    if digests:
+                        for chunk in _chunked(list(digests.values())):
+                            await session.execute(upsert_digests(chunk))
+                    await total_counter.increment(session, deltas)
                     await session.commit()
-                    logger.info(
-                        f"Successfully persisted {len(event_models)} events to PostgreSQL backend."
-                    )
-                    return True
+                break
             except SQLAlchemyError as e:
                 logger.error(
                     f"Database insertion failed (Attempt {attempt}/{self.max_retries}): {e}"
@@ -106,8 +243,15 @@ class StorageService:
                     f"Unexpected execution error mapping storage transaction cleanly: {e}"
                 )
                 return False
+        else:
+            return False
 
-        return False
+        # Committed: nothing below may fail the batch, or the caller would write it twice
+        self._after_commit(touched, event_models)
+        logger.info(
+            f"Successfully persisted {len(event_models)} events to PostgreSQL backend."
+        )
+        return True
 
     async def query_events(
         self,
@@ -115,9 +259,12 @@ class StorageService:
         limit: int = 100,
         from_time: datetime | None = None,
         to_time: datetime | None = None,
+        raw: bool = False,
     ) -> List[Dict[str, Any]]:
         """
         Execute highly structured tenant event scans efficiently leveraging composite API key indexes defensively.
+
+        With `raw`, payloads come back as undecoded RawJSON text for splicing into responses.
         """
         from sqlalchemy import select
 
@@ -126,7 +273,8 @@ class StorageService:
             return []
 
         # Bound explicit scan parameters natively
-        stmt = select(Event.payload).where(Event.tenant_id == tenant_id)
+        column = _raw_payload() if raw else Event.payload
+        stmt = select(column).where(Event.tenant_id == tenant_id)
 
         if from_time:
             stmt = stmt.where(Event.timestamp >= from_time)
@@ -140,6 +288,8 @@ class StorageService:
             async with async_session_maker() as session:
                 result = await session.execute(stmt)
                 # Unpack scalar JSONB payload blocks directly cleanly
+                if raw:
+                    return [RawJSON(row) for row in result.scalars()]
                 return [row for row in result.scalars()]
         except SQLAlchemyError as e:
             logger.error(f"Failed extracting tenant query payload bounds natively: {e}")
@@ -155,8 +305,15 @@ class StorageService:
         limit: int = 100,
         offset: int = 0,
         sort: str = "desc",
+        cursor: str | None = None,
+        raw: bool = False,
     ):
-        """Production Query execution mapped organically blocking limits securely mapping complex nested objects."""
+        """Production Query execution mapped organically blocking limits securely mapping complex nested objects.
+
+        Returns a `Page`; pass its `next_cursor` back as `cursor` to continue. `offset`
+        is honoured only when no cursor is given, for pre-cursor clients. With `raw`,
+        payloads are undecoded RawJSON text.
+        """
         from sqlalchemy import select
 
         if not async_session_maker:
@@ -164,9 +321,12 @@ class StorageService:
                 "Database offline. Returning mocked simulated search arrays safely."
             )
             # Simulated offline boundaries testing logic directly
-            return [{"tenant_id": tenant_id, "mock": True}]
+            return Page([{"tenant_id": tenant_id, "mock": True}])
 
-        stmt = select(Event.payload).where(Event.tenant_id == tenant_id)
+        column = _raw_payload() if raw else Event.payload
+        stmt = select(column, Event.timestamp, Event.id).where(
+            Event.tenant_id == tenant_id
+        )
 
         # Apply strict query filters mappings naturally without hardcoding nested fields destructively
         if start_time:
@@ -181,22 +341,29 @@ class StorageService:
         if event_type:
             stmt = stmt.where(Event.payload["type"].astext == event_type)
 
-        # Sorting
-        if sort == "asc":
-            stmt = stmt.order_by(Event.timestamp.asc())
-        else:
-            stmt = stmt.order_by(Event.timestamp.desc())
+        # Keyset sorting over (timestamp, id)
+        scope = f"analytics:{tenant_id}:{sort}"
+        stmt = apply_keyset(
+            stmt, [Event.timestamp, Event.id], cursor, scope, descending=sort != "asc"
+        )
 
-        stmt = stmt.limit(limit).offset(offset)
+        stmt = stmt.limit(limit + 1)
+        if offset and not cursor:
+            stmt = stmt.offset(offset)
 
         try:
             async with async_session_maker() as session:
                 result = await session.execute(stmt)
+                rows, next_cursor = paginate(
+                    result.all(), limit, scope, key=lambda r: (r.timestamp, r.id)
+                )
                 # Unpack internal mapping objects
-                return [row for row in result.scalars()]
+                if raw:
+                    return Page([RawJSON(row.payload) for row in rows], next_cursor)
+                return Page([row.payload for row in rows], next_cursor)
         except SQLAlchemyError as e:
             logger.error(f"Failed extracting tenant query bounds dynamically: {e}")
-            return []
+            return Page()
 
     async def search_executions_by_query(
         self, tenant_id: str, query_str: str, limit: int = 50
@@ -296,37 +463,59 @@ class StorageService:
         return executions
 
     async def list_executions(
-        self, tenant_id: str, limit: int = 50, offset: int = 0, sort_desc: bool = True
+        self,
+        tenant_id: str,
+        limit: int = 50,
+        offset: int = 0,
+        sort_desc: bool = True,
+        cursor: str | None = None,
+        exact_total: bool = False,
     ) -> Dict[str, Any]:
-        """Paginated retrieval native over indexed lightweight tracker models efficiently."""
-        from sqlalchemy import select, func
+        """Paginated retrieval native over indexed lightweight tracker models efficiently.
+
+        Keyset-paginated over (created_at, id); `offset` only applies without a cursor.
+        `total` comes from the ingest-maintained counter unless `exact_total` forces count(*).
+        """
+        from sqlalchemy import select
 
         if not async_session_maker:
-            return {"executions": [], "total": 0}
+            return {
+                "executions": [],
+                "total": 0,
+                "total_exact": True,
+                "next_cursor": None,
+            }
+
+        # Invalid cursors raise before touching the database
+        scope = f"executions:{tenant_id}:{'desc' if sort_desc else 'asc'}"
+        stmt = apply_keyset(
+            select(ExecutionSummary).where(ExecutionSummary.tenant_id == tenant_id),
+            [ExecutionSummary.created_at, ExecutionSummary.id],
+            cursor,
+            scope,
+            descending=sort_desc,
+        ).limit(limit + 1)
+        if offset and not cursor:
+            stmt = stmt.offset(offset)
 
         try:
-            async with async_session_maker() as session:
-                # 1. Count total metric quickly against indexes
-                count_stmt = select(func.count(ExecutionSummary.id)).where(
-                    ExecutionSummary.tenant_id == tenant_id
-                )
-                total = await session.scalar(count_stmt) or 0
+            # 1. Total from the per-tenant counter instead of a count(*) per page
+            total = await total_counter.unfiltered_total(
+                tenant_id, "executions", ExecutionSummary, exact=exact_total
+            )
 
+            async with async_session_maker() as session:
                 # 2. Extract paginated slice gracefully
-                stmt = select(ExecutionSummary).where(
-                    ExecutionSummary.tenant_id == tenant_id
-                )
-
-                if sort_desc:
-                    stmt = stmt.order_by(ExecutionSummary.created_at.desc())
-                else:
-                    stmt = stmt.order_by(ExecutionSummary.created_at.asc())
-
-                stmt = stmt.limit(limit).offset(offset)
                 result = await session.execute(stmt)
+                summaries, next_cursor = paginate(
+                    result.scalars().all(),
+                    limit,
+                    scope,
+                    key=lambda summary: (summary.created_at, summary.id),
+                )
 
                 executions = []
-                for summary in result.scalars():
+                for summary in summaries:
                     executions.append(
                         {
                             "id": summary.id,
@@ -338,7 +527,12 @@ class StorageService:
                         }
                     )
 
-                return {"executions": executions, "total": total}
+                return {
+                    "executions": executions,
+                    "total": total.value,
+                    "total_exact": total.exact,
+                    "next_cursor": next_cursor,
+                }
 
         except SQLAlchemyError as e:
             logger.error(f"Failed extracting indexed executions pagination: {e}")
@@ -347,48 +541,71 @@ class StorageService:
                 f"Unexpected error extracting indexed executions pagination: {e}"
             )
 
-        return {"executions": [], "total": 0}
+        return {
+            "executions": [],
+            "total": 0,
+            "total_exact": True,
+            "next_cursor": None,
+        }
 
     async def list_incidents(
-        self, tenant_id: str, limit: int = 50, offset: int = 0
+        self,
+        tenant_id: str,
+        limit: int = 50,
+        offset: int = 0,
+        cursor: str | None = None,
     ) -> List[Dict[str, Any]]:
-        """Fetch strictly isolated incidents sorted newest first natively."""
+        """Fetch strictly isolated incidents sorted newest first natively.
+
+        Returns a `Page` keyset-paginated over (timestamp, id).
+        """
         from sqlalchemy import select
         from app.models.event import Incident
 
         if not async_session_maker:
-            return []
+            return Page()
+
+        scope = f"incidents:{tenant_id}"
+        stmt = apply_keyset(
+            select(Incident).where(Incident.tenant_id == tenant_id),
+            [Incident.timestamp, Incident.id],
+            cursor,
+            scope,
+        ).limit(limit + 1)
+        if offset and not cursor:
+            stmt = stmt.offset(offset)
 
         try:
             async with async_session_maker() as session:
-                stmt = (
-                    select(Incident)
-                    .where(Incident.tenant_id == tenant_id)
-                    .order_by(Incident.timestamp.desc())
-                    .limit(limit)
-                    .offset(offset)
-                )
                 result = await session.execute(stmt)
-                incidents = result.scalars().all()
+                incidents, next_cursor = paginate(
+                    result.scalars().all(),
+                    limit,
+                    scope,
+                    key=lambda inc: (inc.timestamp, inc.id),
+                )
 
-                return [
-                    {
-                        "id": str(inc.id),
-                        "tenant_id": inc.tenant_id,
-                        "execution_id": inc.execution_id,
-                        "timestamp": inc.timestamp,
-                        "failure_type": inc.failure_type,
-                        "node_name": inc.node_name,
-                        "summary": inc.summary,
-                    }
-                    for inc in incidents
-                ]
+                return Page(
+                    [
+                        {
+                            "id": str(inc.id),
+                            "tenant_id": inc.tenant_id,
+                            "execution_id": inc.execution_id,
+                            "timestamp": inc.timestamp,
+                            "failure_type": inc.failure_type,
+                            "node_name": inc.node_name,
+                            "summary": inc.summary,
+                        }
+                        for inc in incidents
+                    ],
+                    next_cursor,
+                )
         except SQLAlchemyError as e:
             logger.error(f"Failed extracting incidents natively: {e}")
         except Exception as e:
             logger.error(f"Unexpected error validating incidents: {e}")
 
-        return []
+        return Page()
 
     async def create_alert_rule(
         self,
@@ -567,25 +784,43 @@ class StorageService:
         if not async_session_maker:
             return None
 
-        # Optimization: filter query by looking at JSONB directly if possible, or scan bounds
+        cached = graph_cache.get(tenant_id, execution_id)
+        if cached is not None:
+            return cached
+        epoch = graph_cache.epoch
+
+        # Single-row probe on ix_events_tenant_execution, newest event first
+        key = execution_key(Event.payload)
+        match = key == execution_id
+        try:
+            # Payloads carrying neither key are addressed by the event's own id
+            match = or_(match, and_(key.is_(None), Event.id == uuid.UUID(execution_id)))
+        except ValueError:
+            pass
         stmt = (
-            select(Event)
-            .where(Event.tenant_id == tenant_id)
+            select(Event.payload)
+            .where(Event.tenant_id == tenant_id, match)
             .order_by(Event.timestamp.desc())
-            .limit(100)
+            .limit(1)
         )
         try:
             async with async_session_maker() as session:
-                result = await session.execute(stmt)
-                for event in result.scalars():
-                    payload = event.payload or {}
-                    exec_id = (
-                        payload.get("execution_id")
-                        or payload.get("id")
-                        or str(event.id)
-                    )
-                    if exec_id == execution_id:
-                        return payload
+                payload = (await session.execute(stmt)).scalar_one_or_none()
+
+            if payload is None and cold_store.enabled:
+                # Executions already tiered out of Postgres live in cold segments
+                cold = await cold_store.scan_events(
+                    tenant_id,
+                    equals={"execution_id": execution_id},
+                    limit=1,
+                    descending=True,
+                )
+                if cold:
+                    payload = cold[0].payload
+
+            if payload is not None:
+                graph_cache.put(tenant_id, execution_id, payload, epoch)
+                return payload
         except SQLAlchemyError as e:
             logger.error(f"Failed extracting single execution: {e}")
         except Exception as e:
@@ -1,11 +1,21 @@
 import asyncio
 import logging
 import json
+import time
 from typing import Dict, Any, Optional
 from fastapi import WebSocket
 
+from app.core.metrics import (
+    queue_depth,
+    stream_dropped_messages,
+    stream_fanout_lag_seconds,
+)
+
 logger = logging.getLogger("temporallayr.stream")
 
+_fanout_lag = stream_fanout_lag_seconds.labels("subscribe")
+_dropped = stream_dropped_messages.labels("subscribe")
+
 
 class StreamManager:
     """
@@ -20,7 +30,8 @@ class StreamManager:
     async def subscribe(self, websocket: WebSocket, tenant_id: str, filters: dict):
         """Bind connection queues internally allocating overflow handlers."""
 
-        # Max backlog cap = 1000 dynamically protecting memory per subscriber
+        # Max backlog cap = 1000 dynamically protecting memory per subscriber;
+        # items are (queued_at, event) so the pump can measure fan-out lag
         queue = asyncio.Queue(maxsize=1000)
 
         task = asyncio.create_task(self._process_queue_for_subscriber(websocket, queue))
@@ -72,9 +83,10 @@ class StreamManager:
         """Isolated pump draining messages into subscriber safely avoiding blocking the overarching publish function."""
         try:
             while websocket in self.active_connections:
-                item = await queue.get()
+                queued_at, item = await queue.get()
                 try:
                     await websocket.send_json(item)
+                    _fanout_lag.observe(time.monotonic() - queued_at)
                 except Exception:
                     # Network IO fault isolates socket disconnect safely
                     await self.unsubscribe(websocket)
@@ -93,6 +105,7 @@ class StreamManager:
 
         broadcast_count = 0
         dead_sockets = []
+        queued_at = time.monotonic()
 
         for ws, conn_data in self.active_connections.items():
             if conn_data["tenant_id"] != tenant_id:
@@ -114,12 +127,13 @@ class StreamManager:
                 # Rate limit drop mechanism enforcing safety
                 try:
                     queue.get_nowait()  # Drop oldest explicitly
+                    _dropped.inc()
                     logger.warning("[STREAM] subscriber overflow handled")
                 except asyncio.QueueEmpty:
                     pass
 
             try:
-                queue.put_nowait(event)
+                queue.put_nowait((queued_at, event))
                 broadcast_count += 1
             except asyncio.QueueFull:
                 pass
@@ -130,3 +144,7 @@ class StreamManager:
 
 # Singleton mapping dynamic connections broadly across ingestion systems
 stream_manager = StreamManager()
+queue_depth.track(
+    ["stream_subscribe"],
+    lambda: sum(c["queue"].qsize() for c in stream_manager.active_connections.values()),
+)
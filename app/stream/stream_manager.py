@@ -1,10 +1,21 @@
 import asyncio
 import logging
+import time
 from typing import Dict, List, Any
 from fastapi import WebSocket
 
+from app.core.metrics import (
+    queue_depth,
+    stream_dropped_messages,
+    stream_fanout_lag_seconds,
+)
+from app.core.profiling import timed
+
 logger = logging.getLogger("temporallayr.stream.manager")
 
+_fanout_lag = stream_fanout_lag_seconds.labels("live")
+_dropped = stream_dropped_messages.labels("live")
+
 
 class StreamManager:
     """Enterprise StreamManager V2 dynamically bounding 100 msg/sec topologies natively."""
@@ -12,7 +23,7 @@ class StreamManager:
     def __init__(self):
         # tenant_id -> list of active connections
         self._clients: Dict[str, List[WebSocket]] = {}
-        # WebSocket -> execution queue bound securely (limit 100)
+        # WebSocket -> execution queue bound securely (limit 100) of (queued_at, event)
         self._client_queues: Dict[WebSocket, asyncio.Queue] = {}
         # WebSocket -> active sender task
         self._client_tasks: Dict[WebSocket, asyncio.Task] = {}
@@ -56,6 +67,7 @@ class StreamManager:
 
         logger.info("[STREAM] client disconnected")
 
+    @timed("broadcast_event")
     async def broadcast_event(self, tenant_id: str, event: Dict[str, Any]):
         """Publish cleanly mapped JSON structures into multitenant bounds safely."""
         sockets = self._clients.get(tenant_id, [])
@@ -63,6 +75,7 @@ class StreamManager:
             return
 
         broadcast_count = 0
+        queued_at = time.monotonic()
         for ws in sockets:
             queue = self._client_queues.get(ws)
             if not queue:
@@ -72,6 +85,7 @@ class StreamManager:
             if queue.full():
                 try:
                     queue.get_nowait()
+                    _dropped.inc()
                     logger.warning(
                         "[STREAM] rate limit exceeded! Dropped oldest bounded trace proactively."
                     )
@@ -79,7 +93,7 @@ class StreamManager:
                     pass
 
             try:
-                queue.put_nowait(event)
+                queue.put_nowait((queued_at, event))
                 broadcast_count += 1
             except asyncio.QueueFull:
                 pass
@@ -91,8 +105,9 @@ class StreamManager:
         """Dynamically isolate delivery resolving I/O blocking gracefully natively."""
         try:
             while True:
-                event = await queue.get()
+                queued_at, event = await queue.get()
                 await websocket.send_json(event)
+                _fanout_lag.observe(time.monotonic() - queued_at)
         except asyncio.CancelledError:
             pass
         except Exception as e:
@@ -103,3 +118,7 @@ class StreamManager:
 
 
 stream_manager_v2 = StreamManager()
+queue_depth.track(
+    ["stream_live"],
+    lambda: sum(q.qsize() for q in stream_manager_v2._client_queues.values()),
+)
@@ -0,0 +1,41 @@
+import asyncio
+import sys
+import time
+
+import httpx
+
+
+async def run_export_bench(resource: str = "events"):
+    url = f"http://localhost:8000/v1/export/{resource}"
+    headers = {
+        "X-API-Key": "demo-key",
+        "X-Tenant-ID": "demo-tenant",
+    }
+
+    async with httpx.AsyncClient(timeout=None) as client:
+        for fmt in ("ndjson", "csv", "arrow"):
+            print(f"\n--- Exporting {resource} as {fmt} ---")
+            start = time.perf_counter()
+            total_bytes = 0
+            lines = 0
+            async with client.stream(
+                "GET", url, headers=headers, params={"format": fmt}
+            ) as resp:
+                if resp.status_code != 200:
+                    print(f"Response ({resp.status_code}): {await resp.aread()}")
+                    continue
+                async for chunk in resp.aiter_bytes():
+                    total_bytes += len(chunk)
+                    lines += chunk.count(b"\n")
+            elapsed = time.perf_counter() - start
+
+            # Arrow is binary, so only the text formats report a row rate
+            rows = {"ndjson": lines, "csv": lines - 1}.get(fmt)
+            mb = total_bytes / 1e6
+            print(f"{mb:.1f} MB in {elapsed:.2f}s -> {mb / elapsed:.1f} MB/s")
+            if rows is not None:
+                print(f"{rows} rows -> {rows / elapsed:.0f} rows/s")
+
+
+if __name__ == "__main__":
+    asyncio.run(run_export_bench(*sys.argv[1:]))
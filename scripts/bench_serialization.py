@@ -0,0 +1,158 @@
+import json
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.core.raw_json import RawJSON, encode_object
+from app.core.responses import _orjson, dumps
+from app.models.dashboard_api import ResponseMeta, StandardDashboardResponse
+from app.schemas.execution import ExecutionEventResponse
+from app.schemas.query import QueryResponse
+
+FIELDS = tuple(ExecutionEventResponse.model_fields)
+
+
+def _rows(n: int, seed: int = 0):
+    # Seeded ids and a fixed clock, so every run encodes the same bytes
+    rng = random.Random(seed)
+    now = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    rows = [
+        SimpleNamespace(
+            id=uuid.UUID(int=rng.getrandbits(128), version=4),
+            tenant_id="demo-tenant",
+            timestamp=now - timedelta(seconds=i),
+            event_type="execution",
+            payload={
+                "function": f"fn_{i % 50}",
+                "args": {"user_id": i, "tags": ["a", "b", "c"]},
+                "message": "x" * 64,
+                "duration": i * 0.25,
+            },
+            function_name=f"fn_{i % 50}",
+            latency_ms=i % 900,
+            status="success" if i % 7 else "error",
+        )
+        for i in range(n)
+    ]
+    for row in rows:
+        # What Postgres hands back for payload::text
+        row.payload_text = json.dumps(row.payload)
+    return rows
+
+
+def _query_before(rows):
+    adapter = TypeAdapter(QueryResponse)
+    result = QueryResponse(
+        items=[ExecutionEventResponse.model_validate(r) for r in rows],
+        total=len(rows),
+    )
+    return adapter.dump_json(adapter.validate_python(result))
+
+
+def _query_after(rows):
+    items = [{f: getattr(r, f) for f in FIELDS} for r in rows]
+    return dumps({"items": items, "total": len(rows), "total_exact": True}, utc_z=True)
+
+
+def _search_before(rows):
+    adapter = TypeAdapter(StandardDashboardResponse)
+    data = [
+        {
+            "id": str(r.id),
+            "timestamp": r.timestamp.isoformat(),
+            "payload": json.loads(r.payload_text),
+        }
+        for r in rows
+    ]
+    result = StandardDashboardResponse(data=data, meta=ResponseMeta(query_ms=0.0))
+    return adapter.dump_json(adapter.validate_python(result))
+
+
+def _search_after(rows):
+    return ",".join(
+        encode_object(
+            {
+                "id": str(r.id),
+                "timestamp": r.timestamp.isoformat(),
+                "payload": RawJSON(r.payload_text),
+            }
+        )
+        for r in rows
+    )
+
+
+def _buckets(rows):
+    return [
+        {"time_bucket": r.timestamp.isoformat(), "count": r.latency_ms} for r in rows
+    ]
+
+
+def _aggregation_before(rows):
+    adapter = TypeAdapter(StandardDashboardResponse)
+    result = StandardDashboardResponse(
+        data=_buckets(rows), meta=ResponseMeta(query_ms=0.0)
+    )
+    return adapter.dump_json(adapter.validate_python(result))
+
+
+def _aggregation_after(rows):
+    data = _buckets(rows)
+    return dumps({"ok": True, "data": data, "meta": {"query_ms": 0.0}})
+
+
+def _run_payload(rows):
+    items = [{f: getattr(r, f) for f in FIELDS if f != "tenant_id"} for r in rows[:500]]
+    return {
+        "dashboard_id": "bench",
+        "panels": [
+            {"panel_id": str(p), "name": f"panel {p}", "data": items}
+            for p in range(len(rows) // 500 or 1)
+        ],
+    }
+
+
+def _run_before(rows):
+    return json.dumps(jsonable_encoder(_run_payload(rows))).encode()
+
+
+def _run_after(rows):
+    return dumps(_run_payload(rows))
+
+
+# (endpoint, encoder before, encoder after)
+ENDPOINTS = (
+    ("POST /v1/query", _query_before, _query_after),
+    ("POST /v1/dashboard/search", _search_before, _search_after),
+    ("POST /v1/dashboard/query", _aggregation_before, _aggregation_after),
+    ("GET /v1/dashboard/{id}/run", _run_before, _run_after),
+)
+
+
+def _timed(f, rows, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        f(rows)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def run_serialization_bench(n: int = 5000, repeat: int = 5):
+    rows = _rows(n)
+    encoder = "orjson" if _orjson() is not None else "stdlib json"
+    print(f"{n} rows, best of {repeat}, encoder: {encoder}\n")
+    print(f"{'endpoint':<32}{'before ms':>12}{'after ms':>12}{'speedup':>10}")
+    for endpoint, before, after in ENDPOINTS:
+        b = _timed(before, rows, repeat)
+        a = _timed(after, rows, repeat)
+        print(f"{endpoint:<32}{b:>12.1f}{a:>12.1f}{b / a:>9.1f}x")
+
+
+if __name__ == "__main__":
+    run_serialization_bench(*(int(arg) for arg in sys.argv[1:]))
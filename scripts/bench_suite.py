@@ -0,0 +1,631 @@
+"""End-to-end benchmark suite: the app in-process against a throwaway Postgres.
+
+    python -m scripts.bench_suite [--scale 1] [--out results.json] [--compare base.json]
+
+Scenarios: ingest throughput on both ingest paths (POST /v1/ingest and
+IngestionService), latency of each QueryEngine resource and of POST
+/v1/query, timeseries aggregation, dashboard runs, stream fan-out,
+GET /v1/export throughput per resource and format, and response encoding
+before and after the serialization fast paths.
+Each reports p50/p95/p99 latency and throughput; the JSON result also
+records the environment so runs on different machines are not mixed up.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+from scripts.workload import WorkloadGenerator
+
+SCENARIOS = (
+    "ingest_service",
+    "ingest_api",
+    "query",
+    "timeseries",
+    "dashboard",
+    "stream_fanout",
+    "export",
+    "serialization",
+)
+HEADERS = {"X-API-Key": "demo-key", "X-Tenant-ID": "demo-tenant"}
+
+
+def _pgserver():
+    try:
+        import pgserver  # optional: pip-installable Postgres, also runs as root
+
+        return pgserver
+    except ImportError:
+        return None
+
+
+@contextmanager
+def disposable_postgres() -> Iterator[str]:
+    """A fresh cluster in a temp dir for the run; yields its asyncpg URL."""
+    pgdata = tempfile.mkdtemp(prefix="temporallayr-bench-")
+    pgserver = _pgserver()
+    if pgserver is not None:
+        server = pgserver.get_server(pgdata, cleanup_mode="delete")
+        try:
+            yield server.get_uri().replace("postgresql://", "postgresql+asyncpg://", 1)
+        finally:
+            server.cleanup()
+        return
+
+    initdb, pg_ctl = shutil.which("initdb"), shutil.which("pg_ctl")
+    if not initdb or not pg_ctl:
+        shutil.rmtree(pgdata, ignore_errors=True)
+        raise SystemExit(
+            "initdb/pg_ctl not on PATH and pgserver not installed; pass --database-url"
+        )
+    subprocess.run(
+        [initdb, "-D", pgdata, "-U", "postgres", "--auth=trust"],
+        check=True,
+        stdout=subprocess.DEVNULL,
+    )
+    subprocess.run(
+        [
+            pg_ctl,
+            "-D",
+            pgdata,
+            "-o",
+            f"-h '' -k {pgdata}",
+            "-l",
+            os.path.join(pgdata, "server.log"),
+            "-w",
+            "start",
+        ],
+        check=True,
+        stdout=subprocess.DEVNULL,
+    )
+    try:
+        yield f"postgresql+asyncpg://postgres@/postgres?host={pgdata}"
+    finally:
+        subprocess.run(
+            [pg_ctl, "-D", pgdata, "-m", "fast", "-w", "stop"],
+            stdout=subprocess.DEVNULL,
+        )
+        shutil.rmtree(pgdata, ignore_errors=True)
+
+
+def summarize(
+    latencies: List[float], elapsed: float, items: Optional[int] = None
+) -> Dict[str, Any]:
+    """Nearest-rank percentiles in ms; throughput is items (default: samples) per second."""
+    ordered = sorted(latencies)
+
+    def pct(q: float) -> Optional[float]:
+        if not ordered:
+            return None
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 3)
+
+    count = len(ordered) if items is None else items
+    return {
+        "samples": len(ordered),
+        "items": count,
+        "seconds": round(elapsed, 3),
+        "throughput_per_s": round(count / elapsed, 1) if elapsed > 0 else None,
+        "p50_ms": pct(0.50),
+        "p95_ms": pct(0.95),
+        "p99_ms": pct(0.99),
+        "max_ms": round(ordered[-1] * 1000, 3) if ordered else None,
+    }
+
+
+def _workload(n: int, seed: int) -> List[Dict[str, Any]]:
+    """`n` seeded execution graphs spread over the last half hour."""
+    generator = WorkloadGenerator(
+        seed=seed, tenants=1, start=time.time() - 1800, span_seconds=1800
+    )
+    return [item["event"] for item in generator.stream(n)]
+
+
+async def _wait_for(predicate, timeout: float) -> bool:
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if await predicate():
+            return True
+        await asyncio.sleep(0.05)
+    return False
+
+
+async def _count(model, tenant_id: str) -> int:
+    from sqlalchemy import func, select
+
+    from app.core.database import async_session_maker
+
+    async with async_session_maker() as session:
+        result = await session.execute(
+            select(func.count()).select_from(model).where(model.tenant_id == tenant_id)
+        )
+        return result.scalar_one()
+
+
+async def bench_ingest_service(tenant: str, n: int, seed: int) -> Dict[str, Any]:
+    """IngestionService.enqueue to committed rows in `events`."""
+    from app.models.event import Event
+    from app.services.ingestion_service import IngestionService
+
+    events = _workload(n, seed)
+    service = IngestionService(max_batch_size=500, flush_interval=0.2)
+    await service.start()
+    latencies = []
+    start = time.perf_counter()
+    for offset in range(0, n, 100):
+        batch = events[offset : offset + 100]
+        t = time.perf_counter()
+        await service.enqueue(tenant, batch)
+        latencies.append(time.perf_counter() - t)
+
+    async def committed():
+        return await _count(Event, tenant) >= n
+
+    done = await _wait_for(committed, timeout=60 + n / 50)
+    elapsed = time.perf_counter() - start
+    await service.stop()
+    return {**summarize(latencies, elapsed, n), "complete": done}
+
+
+async def bench_ingest_api(client, tenant: str, n: int, seed: int) -> Dict[str, Any]:
+    """POST /v1/ingest to rows committed by the background ingestion worker."""
+    from app.models.execution import ExecutionEvent
+
+    # The endpoint is keyed by the auth tenant, which may already hold rows
+    baseline = await _count(ExecutionEvent, tenant)
+    events = _workload(n, seed)
+    latencies = []
+    start = time.perf_counter()
+    for offset in range(0, n, 100):
+        body = [
+            {
+                "tenant_id": tenant,
+                "event_type": "execution",
+                "payload": event,
+                "function_name": event["function_name"],
+                "latency_ms": int(event["metrics"]["duration_ms"]),
+                "status": event["status"].lower(),
+            }
+            for event in events[offset : offset + 100]
+        ]
+        t = time.perf_counter()
+        r = await client.post("/v1/ingest", json=body, headers=HEADERS)
+        latencies.append(time.perf_counter() - t)
+        r.raise_for_status()
+
+    async def committed():
+        return await _count(ExecutionEvent, tenant) >= baseline + n
+
+    done = await _wait_for(committed, timeout=60 + n / 50)
+    return {**summarize(latencies, time.perf_counter() - start, n), "complete": done}
+
+
+async def _repeat(call, repeat: int) -> Dict[str, Any]:
+    # One untimed call first, so imports and cold caches stay out of p99
+    await call()
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(repeat):
+        t = time.perf_counter()
+        await call()
+        latencies.append(time.perf_counter() - t)
+    return summarize(latencies, time.perf_counter() - start)
+
+
+async def bench_query(client, tenant: str, repeat: int) -> Dict[str, Any]:
+    """Each QueryEngine resource, plus POST /v1/query over the ingest_api rows."""
+    from app.query.engine import query_engine
+    from app.query.models import MultiResourceQueryRequest
+
+    results = {}
+    for resource in ("events", "incidents", "nodes", "clusters"):
+        search = getattr(query_engine, f"search_{resource}")
+        request = MultiResourceQueryRequest(tenant_id=tenant, limit=100)
+        results[resource] = await _repeat(
+            lambda search=search, request=request: search(request), repeat
+        )
+
+    async def api_query():
+        r = await client.post("/v1/query", json={"limit": 100}, headers=HEADERS)
+        r.raise_for_status()
+
+    results["api"] = await _repeat(api_query, repeat)
+    return results
+
+
+async def bench_timeseries(tenant: str, repeat: int) -> Dict[str, Any]:
+    from app.query.timeseries import aggregate_timeseries
+
+    end = datetime.now(timezone.utc) + timedelta(minutes=1)
+    start = end - timedelta(hours=2)
+    results = {}
+    for metric in ("execution_count", "latency_p95"):
+        results[metric] = await _repeat(
+            lambda metric=metric: aggregate_timeseries(tenant, start, end, 60, metric),
+            repeat,
+        )
+    return results
+
+
+async def bench_dashboard(tenant: str, repeat: int, panels: int = 4) -> Dict[str, Any]:
+    from app.dashboard.service import dashboard_service
+    from app.query.runtime import execute_dashboard
+
+    dashboard = await dashboard_service.create_dashboard(tenant, "bench")
+    end = datetime.now(timezone.utc) + timedelta(minutes=1)
+    for p in range(panels):
+        saved = await dashboard_service.create_saved_query(
+            tenant,
+            f"panel {p}",
+            {
+                "type": "timeseries",
+                "metric": ("execution_count", "error_rate", "latency_avg")[p % 3],
+                "interval_seconds": 300,
+                "start_time": (end - timedelta(hours=2)).isoformat(),
+                "end_time": end.isoformat(),
+            },
+        )
+        await dashboard_service.add_panel_to_dashboard(
+            tenant, str(dashboard.id), str(saved.id), f"panel {p}", 0, p, 6, 4
+        )
+
+    errors = 0
+
+    async def run():
+        nonlocal errors
+        result = await execute_dashboard(str(dashboard.id), tenant)
+        errors += sum(1 for panel in result["panels"] if panel.get("error"))
+
+    return {**await _repeat(run, repeat), "panels": panels, "panel_errors": errors}
+
+
+class _BenchSocket:
+    """Stands in for a WebSocket: records broadcast-to-send latency."""
+
+    def __init__(self, latencies: List[float]):
+        self.latencies = latencies
+
+    async def accept(self):
+        pass
+
+    async def send_json(self, data):
+        self.latencies.append(time.perf_counter() - data["sent_at"])
+
+
+async def bench_stream_fanout(
+    tenant: str, subscribers: int, messages: int
+) -> Dict[str, Any]:
+    """StreamManager broadcast to every subscriber's sender loop and send_json."""
+    from app.stream.stream_manager import StreamManager
+
+    manager = StreamManager()
+    latencies: List[float] = []
+    sockets = [_BenchSocket(latencies) for _ in range(subscribers)]
+    for ws in sockets:
+        await manager.register_client(tenant, ws)
+
+    expected = subscribers * messages
+    start = time.perf_counter()
+    for i in range(messages):
+        await manager.broadcast_event(
+            tenant, {"seq": i, "sent_at": time.perf_counter()}
+        )
+        # Yield so sender loops drain as they would between ingest flushes
+        await asyncio.sleep(0)
+
+    async def delivered():
+        return len(latencies) >= expected
+
+    await _wait_for(delivered, timeout=30)
+    elapsed = time.perf_counter() - start
+    for ws in sockets:
+        await manager.remove_client(ws)
+    return {
+        **summarize(latencies, elapsed),
+        "subscribers": subscribers,
+        "messages": messages,
+        "dropped": expected - len(latencies),
+    }
+
+
+async def bench_export(
+    client, tenant: str, n: int, seed: int, repeat: int
+) -> Dict[str, Any]:
+    """GET /v1/export/{resource} streamed to the end, per resource and format."""
+    from app.query.export import EXPORT_FORMATS
+    from app.services.storage_service import StorageService
+
+    # Exports read the auth tenant, so its rows are loaded through the storage path
+    events = _workload(n, seed)
+    storage = StorageService()
+    for offset in range(0, n, 500):
+        await storage.bulk_insert_events(
+            [{"tenant_id": tenant, "event": e} for e in events[offset : offset + 500]]
+        )
+    try:
+        import pyarrow  # noqa: F401
+
+        formats = list(EXPORT_FORMATS)
+    except ImportError:
+        formats = [f for f in EXPORT_FORMATS if f != "arrow"]
+
+    results: Dict[str, Any] = {}
+    for resource in ("events", "executions"):
+        for fmt in formats:
+
+            async def export(resource=resource, fmt=fmt) -> bytes:
+                chunks = []
+                async with client.stream(
+                    "GET",
+                    f"/v1/export/{resource}",
+                    params={"format": fmt},
+                    headers=HEADERS,
+                ) as r:
+                    r.raise_for_status()
+                    async for chunk in r.aiter_bytes():
+                        chunks.append(chunk)
+                return b"".join(chunks)
+
+            # Untimed first run, which also sizes the export
+            body = await export()
+            rows = _export_rows(body, fmt)
+            latencies = []
+            start = time.perf_counter()
+            for _ in range(repeat):
+                t = time.perf_counter()
+                await export()
+                latencies.append(time.perf_counter() - t)
+            elapsed = time.perf_counter() - start
+            results[f"{resource}_{fmt}"] = {
+                **summarize(latencies, elapsed, rows * repeat),
+                "rows": rows,
+                "bytes": len(body),
+                "mb_per_s": round(len(body) * repeat / 1e6 / elapsed, 1),
+            }
+    return results
+
+
+async def bench_serialization(n: int, seed: int, repeat: int) -> Dict[str, Any]:
+    """Encoding `n` rows per endpoint, the pydantic path against the fast path."""
+    from scripts.bench_serialization import ENDPOINTS, _rows
+
+    rows = _rows(n, seed)
+    results: Dict[str, Any] = {}
+    for endpoint, before, after in ENDPOINTS:
+
+        async def encode_before(before=before):
+            before(rows)
+
+        async def encode_after(after=after):
+            after(rows)
+
+        old = await _repeat(encode_before, repeat)
+        new = await _repeat(encode_after, repeat)
+        results[endpoint] = {
+            "before": old,
+            "after": new,
+            "speedup_p50": round(old["p50_ms"] / new["p50_ms"], 2),
+            "rows": n,
+        }
+    return results
+
+
+def _export_rows(body: bytes, fmt: str) -> int:
+    if fmt == "arrow":
+        import pyarrow as pa
+
+        return pa.ipc.open_stream(body).read_all().num_rows
+    lines = body.count(b"\n")
+    return lines - 1 if fmt == "csv" else lines
+
+
+async def _environment(disposable: bool) -> Dict[str, Any]:
+    from sqlalchemy import text
+
+    from app.core.config import settings
+    from app.core.database import async_session_maker
+
+    async with async_session_maker() as session:
+        server = (await session.execute(text("SHOW server_version"))).scalar_one()
+
+    def installed(module: str) -> Optional[str]:
+        try:
+            return getattr(__import__(module), "__version__", "installed")
+        except ImportError:
+            return None
+
+    try:
+        git = await asyncio.create_subprocess_exec(
+            "git",
+            "rev-parse",
+            "--short",
+            "HEAD",
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+        out, _ = await git.communicate()
+        commit = out.decode().strip() if git.returncode == 0 else None
+    except OSError:
+        commit = None
+
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "postgres": server,
+        "database": "disposable" if disposable else "given",
+        "optional_packages": {
+            m: installed(m) for m in ("orjson", "numpy", "pyarrow", "uvloop", "yappi")
+        },
+        "settings": {
+            k: getattr(settings, k)
+            for k in (
+                "DB_POOL_SIZE",
+                "DB_MAX_OVERFLOW",
+                "QUERY_SCHEDULER_ENABLED",
+                "HOT_WINDOW_MINUTES",
+                "HOT_WINDOW_MAX_BYTES",
+                "GRAPH_CACHE_MAX_BYTES",
+                "METRICS_ENABLED",
+                "SELF_TRACE_ENABLED",
+            )
+        },
+    }
+
+
+async def run_suite(
+    scale: float, scenarios: List[str], disposable: bool, seed: int = 0
+) -> Dict[str, Any]:
+    from httpx import ASGITransport, AsyncClient
+
+    from app.main import app
+
+    # The dashboard router is not mounted, so register its tables before the
+    # lifespan creates the schema
+    from app.dashboard import models as dashboard_models  # noqa: F401
+
+    n = max(100, int(1000 * scale))
+    repeat = max(5, int(50 * scale))
+    run = uuid.uuid4().hex[:8]
+    service_tenant, api_tenant = f"bench-{run}", "demo-tenant"
+    results: Dict[str, Any] = {}
+
+    async with app.router.lifespan_context(app):
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://bench", timeout=60
+        ) as client:
+            environment = await _environment(disposable)
+            # Query scenarios read what the ingest scenarios wrote
+            if "ingest_service" in scenarios or "query" in scenarios:
+                results["ingest_service"] = await bench_ingest_service(
+                    service_tenant, n, seed
+                )
+            if "ingest_api" in scenarios or "query" in scenarios:
+                results["ingest_api"] = await bench_ingest_api(
+                    client, api_tenant, n, seed + 1
+                )
+            if "query" in scenarios:
+                results["query"] = await bench_query(client, service_tenant, repeat)
+            if "timeseries" in scenarios:
+                results["timeseries"] = await bench_timeseries(service_tenant, repeat)
+            if "dashboard" in scenarios:
+                results["dashboard"] = await bench_dashboard(
+                    service_tenant, max(5, repeat // 5)
+                )
+            if "stream_fanout" in scenarios:
+                results["stream_fanout"] = await bench_stream_fanout(
+                    service_tenant, 100, max(50, int(200 * scale))
+                )
+            if "export" in scenarios:
+                results["export"] = await bench_export(
+                    client,
+                    api_tenant,
+                    max(1000, int(10000 * scale)),
+                    seed + 2,
+                    max(3, repeat // 10),
+                )
+            if "serialization" in scenarios:
+                results["serialization"] = await bench_serialization(
+                    max(1000, int(5000 * scale)), seed, max(5, repeat // 5)
+                )
+
+    return {
+        "environment": {**environment, "scale": scale, "seed": seed},
+        "scenarios": results,
+    }
+
+
+def _flatten(results: Dict[str, Any], prefix: str = "") -> Dict[str, Dict[str, Any]]:
+    """Scenario path -> summary, e.g. "query.events"."""
+    flat = {}
+    for name, value in results.items():
+        if isinstance(value, dict) and "p50_ms" in value:
+            flat[prefix + name] = value
+        elif isinstance(value, dict):
+            flat.update(_flatten(value, f"{prefix}{name}."))
+    return flat
+
+
+def compare(base: Dict[str, Any], current: Dict[str, Any]) -> None:
+    """p50/p99 and throughput of `current` relative to `base`, per scenario."""
+    old, new = _flatten(base["scenarios"]), _flatten(current["scenarios"])
+    print(
+        f"{'scenario':<28}{'p50 ms':>18}{'p99 ms':>18}{'throughput/s':>22}"
+        f"\n{'':<28}{'base -> now':>18}{'base -> now':>18}{'base -> now':>22}"
+    )
+    for name in sorted(new):
+        if name not in old:
+            continue
+        cells = []
+        for key, width in (("p50_ms", 18), ("p99_ms", 18), ("throughput_per_s", 22)):
+            a, b = old[name].get(key), new[name].get(key)
+            cells.append(
+                f"  {a} -> {b}".rjust(width) if a is not None else "-".rjust(width)
+            )
+        print(f"{name:<28}{''.join(cells)}")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--scale", type=float, default=1.0, help="Multiplies data volume and repeats"
+    )
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--seed", type=int, default=0, help="Workload generator seed")
+    parser.add_argument(
+        "--database-url", help="Use this database instead of a disposable one"
+    )
+    parser.add_argument(
+        "--out", help="Result JSON path (default bench-results/<utc time>.json)"
+    )
+    parser.add_argument("--compare", help="Earlier result JSON to compare against")
+    args = parser.parse_args(argv)
+
+    scenarios = [s for s in args.scenarios.split(",") if s]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    # The app reads these at import time
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    os.environ.setdefault("API_KEY", "demo-key")
+    os.environ.setdefault("TENANT", "demo-tenant")
+
+    with (
+        nullcontext(args.database_url) if args.database_url else disposable_postgres()
+    ) as url:
+        os.environ["DATABASE_URL"] = url
+        result = asyncio.run(
+            run_suite(args.scale, scenarios, not args.database_url, args.seed)
+        )
+
+    out = args.out or os.path.join(
+        "bench-results", datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ") + ".json"
+    )
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(result, f, indent=2, default=str)
+    print(json.dumps(result["scenarios"], indent=2))
+    print(f"\nwrote {out}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), result)
+
+
+if __name__ == "__main__":
+    main()
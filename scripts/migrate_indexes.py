@@ -0,0 +1,77 @@
+"""Build the model indexes on existing tables without blocking writes.
+
+    python -m scripts.migrate_indexes [--dry-run]
+
+Startup only creates missing tables, so indexes added to a table that
+already exists are shipped here. Each one is built with CREATE INDEX
+CONCURRENTLY, and an invalid leftover from an interrupted build is rebuilt.
+Indexes that a wider one has superseded are dropped concurrently. Every
+statement is idempotent, so the script can be re-run after a failure.
+"""
+
+import argparse
+import asyncio
+from typing import List
+
+from sqlalchemy import text
+from sqlalchemy.schema import CreateIndex
+
+# Indexes replaced by a wider one under a new name
+SUPERSEDED_INDEXES = ("idx_events_tenant_time", "ix_execs_tenant_created")
+
+
+def _model_indexes() -> List:
+    from app.core.database import Base as CoreBase
+    from app.db.base import Base
+    import app.models.event  # noqa: F401 - registers the CoreBase tables
+    import app.models.execution  # noqa: F401 - registers the Base tables
+
+    return [
+        index
+        for metadata in (Base.metadata, CoreBase.metadata)
+        for table in metadata.sorted_tables
+        for index in sorted(table.indexes, key=lambda index: index.name)
+    ]
+
+
+async def migrate_indexes(dry_run: bool = False) -> List[str]:
+    """Run (or with `dry_run` only list) the statements; returns them in order."""
+    from app.core.database import maintenance_engine
+
+    if maintenance_engine is None:
+        raise SystemExit("DATABASE_URL is not configured")
+    # CONCURRENTLY refuses to run inside a transaction block
+    async with maintenance_engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        invalid = set(
+            await conn.scalars(
+                text(
+                    "SELECT c.relname FROM pg_index i "
+                    "JOIN pg_class c ON c.oid = i.indexrelid "
+                    "WHERE NOT i.indisvalid"
+                )
+            )
+        )
+        statements = []
+        for index in _model_indexes():
+            if index.name in invalid:
+                statements.append(f"DROP INDEX CONCURRENTLY IF EXISTS {index.name}")
+            index.dialect_options["postgresql"]["concurrently"] = True
+            ddl = CreateIndex(index, if_not_exists=True).compile(dialect=conn.dialect)
+            statements.append(str(ddl))
+        statements.extend(
+            f"DROP INDEX CONCURRENTLY IF EXISTS {name}" for name in SUPERSEDED_INDEXES
+        )
+        for statement in statements:
+            print(statement)
+            if not dry_run:
+                await conn.execute(text(statement))
+    return statements
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--dry-run", action="store_true", help="print the statements only"
+    )
+    asyncio.run(migrate_indexes(parser.parse_args().dry_run))
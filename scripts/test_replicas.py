@@ -0,0 +1,24 @@
+from app.core.replicas import replay_lag
+
+HISTORY = [(100.0, 100), (105.0, 200)]
+
+
+def test_lag_counts_from_last_sample_replayed():
+    # Replayed past t=100 but not t=105: everything since t=100 may be missing
+    assert replay_lag(HISTORY, 120, now=105.0) == 5.0
+
+
+def test_lag_behind_every_sample_is_history_age():
+    assert replay_lag(HISTORY, 50, now=110.0) == 10.0
+
+
+def test_lag_caught_up_is_age_of_newest_sample():
+    assert replay_lag(HISTORY, 200, now=105.0) == 0.0
+    assert replay_lag(HISTORY, 250, now=107.0) == 2.0
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"{name}: ok")
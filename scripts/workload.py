@@ -0,0 +1,482 @@
+"""Seeded synthetic execution-graph workload.
+
+    python -m scripts.workload generate --count 1000 > events.ndjson
+    python -m scripts.workload load --count 2000000 [--database-url ...]
+    python -m scripts.workload stream --rate 500 --duration 60 [--url http://localhost:8000]
+
+Graphs have the payload shapes the server reads: `nodes` (or, for a
+share of events, `graph.nodes`) with `parent_id` and `metadata.inputs`
+/ `metadata.output`, plus `status`, `metrics.duration_ms`, `cluster_id`
+and, on failures, `fingerprint`. Tenants are Zipf-skewed; fan-out is
+heavy-tailed, some graphs are deep chains, a few carry very large
+metadata blobs, and failed executions put an error with a traceback in
+one node's metadata, which is what the failure detector looks for. The
+same seed, count and --start give byte-identical output.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import itertools
+import json
+import math
+import os
+import random
+import sys
+import time
+import uuid
+from bisect import bisect
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+ERRORS = (
+    ("TimeoutError", "upstream call exceeded {n}ms deadline"),
+    ("ConnectionResetError", "connection reset by peer after {n} bytes"),
+    ("KeyError", "'field_{n}'"),
+    ("ValueError", "invalid literal for int() with base 10: 'v{n}'"),
+    ("RateLimitExceeded", "429 from provider, retry after {n}s"),
+)
+STEPS = (
+    "load",
+    "parse",
+    "validate",
+    "embed",
+    "retrieve",
+    "rank",
+    "prompt",
+    "llm_call",
+    "tool_call",
+    "postprocess",
+    "cache_lookup",
+    "write",
+)
+
+
+class WorkloadGenerator:
+    """Deterministic stream of `{"tenant_id", "event"}` items, as the ingest queue holds them.
+
+    Events are spread evenly over `span_seconds` starting at `start`, with
+    jitter. All randomness comes from one `random.Random(seed)`.
+    """
+
+    def __init__(
+        self,
+        seed: int = 0,
+        tenants: int = 50,
+        tenant_skew: float = 1.1,
+        functions: int = 40,
+        failure_rate: float = 0.03,
+        chain_rate: float = 0.05,
+        blob_rate: float = 0.002,
+        graph_rate: float = 0.05,
+        max_nodes: int = 400,
+        start: Optional[float] = None,
+        span_seconds: float = 86400.0,
+    ):
+        self.rng = random.Random(seed)
+        self.seed = seed
+        self.failure_rate = failure_rate
+        self.chain_rate = chain_rate
+        self.blob_rate = blob_rate
+        self.graph_rate = graph_rate
+        self.max_nodes = max_nodes
+        self.start = time.time() - span_seconds if start is None else start
+        self.span_seconds = span_seconds
+
+        self.tenants = [f"tenant-{i:04d}" for i in range(tenants)]
+        self._tenant_weights = list(
+            itertools.accumulate(
+                1 / (rank + 1) ** tenant_skew for rank in range(tenants)
+            )
+        )
+        self.functions = [
+            f"{STEPS[i % len(STEPS)]}_pipeline_{i}" for i in range(functions)
+        ]
+        # A function's usual steps: the same names recur, so node names are skewed too
+        self._steps = {
+            fn: self.rng.sample(STEPS, k=self.rng.randint(3, len(STEPS)))
+            for fn in self.functions
+        }
+
+    def _tenant(self) -> str:
+        return self.tenants[
+            bisect(self._tenant_weights, self.rng.random() * self._tenant_weights[-1])
+        ]
+
+    def _shape(self) -> List[int]:
+        """Parent index per node (-1 for the root)."""
+        rng = self.rng
+        if rng.random() < self.chain_rate:
+            depth = min(self.max_nodes, rng.randint(20, 200))
+            return [-1] + list(range(depth - 1))
+        size = min(self.max_nodes, int(rng.paretovariate(1.3) * 3))
+        # Squaring biases parents toward early nodes: a few wide hubs, many leaves
+        return [-1] + [int(i * rng.random() ** 2) for i in range(1, size)]
+
+    def _blob(self, nbytes: int) -> Dict[str, Any]:
+        return {
+            "rows": [
+                {"id": i, "text": self.rng.randbytes(48).hex()}
+                for i in range(nbytes // 120)
+            ]
+        }
+
+    def event(self, index: int, total: int) -> Dict[str, Any]:
+        rng = self.rng
+        tenant = self._tenant()
+        function_name = self.functions[
+            min(int(rng.expovariate(0.15)), len(self.functions) - 1)
+        ]
+        steps = self._steps[function_name]
+        started = (
+            self.start
+            + self.span_seconds * index / max(total, 1)
+            + rng.uniform(0, self.span_seconds / max(total, 1))
+        )
+
+        # Per-node draws use random() and gauss() directly: randint and
+        # lognormvariate cost several times more, over hundreds of nodes
+        uniform, gauss = rng.random, rng.gauss
+        nodes = []
+        for i, parent in enumerate(self._shape()):
+            name = (
+                function_name
+                if parent < 0
+                else steps[int(rng.expovariate(0.6)) % len(steps)]
+            )
+            node = {
+                "id": f"n{i}",
+                "name": name,
+                "start_time": started + i * 0.002,
+                "duration_ms": round(math.exp(gauss(2.5, 1.2)), 3),
+                "metadata": {
+                    "inputs": {"item": int(uniform() * 10_000), "step": name},
+                    "output": {"ok": True, "size": int(uniform() * 4096)},
+                },
+            }
+            if parent >= 0:
+                node["parent_id"] = f"n{parent}"
+            nodes.append(node)
+
+        if rng.random() < self.blob_rate:
+            rng.choice(nodes)["metadata"]["output"] = self._blob(
+                rng.randint(64_000, 1_000_000)
+            )
+
+        event = {
+            "execution_id": f"{self.seed:x}-{index:x}-{rng.getrandbits(32):08x}",
+            "function_name": function_name,
+            "status": "SUCCESS",
+            "cluster_id": f"{tenant}-c{min(int(rng.expovariate(0.5)), 9)}",
+            "metrics": {
+                "duration_ms": round(sum(n["duration_ms"] for n in nodes), 3),
+                "node_count": len(nodes),
+            },
+            "_ingested_at": datetime.fromtimestamp(started, timezone.utc).isoformat(),
+        }
+        if rng.random() < self.failure_rate:
+            # Deeper nodes fail more often than roots
+            node = nodes[len(nodes) - 1 - int(len(nodes) * rng.random() ** 3)]
+            kind, message = rng.choice(ERRORS)
+            message = message.format(n=rng.randint(1, 999))
+            node["metadata"]["output"] = None
+            node["metadata"]["error"] = {
+                "type": kind,
+                "message": message,
+                "traceback": (
+                    "Traceback (most recent call last):\n"
+                    f'  File "pipeline/{node["name"]}.py", line {rng.randint(10, 400)}, '
+                    f"in run\n{kind}: {message}"
+                ),
+            }
+            event["status"] = "FAILED"
+            event["fingerprint"] = hashlib.sha1(
+                f"{kind}:{node['name']}".encode()
+            ).hexdigest()[:16]
+
+        if rng.random() < self.graph_rate:
+            event["graph"] = {"nodes": nodes}
+        else:
+            event["nodes"] = nodes
+        return {"tenant_id": tenant, "event": event}
+
+    def stream(self, count: int) -> Iterator[Dict[str, Any]]:
+        for index in range(count):
+            yield self.event(index, count)
+
+    def batches(self, count: int, size: int) -> Iterator[List[Dict[str, Any]]]:
+        items = self.stream(count)
+        while batch := list(itertools.islice(items, size)):
+            yield batch
+
+
+def _progress(done: int, total: int, started: float) -> None:
+    elapsed = time.perf_counter() - started
+    print(
+        f"\r{done}/{total} events, {done / elapsed:,.0f}/s",
+        end="",
+        file=sys.stderr,
+    )
+
+
+async def _storage_batch(batch: List[Dict[str, Any]]) -> bool:
+    from app.services.storage_service import StorageService
+
+    # A fresh service per batch: its execution-id cache grows with every
+    # insert and scanning it would make a long load quadratic
+    return await StorageService(max_retries=3).bulk_insert_events(batch)
+
+
+async def _copy_batch(batch: List[Dict[str, Any]]) -> bool:
+    """COPY the events and their execution summaries in one transaction.
+
+    Skips everything else the ingest path derives (trace trees, digests,
+    incidents, sketches), which is what makes it fast enough for millions.
+    """
+    from app.core.database import maintenance_engine
+    from app.core.responses import dumps
+
+    events, summaries = [], {}
+    for item in batch:
+        tenant_id, event = item["tenant_id"], item["event"]
+        timestamp = datetime.fromisoformat(event["_ingested_at"])
+        events.append(
+            (
+                uuid.uuid4(),
+                tenant_id,
+                "execution_graph",
+                timestamp,
+                dumps(event).decode(),
+            )
+        )
+        # Same node_count rule as bulk_insert_events: top-level nodes only
+        nodes = event.get("nodes", [])
+        summaries[event["execution_id"]] = (
+            event["execution_id"],
+            tenant_id,
+            timestamp,
+            len(nodes) if isinstance(nodes, list) else 1,
+        )
+
+    # A COPY of a batch holding multi-MB blobs outlasts the serving timeout
+    async with maintenance_engine.connect() as conn:
+        raw = (await conn.get_raw_connection()).driver_connection
+        async with raw.transaction():
+            await raw.copy_records_to_table(
+                "events",
+                records=events,
+                columns=("id", "tenant_id", "event_type", "timestamp", "payload"),
+            )
+            # Summaries go through a staging table, so a reloaded seed skips
+            # executions it already wrote instead of failing the batch
+            await raw.execute(
+                "CREATE TEMP TABLE IF NOT EXISTS load_summaries "
+                "(LIKE execution_summaries) ON COMMIT DELETE ROWS"
+            )
+            await raw.copy_records_to_table(
+                "load_summaries",
+                records=list(summaries.values()),
+                columns=("id", "tenant_id", "created_at", "node_count"),
+            )
+            await raw.execute(
+                "INSERT INTO execution_summaries (id, tenant_id, created_at, node_count) "
+                "SELECT id, tenant_id, created_at, node_count FROM load_summaries "
+                "ON CONFLICT (id) DO NOTHING"
+            )
+    return True
+
+
+async def load(
+    generator: WorkloadGenerator,
+    count: int,
+    batch_size: int,
+    method: str = "copy",
+    concurrency: int = 4,
+) -> int:
+    """Bulk-load `count` events; returns how many were written.
+
+    `storage` goes through StorageService.bulk_insert_events, one batch at a
+    time like the ingest worker, so every derived table is maintained.
+    `copy` runs `concurrency` COPY writers while a thread generates ahead.
+    """
+    from sqlalchemy import text
+
+    from app.core.database import async_session_maker, maintenance_engine
+    from app.main import _create_schema
+
+    if async_session_maker is None:
+        raise SystemExit("DATABASE_URL is not configured")
+    async with maintenance_engine.begin() as conn:
+        await conn.run_sync(_create_schema)
+
+    write = _copy_batch if method == "copy" else _storage_batch
+    writers = concurrency if method == "copy" else 1
+    queue: asyncio.Queue = asyncio.Queue(maxsize=writers * 2)
+    written = 0
+    tenants = set()
+    started = time.perf_counter()
+
+    async def writer():
+        nonlocal written
+        while (batch := await queue.get()) is not None:
+            try:
+                ok = await write(batch)
+            except Exception as e:
+                print(f"\nbatch failed: {e!r}", file=sys.stderr)
+                ok = False
+            if ok:
+                written += len(batch)
+                tenants.update(item["tenant_id"] for item in batch)
+            _progress(written, count, started)
+
+    tasks = [asyncio.create_task(writer()) for _ in range(writers)]
+    batches = generator.batches(count, batch_size)
+    while batch := await asyncio.to_thread(next, batches, None):
+        await queue.put(batch)
+    for _ in tasks:
+        await queue.put(None)
+    await asyncio.gather(*tasks)
+
+    if method == "copy" and tenants:
+        # COPY bypassed tenant_counters; unseeded counters are recounted on next read
+        async with async_session_maker() as session:
+            await session.execute(
+                text(
+                    "UPDATE tenant_counters SET seeded = false "
+                    "WHERE tenant_id = ANY(:tenants)"
+                ),
+                {"tenants": sorted(tenants)},
+            )
+            await session.commit()
+    return written
+
+
+async def stream(
+    generator: WorkloadGenerator,
+    url: str,
+    headers: Dict[str, str],
+    rate: float,
+    duration: float,
+    batch_size: int,
+) -> Dict[str, Any]:
+    """POST to /v1/ingest at `rate` events per second, paced per batch."""
+    import httpx
+
+    count = int(rate * duration)
+    interval = batch_size / rate
+    latencies: List[float] = []
+    errors = 0
+    started = time.perf_counter()
+    async with httpx.AsyncClient(base_url=url, timeout=30) as client:
+        for n, batch in enumerate(generator.batches(count, batch_size)):
+            # Schedule against the start, so a slow response is caught up on
+            delay = started + n * interval - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            body = [
+                {
+                    "tenant_id": item["tenant_id"],
+                    "event_type": "execution",
+                    "payload": item["event"],
+                    "function_name": item["event"]["function_name"],
+                    "latency_ms": int(item["event"]["metrics"]["duration_ms"]),
+                    "status": item["event"]["status"].lower(),
+                }
+                for item in batch
+            ]
+            t = time.perf_counter()
+            response = await client.post("/v1/ingest", json=body, headers=headers)
+            latencies.append(time.perf_counter() - t)
+            if response.status_code != 202:
+                errors += 1
+            _progress(min(count, (n + 1) * batch_size), count, started)
+
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+
+    def pct(q: float) -> Optional[float]:
+        if not latencies:
+            return None
+        return round(
+            latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000, 3
+        )
+
+    return {
+        "events": count,
+        "seconds": round(elapsed, 3),
+        "achieved_rate": round(count / elapsed, 1),
+        "requests": len(latencies),
+        "errors": errors,
+        "p50_ms": pct(0.50),
+        "p99_ms": pct(0.99),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("command", choices=("generate", "load", "stream"))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--count", type=int, default=10_000)
+    parser.add_argument("--tenants", type=int, default=50)
+    parser.add_argument("--tenant-skew", type=float, default=1.1, help="Zipf exponent")
+    parser.add_argument("--failure-rate", type=float, default=0.03)
+    parser.add_argument("--blob-rate", type=float, default=0.002)
+    parser.add_argument(
+        "--start",
+        type=float,
+        help="Epoch seconds of the first event (default: span ago)",
+    )
+    parser.add_argument("--span-hours", type=float, default=24.0)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument(
+        "--method",
+        choices=("copy", "storage"),
+        default="copy",
+        help="load: COPY events and summaries, or the full ingest write path",
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=4, help="load: parallel COPY writers"
+    )
+    parser.add_argument("--database-url", help="load: defaults to DATABASE_URL")
+    parser.add_argument("--url", default="http://localhost:8000", help="stream: server")
+    parser.add_argument("--api-key", default="demo-key")
+    parser.add_argument("--tenant", default="demo-tenant", help="stream: auth tenant")
+    parser.add_argument("--rate", type=float, default=500.0, help="stream: events/s")
+    parser.add_argument("--duration", type=float, default=60.0, help="stream: seconds")
+    args = parser.parse_args(argv)
+
+    span = args.span_hours * 3600
+    generator = WorkloadGenerator(
+        seed=args.seed,
+        tenants=args.tenants,
+        tenant_skew=args.tenant_skew,
+        failure_rate=args.failure_rate,
+        blob_rate=args.blob_rate,
+        start=args.start,
+        span_seconds=span,
+    )
+
+    if args.command == "generate":
+        for item in generator.stream(args.count):
+            sys.stdout.write(json.dumps(item, separators=(",", ":")) + "\n")
+    elif args.command == "load":
+        if args.database_url:
+            os.environ["DATABASE_URL"] = args.database_url
+        os.environ.setdefault("LOG_LEVEL", "WARNING")
+        written = asyncio.run(
+            load(generator, args.count, args.batch_size, args.method, args.concurrency)
+        )
+        print(f"\nloaded {written}/{args.count} events", file=sys.stderr)
+    else:
+        headers = {"X-API-Key": args.api_key, "X-Tenant-ID": args.tenant}
+        result = asyncio.run(
+            stream(
+                generator, args.url, headers, args.rate, args.duration, args.batch_size
+            )
+        )
+        print(file=sys.stderr)
+        print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()